@@ -0,0 +1,135 @@
+"""
+房源模型内存基准
+
+生成 N 个合成房源（默认 100k，模拟多周、多所大学的历史数据），分别用 PropertyData
+和 CompactPropertyData 保存，报告每个房源占用的内存、构建耗时和 to_dict 往返耗时。
+
+合成数据的字符串都是运行时拼接出来的独立对象（与从 CSV / 页面解析得到的一样），
+区域从 TARGET_AREAS 中取，约 30% 的房源没有评分、约 40% 没有通勤时间。
+
+用法（在 packages/scraper 目录下）:
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py --count 500000
+"""
+import gc
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List, Type
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.config import TARGET_AREAS  # noqa: E402
+from src.models import PropertyData, CompactPropertyData, PropertySource  # noqa: E402
+
+PROPERTY_TYPES = ["House", "Apartment / Unit / Flat", "Studio", "Townhouse"]
+STREETS = ["Anzac Parade", "High Street", "King Street", "George Street", "Botany Road", "Crown Street"]
+
+
+def _fresh(text: str) -> str:
+    """返回内容相同的新字符串对象"""
+    return (text + ".")[:-1]
+
+
+def synthetic_records(count: int, seed: int = 42) -> List[dict]:
+    """合成房源字段（每个字符串都是新对象）"""
+    rng = random.Random(seed)
+    areas = sorted({area for areas in TARGET_AREAS.values() for area in areas})
+    universities = list(TARGET_AREAS)
+    now = datetime(2025, 6, 1, 12, 0, 0)
+
+    records = []
+    for i in range(count):
+        area = rng.choice(areas)
+        parts = area.split("-")
+        suburb = " ".join(parts[:-2]).title()
+        postcode = parts[-1]
+        property_type = rng.randrange(len(PROPERTY_TYPES))
+        scored = rng.random() < 0.7
+
+        record = {
+            "house_id": str(10_000_000 + i),
+            "source": rng.choice((PropertySource.DOMAIN, PropertySource.REALESTATE)),
+            "price_per_week": rng.randrange(350, 1500, 5),
+            "address_line1": f"{rng.randrange(1, 300)} {rng.choice(STREETS)}",
+            "address_line2": f"{suburb}, NSW {postcode}",
+            "suburb": suburb,
+            "state": _fresh("NSW"),
+            "postcode": postcode,
+            "bedroom_count": rng.randrange(0, 5),
+            "bathroom_count": rng.randrange(1, 3),
+            "parking_count": rng.randrange(0, 3),
+            "property_type": property_type + 1,
+            "property_type_raw": _fresh(PROPERTY_TYPES[property_type]),
+            "url": f"https://www.example.com.au/{area}-{10_000_000 + i}",
+            "search_area": _fresh(area),
+            "published_at": now - timedelta(days=rng.randrange(0, 28)),
+            "scraped_at": now - timedelta(seconds=rng.randrange(0, 28 * 86400)),
+        }
+        if scored:
+            record["average_score"] = round(rng.uniform(8, 18), 2)
+            record["keywords"] = f"keyword-{i % 500}"
+        if rng.random() < 0.6:
+            record["commute_times"] = {uni: rng.randrange(10, 90) for uni in rng.sample(universities, 2)}
+        records.append(record)
+    return records
+
+
+def measure(model: Type, count: int, seed: int) -> dict:
+    """
+    构建 count 个房源对象，返回常驻内存（释放输入记录后仍被对象引用的部分）和耗时
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = synthetic_records(count, seed)
+    start = time.perf_counter()
+    objects = [model(**record) for record in records]
+    seconds = time.perf_counter() - start
+    del records
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    round_trip = time.perf_counter()
+    for obj in objects[:10_000]:
+        type(obj).from_dict(obj.to_dict())
+    round_trip = (time.perf_counter() - round_trip) / min(len(objects), 10_000)
+
+    return {"objects": objects, "bytes": current, "peak": peak, "seconds": seconds, "round_trip": round_trip}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="房源模型内存基准")
+    parser.add_argument("--count", type=int, default=100_000, help="房源数量")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    for model in (PropertyData, CompactPropertyData):
+        print(f"构建 {args.count} 个 {model.__name__}...")
+        results[model.__name__] = measure(model, args.count, args.seed)
+
+    # 两种模型的内容必须一致
+    for a, b in zip(results["PropertyData"]["objects"][:1000], results["CompactPropertyData"]["objects"][:1000]):
+        assert a.to_dict() == b.to_dict(), f"to_dict 不一致: {a.house_id}"
+
+    base = results["PropertyData"]["bytes"]
+    header = f"{'model':<22}{'total MB':>10}{'bytes/listing':>15}{'build s':>10}{'to/from_dict us':>17}{'vs dataclass':>14}"
+    print(f"\n{args.count} listings")
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<22}{r['bytes'] / 1e6:>10.1f}{r['bytes'] / args.count:>15.0f}"
+            f"{r['seconds']:>10.2f}{r['round_trip'] * 1e6:>17.1f}{r['bytes'] / base:>13.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+HTML 解析性能基准
+
+对 benchmarks/fixtures 下的离线页面语料运行 RealEstate / Domain 的
+parse_listing_page 与 parse_detail_page，报告吞吐量 (pages/sec)、
+单个房源解析延迟和峰值内存，并与保存的基线比较。
+
+用法（在 packages/scraper 目录下）:
+    python benchmarks/parser_benchmark.py                    # 运行并与基线比较
+    python benchmarks/parser_benchmark.py --update-baseline  # 以本次结果更新基线
+    python benchmarks/parser_benchmark.py --parser html.parser
+    python benchmarks/parser_benchmark.py add page.html --site realestate --kind detail
+
+基线与机器相关，更换机器后应先在旧代码上 --update-baseline 再比较。
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tracemalloc
+from datetime import date
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.config import settings  # noqa: E402
+from src.models import PropertyData  # noqa: E402
+from src.scrapers import RealEstateScraper, DomainScraper  # noqa: E402
+from src.utils.html import resolve_parser  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+MANIFEST_PATH = os.path.join(FIXTURE_DIR, "manifest.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+SCRAPERS = {
+    "realestate": RealEstateScraper,
+    "domain": DomainScraper,
+}
+KINDS = ("listing", "detail")
+
+
+def load_manifest() -> dict:
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def read_fixture(path: str) -> str:
+    """读取语料文件（.html 或 .html.gz）"""
+    full_path = os.path.join(FIXTURE_DIR, path)
+    if full_path.endswith(".gz"):
+        with gzip.open(full_path, "rt", encoding="utf-8") as f:
+            return f.read()
+    with open(full_path, encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_once(scraper, kind: str, html: str) -> int:
+    """解析一次页面，返回解析出的房源数（详情页为 1/0，表示是否取到描述）"""
+    if kind == "listing":
+        return len(scraper.parse_listing_page(html))
+    prop = PropertyData(house_id="benchmark", source=scraper.SOURCE)
+    scraper.parse_detail_page(prop, html)
+    return 1 if prop.description_en else 0
+
+
+def check_expected(fixture: dict, count: int) -> Optional[str]:
+    """校验解析结果与语料清单中的期望值，不一致时返回错误信息"""
+    expected = fixture.get("expected", {})
+    if fixture["kind"] == "listing" and "listings" in expected and count != expected["listings"]:
+        return f"期望 {expected['listings']} 个房源，实际 {count}"
+    if fixture["kind"] == "detail" and expected.get("description") and not count:
+        return "未解析到描述"
+    return None
+
+
+def bench_fixture(fixture: dict, repeat: int) -> dict:
+    """对单个语料文件计时并测量峰值内存"""
+    scraper = SCRAPERS[fixture["site"]]()
+    html = read_fixture(fixture["file"])
+
+    # 预热（同时得到解析结果用于校验）
+    count = parse_once(scraper, fixture["kind"], html)
+
+    # 取多次中最快的一次，减少调度/GC 带来的噪声
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_once(scraper, fixture["kind"], html)
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+
+    # tracemalloc 会显著拖慢解析，单独跑一次测内存
+    tracemalloc.start()
+    parse_once(scraper, fixture["kind"], html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "bytes": len(html.encode("utf-8")),
+        "items": count,
+        "ms_per_page": round(elapsed * 1000, 3),
+        "pages_per_sec": round(1 / elapsed, 2) if elapsed else 0.0,
+        "ms_per_listing": round(elapsed * 1000 / count, 3) if count and fixture["kind"] == "listing" else None,
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "error": check_expected(fixture, count),
+    }
+
+
+def run(fixtures: List[dict], repeat: int) -> Dict[str, dict]:
+    results = {}
+    for fixture in fixtures:
+        results[fixture["file"]] = bench_fixture(fixture, repeat)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """与基线比较，返回回退项（吞吐量低于基线 (1 - tolerance) 倍）"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("pages_per_sec"):
+            continue
+        ratio = result["pages_per_sec"] / base["pages_per_sec"]
+        result["vs_baseline"] = round(ratio, 2)
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {result['pages_per_sec']} pages/s, 基线 {base['pages_per_sec']} ({ratio:.0%})")
+    return regressions
+
+
+def print_report(results: Dict[str, dict], parser: str):
+    print(f"\nParser backend: {parser}")
+    header = f"{'fixture':<50} {'KB':>7} {'items':>5} {'ms/page':>9} {'pages/s':>8} {'ms/item':>8} {'peak MB':>8} {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        per_item = f"{r['ms_per_listing']:.3f}" if r["ms_per_listing"] is not None else "-"
+        vs_base = f"{r['vs_baseline']:.2f}x" if r.get("vs_baseline") is not None else "-"
+        print(
+            f"{name:<50} {r['bytes'] / 1024:>7.0f} {r['items']:>5} {r['ms_per_page']:>9.2f} "
+            f"{r['pages_per_sec']:>8.1f} {per_item:>8} {r['peak_mb']:>8.2f} {vs_base:>8}"
+        )
+        if r["error"]:
+            print(f"  !! {r['error']}")
+
+
+def cmd_run(args) -> int:
+    settings.html_parser = args.parser
+    parser = resolve_parser(args.parser)
+
+    manifest = load_manifest()
+    fixtures = [
+        f for f in manifest["fixtures"]
+        if (not args.site or f["site"] == args.site) and (not args.kind or f["kind"] == args.kind)
+    ]
+    results = run(fixtures, args.repeat)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    # 不同解析器后端分别保存基线
+    baseline = baselines.get(parser, {}).get("results", {})
+    regressions = compare(results, baseline, args.tolerance)
+    print_report(results, parser)
+
+    errors = [f"{name}: {r['error']}" for name, r in results.items() if r["error"]]
+
+    if args.update_baseline:
+        baselines[parser] = {
+            "corpus_version": manifest.get("version"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": date.today().isoformat(),
+            "results": {
+                name: {k: r[k] for k in ("items", "ms_per_page", "pages_per_sec", "ms_per_listing", "peak_mb")}
+                for name, r in results.items()
+            },
+        }
+        save_json(args.baseline, baselines)
+        print(f"\n基线已更新: {args.baseline}")
+    elif not baseline:
+        print(f"\n没有 {parser} 的基线，使用 --update-baseline 生成")
+
+    if errors:
+        print("\n解析结果与语料清单不一致:")
+        for line in errors:
+            print(f"  {line}")
+    if regressions and not args.update_baseline:
+        print(f"\n性能回退（容差 {args.tolerance:.0%}）:")
+        for line in regressions:
+            print(f"  {line}")
+
+    return 1 if errors or (regressions and not args.update_baseline) else 0
+
+
+def cmd_add(args) -> int:
+    """把保存的页面加入语料（gzip 压缩）并登记到清单，期望值取当前解析结果"""
+    manifest = load_manifest()
+    name = args.name or os.path.splitext(os.path.basename(args.file))[0]
+    rel_path = f"{args.site}/{name}.html.gz"
+
+    if any(f["file"] == rel_path for f in manifest["fixtures"]):
+        print(f"语料已存在: {rel_path}")
+        return 1
+
+    os.makedirs(os.path.join(FIXTURE_DIR, args.site), exist_ok=True)
+    with open(args.file, "rb") as src, gzip.open(os.path.join(FIXTURE_DIR, rel_path), "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+    scraper = SCRAPERS[args.site]()
+    count = parse_once(scraper, args.kind, read_fixture(rel_path))
+    expected = {"listings": count} if args.kind == "listing" else {"description": bool(count)}
+
+    manifest["fixtures"].append({
+        "file": rel_path,
+        "site": args.site,
+        "kind": args.kind,
+        "captured": args.captured or date.today().isoformat(),
+        "note": args.note or "",
+        "expected": expected,
+    })
+    manifest["version"] = manifest.get("version", 0) + 1
+    save_json(MANIFEST_PATH, manifest)
+    print(f"已加入语料: {rel_path} ({expected})，语料版本 {manifest['version']}")
+    return 0
+
+
+def main() -> int:
+    logging.disable(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="HTML 解析性能基准")
+    sub = parser.add_subparsers(dest="command")
+
+    add = sub.add_parser("add", help="加入新的语料页面")
+    add.add_argument("file", help="保存的 HTML 文件")
+    add.add_argument("--site", choices=SCRAPERS.keys(), required=True)
+    add.add_argument("--kind", choices=KINDS, required=True)
+    add.add_argument("--name", help="语料文件名（默认取原文件名）")
+    add.add_argument("--captured", help="抓取日期 YYYY-MM-DD（默认今天）")
+    add.add_argument("--note", help="备注")
+
+    parser.add_argument("--parser", default=settings.html_parser, help="解析器后端: auto / lxml / html.parser")
+    parser.add_argument("--repeat", type=int, default=10, help="每个页面计时解析次数（取最快一次）")
+    parser.add_argument("--site", choices=SCRAPERS.keys(), help="只运行指定站点")
+    parser.add_argument("--kind", choices=KINDS, help="只运行指定页面类型")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的吞吐量下降比例")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次结果更新基线")
+
+    args = parser.parse_args()
+    if args.command == "add":
+        return cmd_add(args)
+    return cmd_run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,18 @@ QRent 爬虫主入口
     # 跳过某些步骤
     python main.py run --no-scoring --no-commute --universities UNSW
     
+    # 流式模式（详情/评分/通勤/入库并发进行）
+    python main.py run --streaming --universities UNSW USYD
+    
+    # 增量模式（按最新排序，遇到已知房源为主的页面即停止翻页）
+    python main.py run --incremental --universities UNSW USYD
+    
+    # 崩溃后从检查点继续（跳过已完成的列表/详情/评分/通勤/入库）
+    python main.py run --resume --universities UNSW USYD UTS
+    
+    # 性能剖析（每个阶段输出折叠调用栈和内存分配报告到 output/profile）
+    python main.py run --profile --universities UNSW
+    
     # 处理已有 CSV 文件
     python main.py process-csv UNSW_rentdata_241214.csv --university UNSW
 """
@@ -22,7 +34,6 @@ QRent 爬虫主入口
 import argparse
 import sys
 import logging
-from datetime import datetime
 
 # 添加 src 目录到路径
 sys.path.insert(0, '.')
@@ -35,7 +46,7 @@ logger = setup_logger("main")
 
 def cmd_run(args):
     """运行爬虫流水线"""
-    universities = args.universities or ['UNSW', 'USYD']
+    universities = args.universities or ['UNSW', 'USYD', 'UTS']
     scrapers = args.scrapers or ['domain', 'realestate']
     
     logger.info(f"开始爬虫任务")
@@ -44,56 +55,46 @@ def cmd_run(args):
     logger.info(f"  评分: {'启用' if not args.no_scoring else '禁用'}")
     logger.info(f"  通勤: {'启用' if not args.no_commute else '禁用'}")
     logger.info(f"  数据库: {'启用' if not args.no_database else '禁用'}")
+    logger.info(f"  流式: {'启用' if args.streaming else '禁用'}")
     
     pipeline = ScraperPipeline(
         scraper_types=scrapers,
         enable_scoring=not args.no_scoring,
         enable_commute=not args.no_commute,
-        enable_database=not args.no_database
+        enable_database=not args.no_database,
+        incremental=args.incremental,
+        full_sweep=args.full_sweep,
+        resume=args.resume,
+        profile=args.profile
     )
-    
-    for university in universities:
+    logger.info(f"  增量: {'启用' if pipeline.incremental else '禁用'}{' (强制完整爬取)' if args.full_sweep else ''}")
+    
+    if args.streaming and args.resume:
+        logger.warning("流式模式不支持 --resume，将重新开始")
+    
+    if args.streaming:
+        # 流式模式按大学逐个运行
+        for university in universities:
+            try:
+                logger.info(f"\n{'='*60}")
+                logger.info(f"处理 {university}")
+                logger.info(f"{'='*60}")
+                
+                pipeline.run_streaming(university)
+                
+            except Exception as e:
+                logger.error(f"处理 {university} 失败: {e}")
+                if args.debug:
+                    raise
+    else:
+        # 按区域爬取：重叠区域只爬一次，房源分发给所有相关大学
         try:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"处理 {university}")
-            logger.info(f"{'='*60}")
-            
-            pipeline.run(university)
-            
+            pipeline.run_plan(universities)
         except Exception as e:
-            logger.error(f"处理 {university} 失败: {e}")
+            logger.error(f"处理 {', '.join(universities)} 失败: {e}")
             if args.debug:
                 raise
     
-    # 处理 UTS
-    if 'USYD' in universities and 'UTS' not in universities:
-        try:
-            logger.info(f"\n{'='*60}")
-            logger.info("处理 UTS (基于 USYD 数据)")
-            logger.info(f"{'='*60}")
-            
-            current_date = datetime.now().strftime('%y%m%d')
-            usyd_file = f"USYD_rentdata_{current_date}.csv"
-            
-            properties = pipeline.load_from_csv(usyd_file)
-            
-            if properties and pipeline.commute_service:
-                properties = pipeline.commute_service.process_properties(
-                    properties,
-                    university='UTS',
-                    skip_existing=False
-                )
-            
-            if properties and pipeline.enable_database and pipeline.db_service:
-                with pipeline.db_service.session():
-                    pipeline.db_service.save_properties(properties, 'UTS')
-            
-            if properties:
-                pipeline.export_to_csv(properties, 'UTS')
-                
-        except Exception as e:
-            logger.error(f"处理 UTS 失败: {e}")
-    
     logger.info("\n爬虫任务完成!")
 
 
@@ -185,8 +186,8 @@ def main():
     run_parser.add_argument(
         '--universities', '-u', 
         nargs='+', 
-        default=['UNSW', 'USYD'],
-        help='大学列表 (默认: UNSW USYD)'
+        default=['UNSW', 'USYD', 'UTS'],
+        help='大学列表 (默认: UNSW USYD UTS)'
     )
     run_parser.add_argument(
         '--scrapers', '-s',
@@ -198,6 +199,14 @@ def main():
     run_parser.add_argument('--no-scoring', action='store_true', help='禁用评分')
     run_parser.add_argument('--no-commute', action='store_true', help='禁用通勤计算')
     run_parser.add_argument('--no-database', action='store_true', help='禁用数据库保存')
+    run_parser.add_argument('--streaming', action='store_true', help='流式模式：各阶段并发处理')
+    run_parser.add_argument(
+        '--incremental', action='store_true', default=None,
+        help='增量模式：按最新排序，遇到已知房源为主的页面即停止翻页 (默认取 INCREMENTAL_CRAWL)'
+    )
+    run_parser.add_argument('--full-sweep', action='store_true', help='增量模式下强制本次完整爬取')
+    run_parser.add_argument('--resume', action='store_true', help='从最近一次未完成运行的检查点继续，跳过已完成的阶段')
+    run_parser.add_argument('--profile', action='store_true', help='对每个阶段做采样剖析和内存快照（输出到 output/profile）')
     run_parser.set_defaults(func=cmd_run)
     
     # process-csv 命令
@@ -223,6 +232,9 @@ def main():
     
     args = parser.parse_args()
     
+    if args.command == 'run' and args.streaming and args.profile:
+        parser.error("--profile 不支持 --streaming（流式模式各阶段并发执行，无法按阶段剖析）")
+    
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
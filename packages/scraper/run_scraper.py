@@ -36,7 +36,8 @@ def run_scraper(
     enable_scoring: bool = True,
     enable_commute: bool = True,
     enable_database: bool = True,
-    scrape_details: bool = True
+    scrape_details: bool = True,
+    profile: bool = False
 ):
     """
     运行爬虫
@@ -48,6 +49,7 @@ def run_scraper(
         enable_commute: 启用通勤时间计算 (需要 GOOGLE_MAPS_API_KEY)
         enable_database: 保存到数据库
         scrape_details: 爬取详情页
+        profile: 对每个阶段做采样剖析和内存快照（输出到 output/profile）
     """
     universities = universities or ['UNSW', 'USYD']
     scrapers = scrapers or ['domain', 'realestate']
@@ -64,13 +66,15 @@ def run_scraper(
     logger.info(f"Commute: {'ON' if enable_commute else 'OFF'}")
     logger.info(f"Database: {'ON' if enable_database else 'OFF'}")
     logger.info(f"Details: {'ON' if scrape_details else 'OFF'}")
+    logger.info(f"Profile: {'ON' if profile else 'OFF'}")
     logger.info("=" * 60)
     
     pipeline = ScraperPipeline(
         scraper_types=scrapers,
         enable_scoring=enable_scoring,
         enable_commute=enable_commute,
-        enable_database=enable_database
+        enable_database=enable_database,
+        profile=profile
     )
     
     all_results = {}
@@ -114,6 +118,7 @@ if __name__ == '__main__':
     parser.add_argument('--no-commute', action='store_true')
     parser.add_argument('--no-database', action='store_true')
     parser.add_argument('--no-details', action='store_true')
+    parser.add_argument('--profile', action='store_true')
     
     args = parser.parse_args()
     
@@ -123,6 +128,7 @@ if __name__ == '__main__':
         enable_scoring=not args.no_scoring,
         enable_commute=not args.no_commute,
         enable_database=not args.no_database,
-        scrape_details=not args.no_details
+        scrape_details=not args.no_details,
+        profile=args.profile
     )
 
@@ -10,6 +10,7 @@ from .settings import (
     SCHOOL_NAME_MAPPING,
     TARGET_AREAS,
     PROPERTY_TYPE_MAPPING,
+    ROUTING_PRESETS,
 )
 
 __all__ = [
@@ -24,5 +25,6 @@ __all__ = [
     'SCHOOL_NAME_MAPPING',
     'TARGET_AREAS',
     'PROPERTY_TYPE_MAPPING',
+    'ROUTING_PRESETS',
 ]
 
@@ -27,6 +27,9 @@ class DatabaseConfig:
     port: int = field(default_factory=lambda: int(os.getenv("DB_PORT", 3306)))
     charset: str = "utf8mb4"
     connect_timeout: int = 60
+    # 批量写入：executemany + ON DUPLICATE KEY UPDATE，每批提交一次
+    bulk_save: bool = field(default_factory=lambda: os.getenv("DB_BULK_SAVE", "true").lower() != "false")
+    bulk_batch_size: int = 500
 
 
 @dataclass
@@ -43,6 +46,8 @@ class SeleniumConfig:
     )
     page_load_timeout: int = 30
     implicit_wait: int = 10
+    # Playwright request interception: abort heavy resources per ROUTING_PRESETS
+    block_resources: bool = field(default_factory=lambda: os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() != "false")
 
 
 @dataclass 
@@ -53,6 +58,36 @@ class ScraperConfig:
     request_delay: float = 3.0  # Request interval (seconds)
     retry_count: int = 3
     retry_delay: float = 10.0
+    # Detail-page browser pool: number of Playwright browsers (each with its own profile), 1 = serial
+    detail_workers: int = field(default_factory=lambda: int(os.getenv("DETAIL_WORKERS", 1)))
+    # Per-site cap on concurrent detail pages (applies across all scraper instances in a process)
+    site_concurrency: Dict[str, int] = field(default_factory=lambda: {
+        'realestate': 3,
+        'domain': 4,
+    })
+    # HTTP fast path: harvest cookies/User-Agent from the browser once, fetch detail pages
+    # with a pooled aiohttp client, fall back to the browser for blocked pages
+    http_details: bool = field(default_factory=lambda: os.getenv("DETAIL_HTTP", "false").lower() == "true")
+    http_concurrency: int = field(default_factory=lambda: int(os.getenv("DETAIL_HTTP_CONCURRENCY", 8)))
+    http_timeout: float = 30.0
+    http_max_blocks: int = 5  # consecutive blocked responses before giving up on HTTP
+    # Readiness waits: poll for site selectors instead of fixed sleeps
+    ready_timeout: float = 15.0  # max seconds to wait for a page to become ready
+    listing_stable_for: float = 1.0  # listing card count must stay unchanged this long
+    # Incremental crawl: sort newest-first and stop paging an area once a page is mostly
+    # listings we already have (history CSV / database); a full sweep runs periodically
+    incremental: bool = field(default_factory=lambda: os.getenv("INCREMENTAL_CRAWL", "false").lower() == "true")
+    incremental_known_ratio: float = 0.8  # stop when at least this share of a page is known
+    full_sweep_days: int = field(default_factory=lambda: int(os.getenv("FULL_SWEEP_DAYS", 7)))
+    # Area-parallel listing crawl: N worker processes, each with its own browser profile,
+    # take areas from a shared queue; 1 = serial
+    area_workers: int = field(default_factory=lambda: int(os.getenv("AREA_WORKERS", 1)))
+    # Minimum seconds between listing page loads per site across all area workers,
+    # roughly the serial crawl's page cadence so the total request rate stays the same
+    site_min_interval: Dict[str, float] = field(default_factory=lambda: {
+        'realestate': 8.0,
+        'domain': 5.0,
+    })
 
 
 @dataclass
@@ -65,6 +100,24 @@ class ScoringConfig:
     max_workers: int = 2
     temperature: float = 0.7
     max_tokens: int = 150
+    # LLM 结果持久化缓存（按描述内容哈希 + 提示词版本 + 模型名）
+    cache_enabled: bool = field(default_factory=lambda: os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false")
+    cache_path: str = field(default_factory=lambda: os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite"))
+    cache_ttl_days: float = 30.0
+    cache_max_entries: int = 100000
+    prompt_version: str = "1"  # 修改提示词语义时递增，使旧缓存失效
+    # 批量模式：一次请求处理多个房源的评分 + 中英文关键词，1 表示逐个处理
+    batch_size: int = field(default_factory=lambda: int(os.getenv("SCORING_BATCH_SIZE", 1)))
+    batch_tokens_per_item: int = 300  # 批量模式下每个房源预留的输出 token
+    # asyncio 评分引擎（ScoringService.aprocess_properties）
+    async_enabled: bool = field(default_factory=lambda: os.getenv("SCORING_ASYNC", "false").lower() == "true")
+    async_concurrency: int = field(default_factory=lambda: int(os.getenv("SCORING_CONCURRENCY", 16)))
+    rpm_limit: int = field(default_factory=lambda: int(os.getenv("SCORING_RPM_LIMIT", 600)))
+    tpm_limit: int = field(default_factory=lambda: int(os.getenv("SCORING_TPM_LIMIT", 1000000)))
+    api_base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+    request_timeout: float = 60.0
+    async_max_retries: int = 5
+    retry_base_delay: float = 1.0  # 429/5xx 退避基数（秒），实际等待带随机抖动
 
 
 @dataclass
@@ -73,6 +126,15 @@ class CommuteConfig:
     api_key: str = field(default_factory=lambda: os.getenv("GOOGLE_MAPS_API_KEY", ""))
     max_workers: int = 5
     request_delay: float = 1.1
+    # Distance Matrix 批量模式：先地理编码去重，再按 起点 x 所有学校 批量请求
+    matrix_enabled: bool = field(default_factory=lambda: os.getenv("COMMUTE_MATRIX", "true").lower() != "false")
+    matrix_max_origins: int = 25  # 单次请求起点数上限（API 限制 25）
+    matrix_max_elements: int = 100  # 单次请求元素数上限（起点数 x 终点数）
+    # 通勤时间持久化缓存（按 归一化地址 + 学校 + 出发时段），跨大学、跨运行复用
+    cache_enabled: bool = field(default_factory=lambda: os.getenv("COMMUTE_CACHE_ENABLED", "true").lower() != "false")
+    cache_path: str = field(default_factory=lambda: os.getenv("COMMUTE_CACHE_PATH", "cache/commute_cache.sqlite"))
+    cache_max_age_days: float = field(default_factory=lambda: float(os.getenv("COMMUTE_CACHE_MAX_AGE_DAYS", 90)))
+    cache_max_entries: int = 500000
 
 
 # School coordinates configuration
@@ -129,6 +191,47 @@ TARGET_AREAS: Dict[str, List[str]] = {
     ]
 }
 
+# Playwright routing presets per site (see utils/browser.py RoutingProfile)
+# - blocked_resource_types: Playwright resource types to abort
+# - blocked_domains: hosts (and subdomains) whose requests are aborted
+# - allowed_domains: hosts never blocked (site origin, anti-bot challenge scripts)
+_TRACKER_DOMAINS: List[str] = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "nr-data.net",
+    "newrelic.com",
+    "adnxs.com",
+    "tiqcdn.com",
+    "segment.io",
+    "optimizely.com",
+    "bat.bing.com",
+    "clarity.ms",
+]
+
+ROUTING_PRESETS: Dict[str, Dict[str, List[str]]] = {
+    'default': {
+        'blocked_resource_types': ["image", "media", "font"],
+        'blocked_domains': _TRACKER_DOMAINS,
+        'allowed_domains': [],
+    },
+    'realestate': {
+        'blocked_resource_types': ["image", "media", "font"],
+        'blocked_domains': _TRACKER_DOMAINS + ["nielsen.com", "permutive.com"],
+        'allowed_domains': ["www.realestate.com.au"],
+    },
+    'domain': {
+        'blocked_resource_types': ["image", "media", "font"],
+        'blocked_domains': _TRACKER_DOMAINS + ["permutive.com", "adsrvr.org"],
+        'allowed_domains': ["www.domain.com.au"],
+    },
+}
+
 # Property type mapping
 PROPERTY_TYPE_MAPPING: Dict[str, int] = {
     'house': 1,
@@ -156,6 +259,27 @@ class Settings:
     
     # Data output directory
     output_dir: str = "."
+    # Data file format: csv / parquet / both (parquet requires pyarrow)
+    output_format: str = field(default_factory=lambda: os.getenv("OUTPUT_FORMAT", "csv").lower())
+    # HTML parser backend: auto (lxml if installed) / lxml / html.parser
+    html_parser: str = field(default_factory=lambda: os.getenv("HTML_PARSER", "auto").lower())
+    
+    # Pipeline checkpoints: per-listing stage completion for `main.py run --resume`
+    checkpoint_enabled: bool = field(default_factory=lambda: os.getenv("CHECKPOINT_ENABLED", "true").lower() != "false")
+    checkpoint_path: str = field(default_factory=lambda: os.getenv("CHECKPOINT_PATH", "cache/checkpoints.sqlite"))
+    checkpoint_every: int = 50  # listings per scoring/commute/DB chunk between checkpoint writes
+    # Finished runs are cleared on completion; unfinished (crashed) runs are dropped after this many days
+    checkpoint_retention_days: int = field(default_factory=lambda: int(os.getenv("CHECKPOINT_RETENTION_DAYS", "7")))
+    
+    # Cross-source duplicates (same flat on Domain and REA): matched by normalized street
+    # address + suburb with agreeing postcode/bedrooms/price, enriched once and shared
+    dedupe_enabled: bool = field(default_factory=lambda: os.getenv("DEDUPE_ENABLED", "true").lower() != "false")
+    dedupe_price_tolerance: float = 0.05  # max relative weekly price difference
+    
+    # Run metrics: Prometheus textfile (scraper_<run>.prom, overwritten each run) and a
+    # per-run JSON are written here; empty = <output_dir>/metrics
+    metrics_enabled: bool = field(default_factory=lambda: os.getenv("METRICS_ENABLED", "true").lower() != "false")
+    metrics_dir: str = field(default_factory=lambda: os.getenv("METRICS_DIR", ""))
     
     # Logging configuration
     log_level: str = "INFO"
@@ -0,0 +1,163 @@
+"""
+跨来源重复房源识别
+同一套房常同时挂在 Domain 和 RealEstate 上（house_id 不同）。按归一化地址
+（单元号/门牌号 + 街道 + 区域）建立索引，邮编、价格和卧室数也一致时视为同一房源，
+每组只保留一个代表房源做详情爬取、评分和通勤计算，结果再复制给其余重复房源。
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import PropertyData
+from .utils import normalize_address
+
+logger = logging.getLogger(__name__)
+
+# 从代表房源复制给重复房源的字段（仅在重复房源缺失时复制）
+SHARED_FIELDS = ('description_en', 'description_cn', 'keywords', 'average_score', 'available_date')
+
+PropertyKey = Tuple[str, str]
+
+
+def _key(prop: PropertyData) -> PropertyKey:
+    return (prop.source.value, str(prop.house_id))
+
+
+def address_key(prop: PropertyData) -> Optional[Tuple[str, str]]:
+    """
+    (街道地址, 区域) 索引键；没有门牌号的地址（如 "Address available on request"）返回 None
+
+    两个来源的地址格式不同（Domain: "504-93-brompton-road"，REA: "504/93 Brompton Road"），
+    归一化后相同
+    """
+    street = normalize_address(prop.address_line1)
+    if not street or not street[0].isdigit():
+        return None
+    suburb = normalize_address(prop.suburb or prop.address_line2.split('-nsw')[0])
+    return street, suburb
+
+
+@dataclass
+class DuplicateIndex:
+    """
+    跨来源重复房源索引
+
+    用法:
+        index = DuplicateIndex(source_order=['domain', 'realestate'])
+        canonical = index.link(all_properties)   # 只对 canonical 做详情/评分/通勤
+        ...
+        index.propagate()                         # 把结果复制给重复房源
+    """
+    # 选代表房源时的来源优先顺序（靠前的优先），默认按来源名排序
+    source_order: List[str] = field(default_factory=list)
+    # 价格允许的相对差异
+    price_tolerance: float = 0.05
+    # 代表房源 -> 重复房源
+    groups: Dict[PropertyKey, List[PropertyData]] = field(default_factory=dict)
+    canonical_of: Dict[PropertyKey, PropertyData] = field(default_factory=dict)
+
+    def _agrees(self, a: PropertyData, b: PropertyData) -> bool:
+        """同地址的两个房源是否为同一房源：不同来源、邮编/卧室数/价格一致（缺失时不比较）"""
+        if a.source == b.source:
+            return False
+        if a.postcode and b.postcode and str(a.postcode) != str(b.postcode):
+            return False
+        if a.bedroom_count and b.bedroom_count and a.bedroom_count != b.bedroom_count:
+            return False
+        if a.price_per_week and b.price_per_week:
+            high = max(a.price_per_week, b.price_per_week)
+            if abs(a.price_per_week - b.price_per_week) > high * self.price_tolerance:
+                return False
+        return True
+
+    def _rank(self, prop: PropertyData) -> tuple:
+        """代表房源排序：已有详情/评分的优先（避免重复爬取），其次按来源顺序"""
+        source = prop.source.value
+        order = self.source_order.index(source) if source in self.source_order else len(self.source_order)
+        return (not prop.description_en, not prop.average_score, order, source)
+
+    def link(self, properties: Iterable[PropertyData]) -> List[PropertyData]:
+        """
+        识别重复房源并分组
+
+        Returns:
+            代表房源列表（未重复的房源原样保留），顺序与输入一致
+        """
+        properties = list(properties)
+        by_address: Dict[Tuple[str, str], List[List[PropertyData]]] = {}
+
+        for prop in properties:
+            address = address_key(prop)
+            if address is None:
+                continue
+            clusters = by_address.setdefault(address, [])
+            for cluster in clusters:
+                if all(self._agrees(prop, other) for other in cluster):
+                    cluster.append(prop)
+                    break
+            else:
+                clusters.append([prop])
+
+        self.groups.clear()
+        self.canonical_of.clear()
+        for clusters in by_address.values():
+            for cluster in clusters:
+                if len(cluster) < 2:
+                    continue
+                canonical = min(cluster, key=self._rank)
+                self.groups[_key(canonical)] = [prop for prop in cluster if prop is not canonical]
+                for prop in cluster:
+                    self.canonical_of[_key(prop)] = canonical
+
+        canonical = [prop for prop in properties if self.is_canonical(prop)]
+        if self.groups:
+            logger.info(
+                f"跨来源重复房源: {self.duplicate_count} 个，与 {len(self.groups)} 个代表房源合并处理"
+            )
+        return canonical
+
+    def is_canonical(self, prop: PropertyData) -> bool:
+        """是否需要单独处理（代表房源或没有重复的房源）"""
+        return self.canonical_of.get(_key(prop), prop) is prop
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(len(duplicates) for duplicates in self.groups.values())
+
+    def canonical(self, properties: Iterable[PropertyData]) -> List[PropertyData]:
+        """把房源列表映射为代表房源（去重，保持顺序）"""
+        seen = set()
+        result = []
+        for prop in properties:
+            canonical = self.canonical_of.get(_key(prop), prop)
+            if id(canonical) not in seen:
+                seen.add(id(canonical))
+                result.append(canonical)
+        return result
+
+    def propagate(self) -> int:
+        """
+        把代表房源的详情、评分和通勤时间复制给重复房源（只填充缺失的值）
+
+        Returns:
+            更新的重复房源数量
+        """
+        updated = 0
+        for key, duplicates in self.groups.items():
+            canonical = self.canonical_of[key]
+            for prop in duplicates:
+                changed = False
+                for name in SHARED_FIELDS:
+                    value = getattr(canonical, name)
+                    if value and not getattr(prop, name):
+                        setattr(prop, name, value)
+                        changed = True
+                if canonical.scores and not prop.scores:
+                    prop.scores = list(canonical.scores)
+                    changed = True
+                for university, minutes in canonical.commute_times.items():
+                    if minutes is not None and prop.commute_times.get(university) is None:
+                        prop.commute_times[university] = minutes
+                        changed = True
+                updated += changed
+        return updated
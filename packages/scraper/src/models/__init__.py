@@ -1,4 +1,4 @@
-from .property import PropertyData, PropertySource, ScrapeResult, RegionInfo
+from .property import PropertyData, CompactPropertyData, PropertySource, ScrapeResult, RegionInfo
 
-__all__ = ['PropertyData', 'PropertySource', 'ScrapeResult', 'RegionInfo']
+__all__ = ['PropertyData', 'CompactPropertyData', 'PropertySource', 'ScrapeResult', 'RegionInfo']
 
@@ -2,7 +2,9 @@
 Property data model
 Unified data structure definitions
 """
-from dataclasses import dataclass, field, asdict
+import sys
+import copy
+from dataclasses import dataclass, field, asdict, fields, MISSING
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
@@ -52,6 +54,7 @@ class PropertyData:
     # Images and links
     url: str = ""
     thumbnail_url: Optional[str] = None
+    search_area: str = ""  # Target area the listing was found in (set by scrape_areas)
     
     # Date information
     available_date: Optional[datetime] = None
@@ -88,6 +91,168 @@ class PropertyData:
         return cls(**data)
 
 
+class _Interned:
+    """Descriptor that interns string values (suburbs, states etc. repeat across listings)"""
+    
+    def __init__(self, slot: str):
+        self.slot = slot
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.slot)
+    
+    def __set__(self, instance, value):
+        if type(value) is str:
+            value = sys.intern(value)
+        setattr(instance, self.slot, value)
+
+
+class _Lazy:
+    """Descriptor for a container that is only allocated on first access"""
+    
+    def __init__(self, slot: str, factory):
+        self.slot = slot
+        self.factory = factory
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if value is None:
+            value = self.factory()
+            setattr(instance, self.slot, value)
+        return value
+    
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value if value else None)
+
+
+class _Timestamp:
+    """Descriptor storing a datetime as a float POSIX timestamp"""
+    
+    def __init__(self, slot: str):
+        self.slot = slot
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        return None if value is None else datetime.fromtimestamp(value)
+    
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value.timestamp() if isinstance(value, datetime) else value)
+
+
+class CompactPropertyData:
+    """
+    Memory-lean PropertyData variant for holding large histories in one process
+    
+    Same fields, defaults and to_dict()/from_dict() format as PropertyData, but:
+    - __slots__ instead of a per-instance __dict__
+    - suburb / state / postcode / address_line2 / property_type_raw / search_area are interned
+    - scores and commute_times are only allocated when first accessed
+    - scraped_at is stored as a float timestamp
+    
+    Convert with CompactPropertyData.from_property(prop) / compact.to_property().
+    """
+    __slots__ = (
+        'house_id', 'source', 'price_per_week',
+        'address_line1', '_address_line2', '_suburb', '_state', '_postcode',
+        'bedroom_count', 'bathroom_count', 'parking_count', 'property_type', '_property_type_raw',
+        'description_en', 'description_cn', 'keywords',
+        'url', 'thumbnail_url', '_search_area',
+        'available_date', 'published_at', '_scraped_at',
+        'average_score', '_scores', '_commute_times',
+    )
+    
+    address_line2 = _Interned('_address_line2')
+    suburb = _Interned('_suburb')
+    state = _Interned('_state')
+    postcode = _Interned('_postcode')
+    property_type_raw = _Interned('_property_type_raw')
+    search_area = _Interned('_search_area')
+    scraped_at = _Timestamp('_scraped_at')
+    scores = _Lazy('_scores', list)
+    commute_times = _Lazy('_commute_times', dict)
+    
+    FIELDS = tuple(f.name for f in fields(PropertyData))
+    LAZY = {'scores': list, 'commute_times': dict}
+    # (name, default, default_factory) of the optional fields
+    _DEFAULTS = tuple((f.name, f.default, f.default_factory) for f in fields(PropertyData)[2:])
+    
+    def __init__(self, house_id: str, source: PropertySource, **values):
+        self.house_id = house_id
+        self.source = source
+        for name, default, factory in self._DEFAULTS:
+            if name in values:
+                value = values.pop(name)
+            elif name in self.LAZY:
+                value = None
+            elif factory is not MISSING:
+                value = factory()
+            else:
+                value = default
+            setattr(self, name, value)
+        if values:
+            raise TypeError(f"CompactPropertyData got unexpected fields: {', '.join(values)}")
+    
+    def _raw(self, name: str):
+        """Field value without allocating lazy containers"""
+        if name in self.LAZY:
+            return getattr(self, f"_{name}")
+        return getattr(self, name)
+    
+    def __repr__(self) -> str:
+        return f"CompactPropertyData(house_id={self.house_id!r}, source={self.source}, suburb={self.suburb!r})"
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactPropertyData):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary (same format as PropertyData.to_dict)"""
+        data = {}
+        for name in self.FIELDS:
+            value = self._raw(name)
+            if name in self.LAZY:
+                value = copy.deepcopy(value) if value is not None else self.LAZY[name]()
+            data[name] = value
+        data['source'] = self.source.value
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompactPropertyData':
+        """Create from dictionary"""
+        data = dict(data)
+        if 'source' in data and isinstance(data['source'], str):
+            data['source'] = PropertySource(data['source'])
+        return cls(**data)
+    
+    @classmethod
+    def from_property(cls, prop: PropertyData) -> 'CompactPropertyData':
+        values = {name: getattr(prop, name) for name in cls.FIELDS}
+        for name in cls.LAZY:
+            values[name] = copy.copy(values[name])
+        return cls(**values)
+    
+    def to_property(self) -> PropertyData:
+        values = {name: self._raw(name) for name in self.FIELDS}
+        for name, factory in self.LAZY.items():
+            values[name] = copy.copy(values[name]) if values[name] is not None else factory()
+        return PropertyData(**values)
+    
+    def get_combined_address(self) -> str:
+        """Get combined address (for building URL)"""
+        return f"{self.address_line1}-{self.address_line2}-{self.house_id}"
+    
+    def get_full_address(self) -> str:
+        """Get full address"""
+        parts = [self.address_line1, self.address_line2]
+        return ", ".join(p for p in parts if p)
+
+
 @dataclass
 class ScrapeResult:
     """
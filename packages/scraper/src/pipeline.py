@@ -3,9 +3,13 @@
 统一的数据处理流水线
 """
 import os
-import glob
+import time
+import asyncio
+import queue
 import logging
-from typing import List, Optional, Type, Dict
+import threading
+from typing import List, Optional, Type, Dict, Callable, Set, Iterator, Tuple
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 
 import pandas as pd
@@ -14,9 +18,20 @@ from .scrapers import BaseScraper, DomainScraper, RealEstateScraper
 from .services import DatabaseService, ScoringService, CommuteService
 from .models import PropertyData, PropertySource
 from .config import settings, TARGET_AREAS
+from .planner import CrawlPlan
+from .dedupe import DuplicateIndex
+from .utils import (
+    dataframe_to_properties, properties_to_dataframe,
+    read_frame, export_frame, find_frames, routing_totals,
+    CheckpointStore, property_key, metrics, StageProfiler,
+)
+from .utils.metrics import StageTimer
 
 logger = logging.getLogger(__name__)
 
+# 流式模式下标记队列结束
+_STREAM_END = object()
+
 
 class ScraperPipeline:
     """
@@ -46,6 +61,11 @@ class ScraperPipeline:
         output_dir: str = None,
         chunk_save_size: int = 100,
         auto_save_list: bool = True,
+        queue_size: int = 50,
+        incremental: Optional[bool] = None,
+        full_sweep: bool = False,
+        resume: bool = False,
+        profile: bool = False,
     ):
         """
         初始化 Pipeline
@@ -56,6 +76,11 @@ class ScraperPipeline:
             enable_commute: 是否启用通勤时间计算
             enable_database: 是否保存到数据库
             output_dir: CSV 输出目录
+            queue_size: 流式模式下各阶段之间队列的最大长度
+            incremental: 是否增量爬取列表（遇到已知房源为主的页面即停止翻页），默认取配置
+            full_sweep: 增量模式下强制本次完整爬取
+            resume: run_plan 从最近一次未完成运行的检查点继续
+            profile: 对每个阶段做采样剖析和内存快照，结果写入 output_dir/profile
         """
         self.scraper_types = scraper_types or list(self.SCRAPERS.keys())
         self.enable_scoring = enable_scoring
@@ -64,10 +89,21 @@ class ScraperPipeline:
         self.output_dir = output_dir or os.environ.get('OUTPUT_DIR', './output')
         self.chunk_save_size = chunk_save_size
         self.auto_save_list = auto_save_list
+        self.queue_size = queue_size
+        self.incremental = settings.scraper.incremental if incremental is None else incremental
+        self.full_sweep = full_sweep
+        self.resume = resume
+        self.checkpoints: Optional[CheckpointStore] = None
         
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
         
+        self.profiler: Optional[StageProfiler] = None
+        if profile:
+            profile_dir = os.path.join(self.output_dir, 'profile', datetime.now().strftime('%y%m%d_%H%M%S'))
+            self.profiler = StageProfiler(profile_dir)
+            logger.info(f"性能剖析已启用: {profile_dir}")
+        
         # 初始化服务
         self.scoring_service = ScoringService() if enable_scoring else None
         self.commute_service = CommuteService() if enable_commute else None
@@ -85,28 +121,24 @@ class ScraperPipeline:
         # list export stats
         self.stats['list_parts_saved'] = 0
         self.stats['copied_from_history'] = 0
+        self.stats['incremental_stops'] = 0
+        self.stats['carried_forward'] = 0
+        self.stats['cross_source_duplicates'] = 0
         
         # 历史数据缓存 (house_id -> PropertyData-like dict)
         self._history_cache: Dict[str, dict] = {}
     
-    def _load_history_csv(self, university: str) -> Dict[str, dict]:
-        """
-        加载历史 CSV 数据（最近7天内的完整数据文件）
-        返回 house_id -> {description_en, keywords, average_score, ...} 的映射
-        用于复用已有的详情/评分/通勤数据，避免重复爬取
-        """
-        cache = {}
-        
-        # 查找最近的完整 CSV 文件（不是 list 分段文件）
+    def _latest_history_file(self, university: str) -> Optional[str]:
+        """最近 7 天内最新的完整数据文件（CSV/Parquet，不是 list 分段文件），没有时返回 None"""
         pattern = os.path.join(self.output_dir, f"{university}_rentdata_*.csv")
-        csv_files = glob.glob(pattern)
+        csv_files = find_frames(pattern)
         
         # 过滤掉 list 分段文件
         csv_files = [f for f in csv_files if '_list_' not in f]
         
         if not csv_files:
             logger.info(f"未找到 {university} 的历史 CSV 文件")
-            return cache
+            return None
         
         # 按修改时间排序，取最新的
         csv_files.sort(key=os.path.getmtime, reverse=True)
@@ -116,45 +148,40 @@ class ScraperPipeline:
         file_mtime = datetime.fromtimestamp(os.path.getmtime(latest_file))
         if datetime.now() - file_mtime > timedelta(days=7):
             logger.info(f"历史 CSV 文件超过7天，不使用: {latest_file}")
+            return None
+        return latest_file
+    
+    def _load_history_csv(self, university: str) -> Dict[str, dict]:
+        """
+        加载历史 CSV 数据（最近7天内的完整数据文件）
+        返回 house_id -> {description_en, keywords, average_score, ...} 的映射
+        用于复用已有的详情/评分/通勤数据，避免重复爬取
+        """
+        cache = {}
+        latest_file = self._latest_history_file(university)
+        if not latest_file:
             return cache
         
         logger.info(f"加载历史数据: {latest_file}")
         
         try:
-            df = pd.read_csv(latest_file)
+            df = read_frame(latest_file)
             loaded_count = 0
             
-            for _, row in df.iterrows():
-                house_id = str(row.get('houseId', ''))
-                if not house_id:
-                    continue
-                
-                # 只缓存有详情数据的记录
-                desc = row.get('description_en')
-                if pd.isna(desc) or not str(desc).strip():
-                    continue
-                
-                cache[house_id] = {
-                    'description_en': str(desc) if pd.notna(desc) else None,
-                    'description_cn': str(row.get('description_cn', '')) if pd.notna(row.get('description_cn')) else None,
-                    'keywords': str(row.get('keywords', '')) if pd.notna(row.get('keywords')) else None,
-                    'average_score': float(row.get('average_score', 0)) if pd.notna(row.get('average_score')) else None,
-                    'available_date': str(row.get('available_date', '')) if pd.notna(row.get('available_date')) else None,
-                    'thumbnail_url': str(row.get('thumbnail_url', '')) if pd.notna(row.get('thumbnail_url')) else None,
-                    'commute_times': {}  # 初始化通勤时间字典
+            # 只缓存有详情数据的记录
+            for prop in dataframe_to_properties(df, require_description=True):
+                cache[prop.house_id] = {
+                    'description_en': prop.description_en,
+                    'description_cn': prop.description_cn,
+                    'keywords': prop.keywords,
+                    'average_score': prop.average_score,
+                    'available_date': prop.available_date,
+                    'thumbnail_url': prop.thumbnail_url,
+                    # 通勤时间为 0 视为无效
+                    'commute_times': {
+                        uni: minutes for uni, minutes in prop.commute_times.items() if minutes
+                    },
                 }
-                
-                # 加载通勤时间到 commute_times 字典
-                for col in df.columns:
-                    if col.startswith('commuteTime_'):
-                        uni = col.replace('commuteTime_', '')
-                        val = row.get(col)
-                        if pd.notna(val) and val != '' and val != 0:
-                            try:
-                                cache[house_id]['commute_times'][uni] = int(val)
-                            except (ValueError, TypeError):
-                                pass
-                
                 loaded_count += 1
             
             logger.info(f"从历史 CSV 加载了 {loaded_count} 条有详情的记录")
@@ -222,6 +249,90 @@ class ScraperPipeline:
         
         return stats
     
+    def _full_sweep_marker(self, university: str) -> str:
+        """记录上次完整爬取时间的标记文件（以修改时间为准）"""
+        return os.path.join(self.output_dir, f".{university}_full_sweep")
+    
+    def _full_sweep_due(self, university: str) -> bool:
+        """距上次完整爬取是否已超过 full_sweep_days 天（<= 0 表示不定期完整爬取）"""
+        days = settings.scraper.full_sweep_days
+        if days <= 0:
+            return False
+        marker = self._full_sweep_marker(university)
+        if not os.path.exists(marker):
+            return True
+        last_sweep = datetime.fromtimestamp(os.path.getmtime(marker))
+        return datetime.now() - last_sweep > timedelta(days=days)
+    
+    def _mark_full_sweep(self, university: str):
+        with open(self._full_sweep_marker(university), 'w', encoding='utf-8') as f:
+            f.write(datetime.now().isoformat())
+    
+    def _load_known_ids(self, university: str) -> Set[str]:
+        """
+        增量模式下的已知房源 ID 索引（历史 CSV 中有详情的房源 + 数据库中的房源）
+        
+        返回空集合表示本次完整爬取：未开启增量、强制完整爬取、到了定期完整爬取的时间，
+        或者没有任何已知房源。完整爬取会覆盖下架/排序变化等增量模式看不到的情况。
+        """
+        if not self.incremental:
+            return set()
+        
+        if self.full_sweep or self._full_sweep_due(university):
+            logger.info(f"增量模式: {university} 本次执行完整爬取")
+            return set()
+        
+        if not self._history_cache:
+            self._history_cache = self._load_history_csv(university)
+        known_ids = set(self._history_cache)
+        
+        if self.enable_database and self.db_service:
+            try:
+                with self.db_service.session():
+                    known_ids |= self.db_service.load_existing_house_ids()
+            except Exception as e:
+                logger.warning(f"加载数据库房源ID失败，仅使用历史数据: {e}")
+        
+        if not known_ids:
+            logger.info("增量模式: 没有已知房源，执行完整爬取")
+        else:
+            logger.info(f"增量模式: 已知房源 {len(known_ids)} 个")
+        return known_ids
+    
+    def _with_carried_forward(
+        self,
+        properties: List[PropertyData],
+        university: str,
+        known_ids: Set[str],
+    ) -> List[PropertyData]:
+        """
+        增量爬取时把本次没有重新访问到的历史房源并入导出列表
+        
+        增量模式遇到已知房源为主的页面即停止翻页，后面页面的已知房源不会出现在本次结果中。
+        导出的 {UNI}_rentdata_*.csv 既是下游脚本的输入，也是下次增量爬取的已知房源索引，
+        因此沿用最新历史文件中的其余房源，保持完整快照，直到下一次完整爬取（完整爬取只导出
+        实际爬到的房源，下架的房源随之移除）。
+        """
+        if not known_ids:
+            return properties
+        
+        latest_file = self._latest_history_file(university)
+        if not latest_file:
+            return properties
+        
+        try:
+            history = dataframe_to_properties(read_frame(latest_file))
+        except Exception as e:
+            logger.error(f"加载历史 CSV 失败，导出仅包含本次爬取的房源: {e}")
+            return properties
+        
+        seen = {property_key(prop) for prop in properties}
+        carried = [prop for prop in history if property_key(prop) not in seen]
+        if carried:
+            logger.info(f"增量模式: 沿用 {len(carried)} 个未重新访问的历史房源 ({latest_file})")
+            self.stats['carried_forward'] += len(carried)
+        return properties + carried
+    
     def get_scraper(self, scraper_type: str) -> Optional[BaseScraper]:
         """获取爬虫实例"""
         scraper_class = self.SCRAPERS.get(scraper_type)
@@ -253,6 +364,9 @@ class ScraperPipeline:
         logger.info("=" * 60)
         
         all_properties = []
+        listed: List[Tuple[BaseScraper, str, List[PropertyData]]] = []
+        metrics.reset()
+        known_ids = self._load_known_ids(university)
         
         # Step 1: 爬取各平台数据
         for scraper_type in self.scraper_types:
@@ -264,7 +378,11 @@ class ScraperPipeline:
             if not scraper:
                 continue
             
-            properties = scraper.scrape_by_university(university)
+            scraper.known_ids = known_ids
+            with self._stage(f"listed:{scraper_type}") as stage:
+                properties = scraper.scrape_by_university(university)
+                stage.items = len(properties)
+            self.stats['incremental_stops'] += scraper.incremental_stops
             logger.info(f"{scraper_type.upper()} 爬取完成: {len(properties)} 个房源")
 
             # 导出列表级 CSV（仅列表信息），按 chunk 保存以便确认进度
@@ -301,21 +419,31 @@ class ScraperPipeline:
             logger.info(f"   需要评分: {need_scores} (已复用: {reuse_stats['scores']})")
             logger.info(f"   需要通勤计算: {need_commute} (已复用: {reuse_stats['commute']})")
             
-            # Step 2: 爬取详情页
-            if scrape_details and properties:
-                logger.info(f"\n{'='*60}")
-                logger.info(f"Step 2: 爬取详情页 (仅爬取 {need_details} 个新房源)")
-                logger.info(f"{'='*60}")
-                
-                properties = scraper.scrape_property_details(
-                    properties, 
+            listed.append((scraper, scraper_type, properties))
+            all_properties.extend(properties)
+        
+        # Step 1.6: 跨来源去重，重复房源只处理代表房源
+        dedupe = self._link_duplicates(all_properties)
+        
+        # Step 2: 爬取详情页
+        for scraper, scraper_type, properties in listed:
+            targets = [p for p in properties if dedupe.is_canonical(p)]
+            if not (scrape_details and targets):
+                continue
+            
+            need_details = sum(1 for p in targets if not p.description_en)
+            logger.info(f"\n{'='*60}")
+            logger.info(f"Step 2: {scraper_type.upper()} 爬取详情页 (仅爬取 {need_details} 个新房源)")
+            logger.info(f"{'='*60}")
+            
+            with self._stage(f"detailed:{scraper_type}") as stage:
+                scraper.scrape_property_details(
+                    targets, 
                     skip_existing=skip_existing
                 )
-                self.stats['total_with_details'] += sum(
-                    1 for p in properties if p.description_en
-                )
-            
-            all_properties.extend(properties)
+                stage.items = need_details
+        dedupe.propagate()
+        self.stats['total_with_details'] = sum(1 for p in all_properties if p.description_en)
         
         self.stats['total_scraped'] = len(all_properties)
         logger.info(f"\n总共爬取: {len(all_properties)} 个房源")
@@ -324,16 +452,24 @@ class ScraperPipeline:
             logger.warning("没有爬取到任何数据")
             return []
         
+        # 完整爬取成功后记录时间，供增量模式判断下次完整爬取
+        if self.incremental and not known_ids:
+            self._mark_full_sweep(university)
+        
         # Step 3: 评分
         if self.enable_scoring and self.scoring_service:
             logger.info(f"\n{'='*60}")
             logger.info("Step 3: 房产评分")
             logger.info(f"{'='*60}")
             
-            all_properties = self.scoring_service.process_properties(
-                all_properties,
-                skip_existing=skip_existing
-            )
+            targets = dedupe.canonical(all_properties)
+            with self._stage("scored") as stage:
+                stage.items = sum(
+                    1 for p in targets
+                    if self.scoring_service.needs_processing(p, skip_existing)
+                )
+                self._score_properties(targets, skip_existing)
+            dedupe.propagate()
             self.stats['total_scored'] = sum(
                 1 for p in all_properties if p.average_score
             )
@@ -344,11 +480,18 @@ class ScraperPipeline:
             logger.info("Step 4: 计算通勤时间")
             logger.info(f"{'='*60}")
             
-            all_properties = self.commute_service.process_properties(
-                all_properties,
-                university=university,
-                skip_existing=skip_existing
-            )
+            targets = dedupe.canonical(all_properties)
+            with self._stage(f"commuted:{university}") as stage:
+                stage.items = sum(
+                    1 for p in targets
+                    if not (skip_existing and p.commute_times.get(university) is not None)
+                )
+                self.commute_service.process_properties(
+                    targets,
+                    university=university,
+                    skip_existing=skip_existing
+                )
+            dedupe.propagate()
             self.stats['total_with_commute'] = sum(
                 1 for p in all_properties if p.commute_times.get(university)
             )
@@ -359,7 +502,8 @@ class ScraperPipeline:
             logger.info("Step 5: 保存到数据库")
             logger.info(f"{'='*60}")
             
-            with self.db_service.session():
+            with self._stage(f"saved:{university}") as stage, self.db_service.session():
+                stage.items = len(all_properties)
                 save_stats = self.db_service.save_properties(
                     all_properties, 
                     university
@@ -373,13 +517,550 @@ class ScraperPipeline:
         logger.info("Step 6: 导出 CSV")
         logger.info(f"{'='*60}")
         
-        csv_file = self.export_to_csv(all_properties, university)
+        with self._stage("exported") as stage:
+            exported = self._with_carried_forward(all_properties, university, known_ids)
+            stage.items = len(exported)
+            csv_file = self.export_to_csv(exported, university)
         
         # 打印统计信息
+        self._export_metrics(university)
         self._print_stats(university, csv_file)
         
         return all_properties
     
+    def _link_duplicates(self, properties: List[PropertyData]) -> DuplicateIndex:
+        """识别跨来源重复房源；禁用时返回空索引（所有房源各自处理）"""
+        index = DuplicateIndex(
+            source_order=list(self.scraper_types),
+            price_tolerance=settings.dedupe_price_tolerance,
+        )
+        if settings.dedupe_enabled and len(self.scraper_types) > 1:
+            with self._stage("deduped") as stage:
+                index.link(properties)
+                stage.items = len(properties)
+            # 重复房源从代表房源获得历史复用的详情/评分/通勤
+            index.propagate()
+            self.stats['cross_source_duplicates'] = index.duplicate_count
+        return index
+    
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[StageTimer]:
+        """流水线阶段：记录指标，启用剖析时同时做采样剖析"""
+        profiling = self.profiler.stage(name) if self.profiler else nullcontext()
+        with metrics.stage(name) as stage, profiling:
+            yield stage
+    
+    def _score_properties(self, properties: List[PropertyData], skip_existing: bool) -> List[PropertyData]:
+        """评分（按配置选择 asyncio 引擎或线程池）"""
+        if self.scoring_service.config.async_enabled:
+            return asyncio.run(self.scoring_service.aprocess_properties(
+                properties,
+                skip_existing=skip_existing
+            ))
+        return self.scoring_service.process_properties(
+            properties,
+            skip_existing=skip_existing
+        )
+    
+    def _load_history_for(self, universities: List[str]) -> Dict[str, dict]:
+        """合并多所大学的历史数据（详情/评分相同，通勤时间按大学合并）"""
+        merged: Dict[str, dict] = {}
+        for university in universities:
+            for house_id, hist in self._load_history_csv(university).items():
+                if house_id in merged:
+                    merged[house_id]['commute_times'].update(hist['commute_times'])
+                else:
+                    merged[house_id] = hist
+        return merged
+    
+    def _open_checkpoint(self, label: str) -> Optional[str]:
+        """打开检查点并确定本次的 run_id（resume 时沿用最近一次未完成的运行）"""
+        if self.checkpoints is None:
+            if not settings.checkpoint_enabled:
+                return None
+            try:
+                self.checkpoints = CheckpointStore(settings.checkpoint_path)
+                self.checkpoints.prune(settings.checkpoint_retention_days)
+            except Exception as e:
+                logger.warning(f"检查点初始化失败，本次不记录进度: {e}")
+                return None
+        
+        if self.resume:
+            run_id = self.checkpoints.latest_unfinished(label)
+            if run_id:
+                logger.info(f"从检查点恢复: {run_id}")
+                return run_id
+            logger.info("没有未完成的运行，重新开始")
+        return self.checkpoints.start_run(label)
+    
+    def _checkpoint(self, run_id: Optional[str], stage: str, properties: List[PropertyData]):
+        if run_id and properties:
+            try:
+                self.checkpoints.record(run_id, stage, properties)
+            except Exception as e:
+                logger.warning(f"写入检查点失败 ({stage}): {e}")
+    
+    def _run_stage(
+        self,
+        name: str,
+        properties: List[PropertyData],
+        run_id: Optional[str],
+        process: Callable[[List[PropertyData]], List[PropertyData]],
+    ) -> None:
+        """
+        分批执行一个阶段，每批完成后写入检查点；resume 时跳过已完成的房源
+        
+        process 会就地更新房源（评分/通勤/入库服务都是如此）
+        """
+        done = self.checkpoints.completed(run_id, name) if run_id and self.resume else set()
+        pending = [p for p in properties if property_key(p) not in done]
+        if done:
+            logger.info(f"[{name}] 检查点中已完成 {len(properties) - len(pending)} 个，剩余 {len(pending)} 个")
+        
+        chunk = max(1, settings.checkpoint_every) if run_id else max(1, len(pending))
+        with self._stage(name) as stage:
+            for i in range(0, len(pending), chunk):
+                batch = pending[i:i + chunk]
+                process(batch)
+                self._checkpoint(run_id, name, batch)
+                stage.items += len(batch)
+    
+    def _plan_listings(
+        self,
+        scraper: BaseScraper,
+        scraper_type: str,
+        plan: CrawlPlan,
+        run_id: Optional[str],
+    ) -> List[PropertyData]:
+        """爬取（或从检查点恢复）一个来源的列表，并按区域分配给各大学"""
+        groups = plan.search_groups(scraper)
+        
+        if run_id and self.resume and self.checkpoints.is_marked(run_id, f"listed:{scraper_type}"):
+            properties = self.checkpoints.load(run_id, scraper.SOURCE)
+            logger.info(f"{scraper_type.upper()} 列表从检查点恢复: {len(properties)} 个房源")
+            return plan.assign(properties, groups)
+        
+        with self._stage(f"listed:{scraper_type}") as stage:
+            properties = plan.assign(scraper.scrape_areas(list(groups)), groups)
+            stage.items = len(properties)
+        self.stats['incremental_stops'] += scraper.incremental_stops
+        self._checkpoint(run_id, 'listed', properties)
+        if run_id:
+            self.checkpoints.mark(run_id, f"listed:{scraper_type}")
+        return properties
+    
+    def run_plan(
+        self,
+        universities: List[str],
+        scrape_details: bool = True,
+        skip_existing: bool = True
+    ) -> Dict[str, List[PropertyData]]:
+        """
+        按区域运行流水线：所有大学的区域取并集，每个搜索页只爬一次，
+        每个房源只爬一次详情、评一次分，再按区域分发给各大学计算通勤、入库和导出
+        
+        每个房源完成的阶段实时写入检查点；resume=True 时从最近一次未完成的运行继续，
+        跳过已完成的列表、详情、评分、通勤和入库。
+        
+        Args:
+            universities: 大学代码列表
+            scrape_details: 是否爬取详情页
+            skip_existing: 是否跳过已有数据
+            
+        Returns:
+            大学 -> 该大学的房产数据列表
+        """
+        plan = CrawlPlan.build(universities)
+        label = plan.label
+        
+        logger.info("=" * 60)
+        logger.info(f"开始 Pipeline (按区域): {label}")
+        logger.info(f"爬虫类型: {self.scraper_types}")
+        logger.info("=" * 60)
+        
+        metrics.reset()
+        run_id = self._open_checkpoint(label)
+        self._history_cache = self._load_history_for(plan.universities)
+        known_ids = self._load_known_ids(label)
+        all_properties: List[PropertyData] = []
+        listed: List[Tuple[BaseScraper, str, List[PropertyData]]] = []
+        
+        # Step 1: 按区域爬取列表（每个搜索页只爬一次）
+        for scraper_type in self.scraper_types:
+            scraper = self.get_scraper(scraper_type)
+            if not scraper:
+                continue
+            
+            logger.info(f"\n{'='*60}")
+            logger.info(f"Step 1: 使用 {scraper_type.upper()} 爬虫爬取 {len(plan.areas)} 个区域")
+            logger.info(f"{'='*60}")
+            
+            scraper.known_ids = known_ids
+            properties = self._plan_listings(scraper, scraper_type, plan, run_id)
+            logger.info(f"{scraper_type.upper()} 爬取完成: {len(properties)} 个房源")
+            
+            if self.auto_save_list and properties:
+                self.stats['list_parts_saved'] += self._save_list_chunks(properties, label, scraper_type)
+            self._save_merged_list_csv(properties, label, scraper_type)
+            
+            reuse_stats = self._apply_history_data(properties, label)
+            self.stats['copied_from_history'] += reuse_stats['details']
+            self.stats['copied_scores'] = self.stats.get('copied_scores', 0) + reuse_stats['scores']
+            self.stats['copied_commute'] = self.stats.get('copied_commute', 0) + reuse_stats['commute']
+            
+            listed.append((scraper, scraper_type, properties))
+            all_properties.extend(properties)
+        
+        # 跨来源去重：每个物理房源只爬一次详情、评一次分、算一次通勤
+        dedupe = self._link_duplicates(all_properties)
+        
+        # Step 2: 爬取详情页（每个房源只处理一次）
+        if scrape_details:
+            detailed = self.checkpoints.completed(run_id, 'detailed') if run_id and self.resume else set()
+            for scraper, scraper_type, properties in listed:
+                pending = [
+                    p for p in properties
+                    if dedupe.is_canonical(p) and property_key(p) not in detailed
+                ]
+                if not pending:
+                    continue
+                
+                logger.info(f"\n{'='*60}")
+                logger.info(f"Step 2: {scraper_type.upper()} 爬取详情页 ({sum(1 for p in pending if not p.description_en)} 个新房源)")
+                logger.info(f"{'='*60}")
+                
+                # 逐个记录完成详情的房源（详情爬取失败的不记录，resume 时重试）
+                with self._stage(f"detailed:{scraper_type}") as stage:
+                    for prop in scraper.iter_property_details(pending, skip_existing=skip_existing):
+                        if prop.description_en:
+                            self._checkpoint(run_id, 'detailed', [prop])
+                        stage.items += 1
+            dedupe.propagate()
+        
+        self.stats['total_scraped'] = len(all_properties)
+        self.stats['total_with_details'] = sum(1 for p in all_properties if p.description_en)
+        
+        if not all_properties:
+            logger.warning("没有爬取到任何数据")
+            return {}
+        
+        if self.incremental and not known_ids:
+            self._mark_full_sweep(label)
+        
+        # Step 3: 评分（与大学无关，所有房源一次完成）
+        if self.enable_scoring and self.scoring_service:
+            logger.info(f"\n{'='*60}")
+            logger.info("Step 3: 房产评分")
+            logger.info(f"{'='*60}")
+            self._run_stage(
+                'scored', dedupe.canonical(all_properties), run_id,
+                lambda batch: self._score_properties(batch, skip_existing),
+            )
+            dedupe.propagate()
+            self.stats['total_scored'] = sum(1 for p in all_properties if p.average_score)
+        
+        # Step 4-6: 按大学计算通勤、入库、导出
+        results: Dict[str, List[PropertyData]] = {}
+        csv_files = []
+        failed: List[str] = []
+        self.stats['total_with_commute'] = 0
+        self.stats['total_saved'] = 0
+        
+        for university in plan.universities:
+            members = plan.members(all_properties, university)
+            logger.info(f"\n{'='*60}")
+            logger.info(f"{university}: {len(members)} 个房源")
+            logger.info(f"{'='*60}")
+            if not members:
+                continue
+            
+            try:
+                if self.enable_commute and self.commute_service:
+                    self._run_stage(
+                        f"commuted:{university}", dedupe.canonical(members), run_id,
+                        lambda batch: self.commute_service.process_properties(
+                            batch, university=university, skip_existing=skip_existing
+                        ),
+                    )
+                    dedupe.propagate()
+                    self.stats['total_with_commute'] += sum(
+                        1 for p in members if p.commute_times.get(university)
+                    )
+                
+                if self.enable_database and self.db_service:
+                    with self.db_service.session():
+                        def save(batch: List[PropertyData]):
+                            save_stats = self.db_service.save_properties(batch, university)
+                            self.stats['total_saved'] += save_stats['inserted'] + save_stats['updated']
+                            # 每批单独提交，与检查点保持一致
+                            self.db_service.commit()
+                        self._run_stage(f"saved:{university}", members, run_id, save)
+                
+                with self._stage("exported") as stage:
+                    exported = self._with_carried_forward(members, university, known_ids)
+                    stage.items = len(exported)
+                    csv_files.append(self.export_to_csv(exported, university))
+                results[university] = members
+            except Exception as e:
+                logger.error(f"处理 {university} 失败: {e}")
+                failed.append(university)
+        
+        # 有大学失败时保留检查点，--resume 只重做未完成的部分
+        if run_id and failed:
+            logger.warning(f"{', '.join(failed)} 处理失败，检查点已保留，使用 --resume 重试")
+        elif run_id:
+            self.checkpoints.finish_run(run_id)
+        
+        self._export_metrics(label)
+        self._print_stats(label, ", ".join(csv_files))
+        return results
+    
+    def run_streaming(
+        self,
+        university: str,
+        scrape_details: bool = True,
+        skip_existing: bool = True
+    ) -> List[PropertyData]:
+        """
+        流式运行爬虫流水线
+        
+        每个房源爬完详情后立即进入评分 -> 通勤 -> 入库队列，
+        各阶段在不同线程中并发处理不同房源，队列有界以控制内存和背压。
+        总耗时接近最慢的单个阶段，而不是各阶段之和。
+        
+        Args:
+            university: 大学代码 (UNSW, USYD, UTS)
+            scrape_details: 是否爬取详情页
+            skip_existing: 是否跳过已有数据
+            
+        Returns:
+            处理后的房产数据列表
+        """
+        logger.info("=" * 60)
+        logger.info(f"开始流式 Pipeline: {university}")
+        logger.info(f"爬虫类型: {self.scraper_types}")
+        logger.info("=" * 60)
+        
+        if self.profiler:
+            # 各阶段在不同线程中同时运行，采样剖析和内存快照无法按阶段区分
+            raise ValueError("流式模式不支持性能剖析 (--profile)，请使用非流式模式")
+        
+        all_properties: List[PropertyData] = []
+        save_stats = {'inserted': 0, 'updated': 0}
+        metrics.reset()
+        
+        # 构建下游阶段: (名称, 处理函数, 线程数, 指标阶段名)
+        stages = []
+        if self.enable_scoring and self.scoring_service:
+            def score(prop: PropertyData):
+                if self.scoring_service.needs_processing(prop, skip_existing=skip_existing):
+                    self.scoring_service.process_property(prop)
+            stages.append(('评分', score, self.scoring_service.config.max_workers, 'scored'))
+        
+        if self.enable_commute and self.commute_service and self.commute_service.gmaps:
+            def commute(prop: PropertyData):
+                if skip_existing and prop.commute_times.get(university) is not None:
+                    return
+                self.commute_service.process_property(prop, university)
+            stages.append(('通勤', commute, self.commute_service.config.max_workers, f"commuted:{university}"))
+        
+        if self.enable_database and self.db_service:
+            stages.append(('入库', None, 1, f"saved:{university}"))
+        
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        threads = []
+        # 各阶段的处理数量和结束时间，全部结束后记为阶段指标
+        progress = [{'count': 0, 'items': 0, 'finished_at': None} for _ in stages]
+        started = time.perf_counter()
+        
+        for index, (name, handler, workers, _) in enumerate(stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(stages) else None
+            downstream_workers = stages[index + 1][2] if outbox is not None else 0
+            finished = progress[index]
+            
+            if handler is None:
+                target = self._stream_db_writer
+                args = (inbox, university, save_stats, finished)
+                workers = 1
+            else:
+                lock = threading.Lock()
+                target = self._stream_worker
+                args = (name, handler, inbox, outbox, workers, downstream_workers, finished, lock)
+            
+            for i in range(workers):
+                thread = threading.Thread(
+                    target=target, args=args, name=f"stream-{name}-{i}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+        
+        first_inbox = queues[0] if queues else None
+        first_workers = stages[0][2] if stages else 0
+        
+        def emit(prop: PropertyData):
+            all_properties.append(prop)
+            if first_inbox is not None:
+                first_inbox.put(prop)
+        
+        try:
+            known_ids = self._load_known_ids(university)
+            
+            for scraper_type in self.scraper_types:
+                scraper = self.get_scraper(scraper_type)
+                if not scraper:
+                    continue
+                
+                logger.info(f"\n{'='*60}")
+                logger.info(f"使用 {scraper_type.upper()} 爬虫爬取列表")
+                logger.info(f"{'='*60}")
+                
+                scraper.known_ids = known_ids
+                with self._stage(f"listed:{scraper_type}") as stage:
+                    properties = scraper.scrape_by_university(university)
+                    stage.items = len(properties)
+                self.stats['incremental_stops'] += scraper.incremental_stops
+                logger.info(f"{scraper_type.upper()} 爬取完成: {len(properties)} 个房源")
+                
+                if self.auto_save_list and properties:
+                    self.stats['list_parts_saved'] += self._save_list_chunks(
+                        properties, university, scraper_type
+                    )
+                self._save_merged_list_csv(properties, university, scraper_type)
+                
+                reuse_stats = self._apply_history_data(properties, university)
+                self.stats['copied_from_history'] += reuse_stats['details']
+                self.stats['copied_scores'] = self.stats.get('copied_scores', 0) + reuse_stats['scores']
+                self.stats['copied_commute'] = self.stats.get('copied_commute', 0) + reuse_stats['commute']
+                
+                # 已有详情（或不爬详情）的房源直接进入下游
+                pending = []
+                for prop in properties:
+                    if scrape_details and not (skip_existing and prop.description_en):
+                        pending.append(prop)
+                    else:
+                        emit(prop)
+                
+                if pending:
+                    logger.info(f"流式爬取 {len(pending)} 个房源详情")
+                    with self._stage(f"detailed:{scraper_type}") as stage:
+                        for prop in scraper.iter_property_details(pending, skip_existing=skip_existing):
+                            emit(prop)
+                            stage.items += 1
+                    
+                    # 详情爬取中途失败时，未 yield 的房源仍需进入下游
+                    emitted = {id(p) for p in all_properties}
+                    for prop in pending:
+                        if id(prop) not in emitted:
+                            emit(prop)
+        finally:
+            for _ in range(first_workers):
+                first_inbox.put(_STREAM_END)
+            for thread in threads:
+                thread.join()
+            # 下游阶段与列表/详情爬取并发，耗时从流水线启动算起
+            for (_, _, _, stage_name), finished in zip(stages, progress):
+                ended = finished['finished_at'] or time.perf_counter()
+                metrics.record_stage(stage_name, ended - started, finished['items'])
+        
+        self.stats['total_scraped'] = len(all_properties)
+        self.stats['total_with_details'] = sum(1 for p in all_properties if p.description_en)
+        if self.enable_scoring and self.scoring_service:
+            self.stats['total_scored'] = sum(1 for p in all_properties if p.average_score)
+        if self.enable_commute and self.commute_service:
+            self.stats['total_with_commute'] = sum(
+                1 for p in all_properties if p.commute_times.get(university)
+            )
+        self.stats['total_saved'] = save_stats['inserted'] + save_stats['updated']
+        
+        if not all_properties:
+            logger.warning("没有爬取到任何数据")
+            return []
+        
+        # 完整爬取成功后记录时间，供增量模式判断下次完整爬取
+        if self.incremental and not known_ids:
+            self._mark_full_sweep(university)
+        
+        with self._stage("exported") as stage:
+            exported = self._with_carried_forward(all_properties, university, known_ids)
+            stage.items = len(exported)
+            csv_file = self.export_to_csv(exported, university)
+        self._export_metrics(university)
+        self._print_stats(university, csv_file)
+        
+        return all_properties
+    
+    def _stream_worker(
+        self,
+        name: str,
+        handler: Callable[[PropertyData], None],
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        workers: int,
+        downstream_workers: int,
+        finished: dict,
+        lock: threading.Lock,
+    ):
+        """流式阶段工作线程：处理后转发到下一阶段，最后一个退出的线程负责通知下游结束"""
+        while True:
+            prop = inbox.get()
+            if prop is _STREAM_END:
+                break
+            
+            try:
+                handler(prop)
+                with lock:
+                    finished['items'] += 1
+            except Exception as e:
+                logger.error(f"{name}阶段处理失败 ({prop.house_id}): {e}")
+            
+            if outbox is not None:
+                outbox.put(prop)
+        
+        with lock:
+            finished['count'] += 1
+            is_last = finished['count'] == workers
+            if is_last:
+                finished['finished_at'] = time.perf_counter()
+        
+        if is_last and outbox is not None:
+            for _ in range(downstream_workers):
+                outbox.put(_STREAM_END)
+    
+    def _stream_db_writer(self, inbox: queue.Queue, university: str, save_stats: dict, finished: dict):
+        """流式入库线程：按 chunk_save_size 分批写入数据库，写入条数和结束时间记入 finished"""
+        batch: List[PropertyData] = []
+        batch_size = self.chunk_save_size or 100
+        
+        def flush():
+            if not batch:
+                return
+            try:
+                result = self.db_service.save_properties(batch, university)
+                save_stats['inserted'] += result['inserted']
+                save_stats['updated'] += result['updated']
+                finished['items'] += len(batch)
+            except Exception as e:
+                logger.error(f"流式入库失败 ({len(batch)} 条): {e}")
+            batch.clear()
+        
+        try:
+            with self.db_service.session():
+                while True:
+                    prop = inbox.get()
+                    if prop is _STREAM_END:
+                        break
+                    batch.append(prop)
+                    if len(batch) >= batch_size:
+                        flush()
+                flush()
+        except Exception as e:
+            logger.error(f"流式入库线程异常，后续房源不再入库: {e}")
+            # 继续消费队列，避免上游阻塞
+            while inbox.get() is not _STREAM_END:
+                pass
+        finished['finished_at'] = time.perf_counter()
+    
     def export_to_csv(
         self, 
         properties: List[PropertyData], 
@@ -403,36 +1084,8 @@ class ScraperPipeline:
         filepath = os.path.join(self.output_dir, filename)
         
         # 转换为 DataFrame
-        data = []
-        for prop in properties:
-            row = {
-                'pricePerWeek': prop.price_per_week,
-                'addressLine1': prop.address_line1,
-                'addressLine2': prop.address_line2,
-                'bedroomCount': prop.bedroom_count,
-                'bathroomCount': prop.bathroom_count,
-                'parkingCount': prop.parking_count,
-                'propertyType': prop.property_type,
-                'houseId': prop.house_id,
-                'url': prop.url,
-                'description_en': prop.description_en,
-                'description_cn': prop.description_cn,
-                'keywords': prop.keywords,
-                'average_score': prop.average_score,
-                'available_date': prop.available_date,
-                'published_at': prop.published_at,
-                'thumbnail_url': prop.thumbnail_url,
-                'source': prop.source.value,
-            }
-            
-            # 添加通勤时间
-            for uni, commute_time in prop.commute_times.items():
-                row[f'commuteTime_{uni}'] = commute_time
-            
-            data.append(row)
-        
-        df = pd.DataFrame(data)
-        df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        df = properties_to_dataframe(properties)
+        filepath = export_frame(df, filepath)
         logger.info(f"数据已导出到: {filepath}")
         
         return filepath
@@ -474,7 +1127,7 @@ class ScraperPipeline:
                 data.append(row)
 
             df = pd.DataFrame(data)
-            df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            filepath = export_frame(df, filepath)
             logger.info(f"列表分段已导出: {filepath} (items: {len(part_props)})")
             parts += 1
 
@@ -521,7 +1174,7 @@ class ScraperPipeline:
             data.append(row)
         
         df = pd.DataFrame(data)
-        df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        filepath = export_frame(df, filepath)
         
         # 统计对比结果
         has_detail = sum(1 for p in properties if p.description_en)
@@ -545,51 +1198,38 @@ class ScraperPipeline:
             房产数据列表
         """
         if not os.path.exists(filepath):
-            logger.error(f"文件不存在: {filepath}")
-            return []
-        
-        df = pd.read_csv(filepath)
-        properties = []
+            # 只输出了 Parquet 时，按同名 .parquet 查找
+            matches = find_frames(filepath)
+            if not matches:
+                logger.error(f"文件不存在: {filepath}")
+                return []
+            filepath = matches[0]
         
-        for _, row in df.iterrows():
-            # 确定数据来源
-            source_str = row.get('source', 'domain')
-            try:
-                source = PropertySource(source_str)
-            except:
-                source = PropertySource.DOMAIN
-            
-            prop = PropertyData(
-                house_id=str(row.get('houseId', '')),
-                source=source,
-                price_per_week=int(row.get('pricePerWeek', 0)),
-                address_line1=str(row.get('addressLine1', '')),
-                address_line2=str(row.get('addressLine2', '')),
-                bedroom_count=int(row.get('bedroomCount', 0)),
-                bathroom_count=int(row.get('bathroomCount', 0)),
-                parking_count=int(row.get('parkingCount', 0)),
-                property_type=int(row.get('propertyType', 1)),
-                url=str(row.get('url', '')),
-                description_en=str(row.get('description_en', '')) if pd.notna(row.get('description_en')) else None,
-                description_cn=str(row.get('description_cn', '')) if pd.notna(row.get('description_cn')) else None,
-                keywords=str(row.get('keywords', '')) if pd.notna(row.get('keywords')) else None,
-                average_score=float(row.get('average_score', 0)) if pd.notna(row.get('average_score')) else None,
-                thumbnail_url=str(row.get('thumbnail_url', '')) if pd.notna(row.get('thumbnail_url')) else None,
-            )
-            
-            # 加载通勤时间
-            for col in df.columns:
-                if col.startswith('commuteTime_'):
-                    uni = col.replace('commuteTime_', '')
-                    value = row.get(col)
-                    if pd.notna(value):
-                        prop.commute_times[uni] = int(value)
-            
-            properties.append(prop)
+        df = read_frame(filepath)
+        properties = dataframe_to_properties(df, default_source=PropertySource.DOMAIN)
         
         logger.info(f"从 CSV 加载 {len(properties)} 个房源")
         return properties
     
+    def _export_metrics(self, label: str):
+        """写出本次运行的指标：Prometheus textfile（每次覆盖）和带时间戳的 JSON"""
+        if not settings.metrics_enabled:
+            return
+        
+        metrics_dir = settings.metrics_dir or os.path.join(self.output_dir, 'metrics')
+        try:
+            prom_file = metrics.write_textfile(
+                os.path.join(metrics_dir, f"scraper_{label}.prom"),
+                run_labels={'run': label},
+            )
+            json_file = metrics.write_json(
+                os.path.join(metrics_dir, f"{label}_{datetime.now().strftime('%y%m%d_%H%M%S')}.json"),
+                extra={'run': label, 'stats': self.stats},
+            )
+            logger.info(f"指标已导出: {prom_file}, {json_file}")
+        except Exception as e:
+            logger.warning(f"导出指标失败: {e}")
+    
     def _print_stats(self, university: str, csv_file: str):
         """打印统计信息"""
         print("\n" + "=" * 60)
@@ -605,6 +1245,14 @@ class ScraperPipeline:
         print(f"有通勤时间: {self.stats['total_with_commute']}")
         print(f"已保存数量: {self.stats['total_saved']}")
         print(f"列表分段数: {self.stats.get('list_parts_saved', 0)}")
+        if self.incremental:
+            print(f"增量停止翻页: {self.stats.get('incremental_stops', 0)} 个区域")
+            print(f"沿用历史房源: {self.stats.get('carried_forward', 0)} 个")
+        if self.stats.get('cross_source_duplicates'):
+            print(f"跨来源重复: {self.stats['cross_source_duplicates']} 个 (共享详情/评分/通勤)")
+        routing = routing_totals(reset=True)
+        if routing.allowed or routing.blocked:
+            print(f"请求拦截: {routing.summary()}")
         print(f"CSV 文件: {csv_file}")
         print("=" * 60 + "\n")
 
@@ -614,20 +1262,22 @@ def run_full_pipeline(
     scraper_types: List[str] = None,
     enable_scoring: bool = True,
     enable_commute: bool = True,
-    enable_database: bool = True
+    enable_database: bool = True,
+    streaming: bool = False
 ):
     """
     运行完整的爬虫流水线
     
     Args:
-        universities: 大学列表，默认 ['UNSW', 'USYD']
+        universities: 大学列表，默认 ['UNSW', 'USYD', 'UTS']
         scraper_types: 爬虫类型，默认全部
         enable_scoring: 是否评分
         enable_commute: 是否计算通勤时间
         enable_database: 是否保存数据库
+        streaming: 是否使用流式模式（各阶段并发处理，按大学逐个运行）
     """
     if universities is None:
-        universities = ['UNSW', 'USYD']
+        universities = ['UNSW', 'USYD', 'UTS']
     
     pipeline = ScraperPipeline(
         scraper_types=scraper_types,
@@ -636,80 +1286,14 @@ def run_full_pipeline(
         enable_database=enable_database
     )
     
+    if not streaming:
+        # 按区域爬取：重叠区域只爬一次，房源分发给所有相关大学
+        return pipeline.run_plan(universities)
+    
+    results = {}
     for university in universities:
         try:
-            pipeline.run(university)
+            results[university] = pipeline.run_streaming(university)
         except Exception as e:
             logger.error(f"处理 {university} 失败: {e}")
-    
-    # 处理 UTS (复制 USYD 数据并计算通勤时间)
-    if 'USYD' in universities and 'UTS' not in universities:
-        logger.info("\n" + "=" * 60)
-        logger.info("处理 UTS (基于 USYD 数据)")
-        logger.info("=" * 60)
-        
-        current_date = datetime.now().strftime('%y%m%d')
-        usyd_file = os.path.join(pipeline.output_dir, f"USYD_rentdata_{current_date}.csv")
-        uts_file = os.path.join(pipeline.output_dir, f"UTS_rentdata_{current_date}.csv")
-        
-        if os.path.exists(usyd_file):
-            logger.info(f"从 USYD 数据复制: {usyd_file}")
-            
-            # 加载 USYD 数据
-            properties = pipeline.load_from_csv(usyd_file)
-            logger.info(f"加载了 {len(properties)} 个房源")
-            
-            # 从历史 UTS CSV 复用已有的通勤时间
-            logger.info("\n从历史 UTS 数据复用通勤时间...")
-            history_cache = pipeline._load_history_csv('UTS')
-            
-            reused_count = 0
-            for prop in properties:
-                if prop.house_id and str(prop.house_id) in history_cache:
-                    hist = history_cache[str(prop.house_id)]
-                    # 复用 UTS 通勤时间
-                    if 'UTS' in hist.get('commute_times', {}):
-                        prop.commute_times['UTS'] = hist['commute_times']['UTS']
-                        reused_count += 1
-            
-            logger.info(f"复用了 {reused_count} 个房源的 UTS 通勤时间")
-            
-            # 统计需要计算通勤时间的房源
-            need_commute = sum(1 for p in properties if 'UTS' not in p.commute_times)
-            have_commute = len(properties) - need_commute
-            
-            logger.info(f"\n📊 UTS 通勤时间状态:")
-            logger.info(f"   总房源数: {len(properties)}")
-            logger.info(f"   已有通勤时间: {have_commute} (复用: {reused_count})")
-            logger.info(f"   需要计算: {need_commute}")
-            
-            # 只计算缺少 UTS 通勤时间的房源
-            if need_commute > 0 and pipeline.enable_commute and pipeline.commute_service:
-                logger.info(f"\n计算 {need_commute} 个房源的 UTS 通勤时间...")
-                properties = pipeline.commute_service.process_properties(
-                    properties,
-                    university='UTS',
-                    skip_existing=True  # 跳过已有通勤时间的
-                )
-                
-                # 统计计算后的结果
-                final_with_commute = sum(1 for p in properties if 'UTS' in p.commute_times)
-                logger.info(f"计算完成，现在有 {final_with_commute} 个房源有 UTS 通勤时间")
-            else:
-                logger.info("所有房源都已有 UTS 通勤时间，跳过计算")
-            
-            # 保存到数据库
-            if pipeline.enable_database and pipeline.db_service:
-                logger.info("\n保存到数据库...")
-                with pipeline.db_service.session():
-                    pipeline.db_service.save_properties(properties, 'UTS')
-            
-            # 导出 CSV
-            logger.info(f"\n导出 UTS 数据到: {uts_file}")
-            pipeline.export_to_csv(properties, 'UTS')
-            logger.info(f"✅ UTS 数据处理完成")
-        else:
-            logger.warning(f"未找到 USYD 数据文件: {usyd_file}")
-            logger.warning("无法生成 UTS 数据")
-
-
+    return results
@@ -0,0 +1,113 @@
+"""
+爬取计划
+多所大学的目标区域有大量重叠（如 newtown 同时属于 UNSW / USYD / UTS），
+按区域而不是按大学组织爬取：所有大学的区域取并集，每个搜索 URL 只爬一次，
+再把房源分发给区域列表包含它的每所大学，用于通勤计算和数据库关联。
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import TARGET_AREAS
+from .models import PropertyData
+from .scrapers import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CrawlPlan:
+    """
+    区域 -> 大学 的映射
+
+    用法:
+        plan = CrawlPlan.build(['UNSW', 'USYD', 'UTS'])
+        groups = plan.search_groups(scraper)
+        properties = scraper.scrape_areas(list(groups))
+        plan.assign(properties, groups)
+        unsw_properties = plan.members(properties, 'UNSW')
+    """
+    universities: List[str]
+    area_universities: Dict[str, List[str]] = field(default_factory=dict)
+    # (来源, house_id) -> 所属大学
+    memberships: Dict[Tuple[str, str], Set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        universities: Iterable[str],
+        target_areas: Optional[Dict[str, List[str]]] = None,
+    ) -> 'CrawlPlan':
+        """按大学的目标区域构建计划，区域保持首次出现的顺序"""
+        target_areas = TARGET_AREAS if target_areas is None else target_areas
+        plan = cls(universities=list(universities))
+
+        for university in plan.universities:
+            areas = target_areas.get(university, [])
+            if not areas:
+                logger.warning(f"未找到大学 {university} 的目标区域配置")
+            for area in areas:
+                owners = plan.area_universities.setdefault(area, [])
+                if university not in owners:
+                    owners.append(university)
+
+        total = sum(len(target_areas.get(u, [])) for u in plan.universities)
+        logger.info(f"爬取计划: {len(plan.universities)} 所大学, {total} 个区域去重后 {len(plan.areas)} 个")
+        return plan
+
+    @property
+    def areas(self) -> List[str]:
+        """所有大学区域的并集"""
+        return list(self.area_universities)
+
+    @property
+    def label(self) -> str:
+        """用于输出文件名的计划标识，如 UNSW-USYD-UTS"""
+        return "-".join(self.universities)
+
+    def search_groups(self, scraper: BaseScraper) -> Dict[str, List[str]]:
+        """
+        按搜索 URL 分组区域：不同区域可能对应同一个搜索页（如 REA 按邮编搜索，
+        waterloo-nsw-2017 与 zetland-nsw-2017 都是 in-2017），每组只爬代表区域
+
+        Returns:
+            代表区域 -> 同一搜索 URL 的所有区域
+        """
+        by_url: Dict[str, List[str]] = {}
+        for area in self.areas:
+            by_url.setdefault(scraper.get_search_url(area), []).append(area)
+
+        groups = {areas[0]: areas for areas in by_url.values()}
+        if len(groups) < len(self.areas):
+            logger.info(f"{scraper.SOURCE.value}: {len(self.areas)} 个区域对应 {len(groups)} 个搜索页")
+        return groups
+
+    def assign(self, properties: List[PropertyData], groups: Dict[str, List[str]]) -> List[PropertyData]:
+        """
+        记录每个房源所属的大学，并去掉在多个搜索页中重复出现的房源
+
+        Returns:
+            去重后的房源列表
+        """
+        unique: List[PropertyData] = []
+        for prop in properties:
+            key = (prop.source.value, str(prop.house_id))
+            owners: Set[str] = set()
+            for area in groups.get(prop.search_area, [prop.search_area]):
+                owners.update(self.area_universities.get(area, []))
+
+            if key not in self.memberships:
+                self.memberships[key] = set()
+                unique.append(prop)
+            self.memberships[key] |= owners
+
+        if len(unique) < len(properties):
+            logger.info(f"跨区域重复房源 {len(properties) - len(unique)} 个，已合并")
+        return unique
+
+    def universities_for(self, prop: PropertyData) -> Set[str]:
+        return self.memberships.get((prop.source.value, str(prop.house_id)), set())
+
+    def members(self, properties: List[PropertyData], university: str) -> List[PropertyData]:
+        """属于某所大学的房源"""
+        return [prop for prop in properties if university in self.universities_for(prop)]
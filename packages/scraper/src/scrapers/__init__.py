@@ -1,6 +1,8 @@
 from .base import BaseScraper
 from .domain import DomainScraper
 from .realestate import RealEstateScraper
+from .detail_pool import DetailPagePool
+from .area_pool import AreaProcessPool
 
-__all__ = ['BaseScraper', 'DomainScraper', 'RealEstateScraper']
+__all__ = ['BaseScraper', 'DomainScraper', 'RealEstateScraper', 'DetailPagePool', 'AreaProcessPool']
 
@@ -0,0 +1,206 @@
+"""
+区域并发爬取进程池
+N 个 worker 进程各自创建爬虫实例（独立浏览器 profile 目录），从共享队列中取区域爬取列表页，
+所有进程共享同一个站点限流器，保证站点看到的总请求速率与串行爬取相当。
+
+使用 spawn 方式启动子进程：Playwright 的浏览器连接和后台线程不能安全地 fork。
+"""
+import time
+import queue
+import logging
+import dataclasses
+import multiprocessing
+from typing import Dict, Iterable, List, Optional, Set, Type
+
+from ..config import settings, ScraperConfig
+from ..models import PropertyData
+from ..utils.browser import routing_totals, add_routing_totals
+from ..utils.metrics import metrics
+from ..utils.rate_limit import ProcessRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def area_profile_dir(profile_dir: str, index: int) -> str:
+    """worker 的 profile 目录：第 0 个沿用原目录，其余加后缀（与详情池的 _w 后缀区分）"""
+    return profile_dir if index == 0 else f"{profile_dir}_a{index}"
+
+
+def _take_samples() -> dict:
+    """子进程自上次回传以来的指标和请求拦截统计"""
+    return {'metrics': metrics.take_samples(), 'routing': routing_totals(reset=True)}
+
+
+def _area_worker(
+    index: int,
+    scraper_cls: Type,
+    config: ScraperConfig,
+    profile_dir: Optional[str],
+    known_ids: Set[str],
+    limiter: ProcessRateLimiter,
+    startup_stagger: float,
+    tasks: "multiprocessing.Queue",
+    results: "multiprocessing.Queue",
+):
+    """子进程入口：逐个爬取队列中的区域，每个区域的结果单独回传"""
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format=f'[%(asctime)s] %(levelname)s - [area {index}] %(message)s',
+        datefmt='%H:%M:%S',
+    )
+
+    try:
+        time.sleep(index * startup_stagger)
+
+        scraper = scraper_cls(config)
+        if profile_dir:
+            scraper.profile_dir = area_profile_dir(profile_dir, index)
+        scraper.known_ids = known_ids
+        scraper.rate_limiter = limiter
+
+        while True:
+            area = tasks.get()
+            if area is None:
+                break
+
+            stops_before = scraper.incremental_stops
+            try:
+                # 单区域走各爬虫自己的 scrape_areas，浏览器的创建和关闭与串行模式一致
+                properties = scraper.scrape_areas([area])
+                error = None
+            except Exception as e:
+                logger.error(f"区域 {area} 爬取失败: {e}")
+                properties, error = [], str(e)
+
+            results.put((
+                'area', area, properties, scraper.incremental_stops - stops_before, error, _take_samples()
+            ))
+    except Exception as e:
+        logger.error(f"[worker {index}] 启动失败: {e}")
+    finally:
+        # 浏览器在最后关闭时才汇总拦截统计，随 done 标记一起回传
+        results.put(('done', index, None, 0, None, _take_samples()))
+
+
+class AreaProcessPool:
+    """
+    区域并发爬取进程池
+
+    用法:
+        pool = AreaProcessPool(RealEstateScraper, config, profile_dir, workers=3, min_interval=8.0)
+        properties = pool.run(areas)
+
+    返回的房产按 areas 的顺序排列，与串行爬取一致。
+    """
+
+    def __init__(
+        self,
+        scraper_cls: Type,
+        config: ScraperConfig,
+        profile_dir: Optional[str] = None,
+        workers: int = 2,
+        min_interval: float = 0.0,
+        known_ids: Optional[Set[str]] = None,
+        startup_stagger: float = 5.0,
+        poll_interval: float = 5.0,
+    ):
+        """
+        Args:
+            scraper_cls: 爬虫类（子进程中实例化）
+            config: 爬虫配置
+            profile_dir: 浏览器 profile 基础目录
+            workers: 进程数
+            min_interval: 全部进程合计的列表页最小请求间隔（秒）
+            known_ids: 增量模式下的已知房源 ID
+            startup_stagger: worker 之间的启动间隔（秒），避免同时拉起多个浏览器
+            poll_interval: 等待结果时检查子进程存活的间隔（秒）
+        """
+        self.scraper_cls = scraper_cls
+        # 子进程内串行爬取，避免再次创建进程池
+        self.config = dataclasses.replace(config, area_workers=1)
+        self.profile_dir = profile_dir
+        self.workers = max(1, workers)
+        self.min_interval = min_interval
+        self.known_ids = known_ids or set()
+        self.startup_stagger = startup_stagger
+        self.poll_interval = poll_interval
+
+        self.stats = {'areas': 0, 'failed': 0, 'incremental_stops': 0}
+
+    def run(self, areas: Iterable[str]) -> List[PropertyData]:
+        """并发爬取所有区域，返回合并后的房产列表"""
+        areas = list(areas)
+        workers = min(self.workers, len(areas))
+        context = multiprocessing.get_context('spawn')
+        limiter = ProcessRateLimiter(self.min_interval, context)
+
+        tasks = context.Queue()
+        for area in areas:
+            tasks.put(area)
+        for _ in range(workers):
+            tasks.put(None)
+        results = context.Queue()
+
+        logger.info(
+            f"启动 {workers} 个进程并发爬取 {len(areas)} 个区域 "
+            f"(站点请求间隔 {self.min_interval:.1f}s)"
+        )
+
+        processes = [
+            context.Process(
+                target=_area_worker,
+                args=(
+                    i, self.scraper_cls, self.config, self.profile_dir, self.known_ids,
+                    limiter, self.startup_stagger, tasks, results,
+                ),
+                name=f"area-{i}",
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        by_area: Dict[str, List[PropertyData]] = {}
+        done = 0
+        try:
+            while done < workers:
+                try:
+                    kind, key, properties, stops, error, samples = results.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    # 子进程异常退出（如被系统杀掉）时不会发送 done 标记
+                    if not any(process.is_alive() for process in processes):
+                        logger.error("所有区域爬取进程已退出")
+                        break
+                    continue
+
+                # 子进程的页面加载等指标合并到本进程，随本次运行一起导出
+                metrics.merge_samples(samples['metrics'])
+                add_routing_totals(samples['routing'])
+                if kind == 'done':
+                    done += 1
+                    continue
+
+                by_area[key] = properties
+                self.stats['areas'] += 1
+                self.stats['incremental_stops'] += stops
+                if error:
+                    self.stats['failed'] += 1
+                logger.info(f"区域完成 {len(by_area)}/{len(areas)}: {key} ({len(properties)} 个房源)")
+        finally:
+            for process in processes:
+                process.join(timeout=self.poll_interval)
+                if process.is_alive():
+                    process.terminate()
+
+        missing = [area for area in areas if area not in by_area]
+        if missing:
+            self.stats['failed'] += len(missing)
+            logger.warning(f"{len(missing)} 个区域未完成: {missing}")
+
+        all_properties = [prop for area in areas for prop in by_area.get(area, [])]
+        logger.info(
+            f"区域并发爬取完成: {self.stats['areas']}/{len(areas)} 个区域, "
+            f"失败 {self.stats['failed']}, 共 {len(all_properties)} 个房源"
+        )
+        return all_properties
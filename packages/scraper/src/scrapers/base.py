@@ -5,13 +5,16 @@
 import time
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Callable, Generator, Set
 from datetime import datetime
 from bs4 import BeautifulSoup
 
 from ..models import PropertyData, PropertySource, ScrapeResult
-from ..utils import BrowserManager, browser_session
+from ..utils import BrowserManager, browser_session, HttpPageFetcher, make_soup, Markup
+from ..utils.browser import BrowserType
 from ..config import settings, ScraperConfig, TARGET_AREAS
+from .detail_pool import DetailPagePool
+from .area_pool import AreaProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +34,9 @@ class BaseScraper(ABC):
     # 子类需要定义的属性
     SOURCE: PropertySource = None  # 数据来源
     BASE_URL: str = ""  # 基础 URL
+    DETAIL_MIN_HTML: int = 0  # 详情页最小长度，更短的视为被拦截
+    LISTING_READY_SELECTOR: str = ""  # 列表页就绪判断：房源卡片选择器
+    DETAIL_READY_SELECTOR: str = ""  # 详情页就绪判断：描述节点选择器
     
     def __init__(self, config: Optional[ScraperConfig] = None):
         """
@@ -43,6 +49,11 @@ class BaseScraper(ABC):
         self.browser: Optional[BrowserManager] = None
         self.scraped_count = 0
         self.error_count = 0
+        # 增量模式下的已知房源 ID（由 pipeline 设置），为空表示完整爬取
+        self.known_ids: Set[str] = set()
+        self.incremental_stops = 0
+        # 区域并发模式下由进程池设置的跨进程站点限流器
+        self.rate_limiter = None
     
     @abstractmethod
     def get_search_url(self, area: str) -> str:
@@ -58,12 +69,12 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
-    def parse_listing_page(self, html: str) -> List[PropertyData]:
+    def parse_listing_page(self, html: Markup) -> List[PropertyData]:
         """
         解析列表页面
         
         Args:
-            html: 页面 HTML 源码
+            html: 页面 HTML 源码或已解析的 soup
             
         Returns:
             解析出的房产数据列表
@@ -71,13 +82,13 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
-    def parse_detail_page(self, property_data: PropertyData, html: str) -> PropertyData:
+    def parse_detail_page(self, property_data: PropertyData, html: Markup) -> PropertyData:
         """
         解析详情页面
         
         Args:
             property_data: 基础房产数据
-            html: 页面 HTML 源码
+            html: 页面 HTML 源码或已解析的 soup
             
         Returns:
             更新后的房产数据
@@ -128,6 +139,7 @@ class BaseScraper(ABC):
         
         try:
             # 导航到首页
+            self._throttle()
             if not self.browser.navigate(url, wait_time=self.config.page_delay):
                 return ScrapeResult(
                     success=False,
@@ -139,10 +151,10 @@ class BaseScraper(ABC):
                 try:
                     # 获取页面源码
                     html = self.browser.get_page_source()
-                    soup = BeautifulSoup(html, "html.parser")
+                    soup = make_soup(html)
                     
-                    # 解析当前页
-                    page_properties = self.parse_listing_page(html)
+                    # 解析当前页（与下一页按钮查找共用同一个 soup）
+                    page_properties = self.parse_listing_page(soup)
                     
                     if not page_properties:
                         logger.info(f"第 {page_num + 1} 页没有找到房源，停止翻页")
@@ -152,6 +164,9 @@ class BaseScraper(ABC):
                     pages_scraped += 1
                     logger.info(f"第 {page_num + 1} 页解析成功，找到 {len(page_properties)} 个房源")
                     
+                    if self._page_mostly_known(page_properties):
+                        break
+                    
                     # 查找下一页按钮
                     next_button = self.find_next_button(soup)
                     if not next_button:
@@ -159,6 +174,7 @@ class BaseScraper(ABC):
                         break
                     
                     # 点击下一页
+                    self._throttle()
                     if not self._click_next_page(next_button):
                         logger.info("点击下一页失败，停止翻页")
                         break
@@ -199,15 +215,19 @@ class BaseScraper(ABC):
         Returns:
             所有房产数据
         """
+        parallel = self._scrape_areas_parallel(areas)
+        if parallel is not None:
+            return parallel
+        
         all_properties = []
         
-        with browser_session() as browser:
+        with browser_session(site=self.SOURCE.value) as browser:
             self.browser = browser
             
             for area in areas:
                 result = self.scrape_area(area)
                 if result.success:
-                    all_properties.extend(result.properties)
+                    all_properties.extend(self._tag_area(result.properties, area))
                 else:
                     logger.warning(f"区域 {area} 爬取失败: {result.error_message}")
                 
@@ -250,9 +270,29 @@ class BaseScraper(ABC):
         Returns:
             更新后的房产列表
         """
+        for _ in self.iter_property_details(properties, skip_existing=skip_existing):
+            pass
+        return properties
+    
+    def iter_property_details(
+        self,
+        properties: List[PropertyData],
+        skip_existing: bool = True
+    ) -> Iterator[PropertyData]:
+        """
+        逐个爬取房产详情页，每处理完一个房产就 yield 出来
+        供流式 Pipeline 在详情爬取的同时进行评分/通勤计算
+        
+        Args:
+            properties: 房产列表
+            skip_existing: 是否跳过已有详情的房产（被跳过的不会 yield）
+            
+        Yields:
+            已尝试爬取详情的房产（成功或失败）
+        """
         logger.info(f"开始爬取 {len(properties)} 个房产的详情")
         
-        with browser_session() as browser:
+        with browser_session(site=self.SOURCE.value) as browser:
             self.browser = browser
             
             for i, prop in enumerate(properties):
@@ -262,16 +302,14 @@ class BaseScraper(ABC):
                 
                 try:
                     url = self.get_detail_url(prop)
-                    if not url:
-                        continue
-                    
-                    if self.browser.navigate(url, wait_time=self.config.page_delay):
+                    if url and self.browser.navigate(url, wait_time=self.config.page_delay):
                         html = self.browser.get_page_source()
                         prop = self.parse_detail_page(prop, html)
                         logger.debug(f"详情页爬取成功: {prop.address_line1}")
                     
                     # 请求间隔
-                    time.sleep(self.config.request_delay)
+                    if url:
+                        time.sleep(self.config.request_delay)
                     
                 except Exception as e:
                     logger.error(f"爬取详情失败 ({prop.house_id}): {e}")
@@ -280,9 +318,206 @@ class BaseScraper(ABC):
                 # 进度日志
                 if (i + 1) % 10 == 0:
                     logger.info(f"详情爬取进度: {i + 1}/{len(properties)}")
+                
+                yield prop
+    
+    @staticmethod
+    def _tag_area(properties: List[PropertyData], area: str) -> List[PropertyData]:
+        """记录房源来自哪个目标区域（供按区域分发给各大学）"""
+        for prop in properties:
+            prop.search_area = area
+        return properties
+    
+    def _throttle(self):
+        """加载列表页前等待站点限流（仅区域并发模式下生效）"""
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire()
+            if waited > 0:
+                logger.debug(f"站点限流等待 {waited:.1f} 秒")
+    
+    def _scrape_areas_parallel(self, areas: List[str]) -> Optional[List[PropertyData]]:
+        """
+        区域并发爬取：多个进程各自持有浏览器，共享站点限流
         
+        Returns:
+            所有房产数据；area_workers <= 1 或区域不足两个时返回 None，由调用方串行爬取
+        """
+        workers = min(self.config.area_workers, len(areas))
+        if workers <= 1:
+            return None
+        
+        pool = AreaProcessPool(
+            type(self),
+            self.config,
+            profile_dir=getattr(self, 'profile_dir', None),
+            workers=workers,
+            min_interval=self.config.site_min_interval.get(self.SOURCE.value, 0.0),
+            known_ids=self.known_ids,
+        )
+        properties = pool.run(areas)
+        self.incremental_stops += pool.stats['incremental_stops']
+        self.error_count += pool.stats['failed']
         return properties
     
+    @property
+    def incremental(self) -> bool:
+        """是否为增量爬取（按最新排序，遇到已知房源为主的页面即停止翻页）"""
+        return bool(self.known_ids)
+    
+    def _page_mostly_known(self, page_properties: List[PropertyData]) -> bool:
+        """
+        增量模式下判断当前页是否以已知房源为主
+        
+        结果按最新排序，一页中已知房源达到比例后，后续页面基本都是已有房源，无需继续翻页
+        """
+        if not self.known_ids or not page_properties:
+            return False
+        
+        known = sum(1 for prop in page_properties if str(prop.house_id) in self.known_ids)
+        ratio = known / len(page_properties)
+        if ratio < self.config.incremental_known_ratio:
+            return False
+        
+        self.incremental_stops += 1
+        logger.info(f"增量模式: 本页 {known}/{len(page_properties)} 个房源已知，停止翻页")
+        return True
+    
+    def _wait_listing_ready(self, browser: BrowserManager) -> bool:
+        """等待列表页房源卡片出现且数量稳定，未配置选择器时返回 False"""
+        if not self.LISTING_READY_SELECTOR:
+            return False
+        return browser.wait_until_ready(
+            self.LISTING_READY_SELECTOR,
+            stable_for=self.config.listing_stable_for,
+            timeout=self.config.ready_timeout,
+        )
+    
+    def _wait_detail_ready(self, browser: BrowserManager) -> bool:
+        """等待详情页描述节点出现，未配置选择器时返回 False"""
+        if not self.DETAIL_READY_SELECTOR:
+            return False
+        return browser.wait_until_ready(self.DETAIL_READY_SELECTOR, timeout=self.config.ready_timeout)
+    
+    def _detail_pool(
+        self,
+        fetch: Callable[[BrowserManager, PropertyData], bool],
+        profile_dir: str,
+        reset_every: int = 0
+    ) -> Optional[DetailPagePool]:
+        """
+        按配置创建详情页浏览器池，detail_workers <= 1 时返回 None（使用串行爬取）
+        
+        Args:
+            fetch: 单个详情页的爬取函数 fetch(browser, prop) -> bool
+            profile_dir: 浏览器 profile 基础目录（每个 worker 使用独立子目录）
+            reset_every: 每个 worker 爬取多少个详情后重置 profile
+        """
+        if self.config.detail_workers <= 1:
+            return None
+        
+        site = self.SOURCE.value
+        return DetailPagePool(
+            site,
+            fetch,
+            profile_dir,
+            workers=self.config.detail_workers,
+            site_limit=self.config.site_concurrency.get(site),
+            reset_every=reset_every,
+        )
+    
+    def _harvest_session(self) -> Optional[dict]:
+        """
+        用浏览器打开首页建立会话，导出 cookies 和 User-Agent
+        已有浏览器时直接复用，否则临时启动一个 Playwright 浏览器
+        """
+        browser = self.browser
+        owned = browser is None
+        try:
+            if owned:
+                browser = BrowserManager(
+                    browser_type=BrowserType.PLAYWRIGHT,
+                    profile_dir=getattr(self, 'profile_dir', None),
+                    routing=self.SOURCE.value,
+                    site=self.SOURCE.value
+                )
+                browser.create_driver()
+            if not browser.navigate(self.BASE_URL, wait_time=self.config.page_delay):
+                return None
+            session = browser.export_session()
+            logger.info(f"已从浏览器获取会话: {len(session['cookies'])} 个 cookie")
+            return session
+        except Exception as e:
+            logger.error(f"获取浏览器会话失败: {e}")
+            return None
+        finally:
+            if owned and browser:
+                browser.close()
+    
+    def _iter_http_details(
+        self,
+        properties: List[PropertyData]
+    ) -> Generator[PropertyData, None, List[PropertyData]]:
+        """
+        HTTP 快速路径：复用浏览器会话直接请求详情页 HTML 并解析
+        
+        Yields:
+            解析成功（获取到描述）的房产
+            
+        Returns:
+            需要回退到浏览器爬取的房产（被拦截、请求失败或未解析到描述）
+        """
+        items = []
+        fallback = []
+        for i, prop in enumerate(properties):
+            url = self.get_detail_url(prop)
+            if url:
+                items.append((i, url))
+            else:
+                fallback.append(prop)
+        
+        if not items:
+            return properties
+        
+        session = self._harvest_session()
+        if not session:
+            logger.warning("未能建立会话，全部使用浏览器爬取详情")
+            return properties
+        
+        fetcher = HttpPageFetcher(
+            session,
+            concurrency=self.config.http_concurrency,
+            timeout=self.config.http_timeout,
+            min_length=self.DETAIL_MIN_HTML,
+            max_consecutive_blocks=self.config.http_max_blocks,
+        )
+        
+        logger.info(f"HTTP 快速路径爬取 {len(items)} 个详情页")
+        try:
+            results = fetcher.iter_fetch(items)
+        except ImportError:
+            return properties
+        
+        succeeded = 0
+        for index, html in results:
+            prop = properties[index]
+            if html:
+                try:
+                    self.parse_detail_page(prop, html)
+                except Exception as e:
+                    logger.error(f"解析详情失败 ({prop.house_id}): {e}")
+            
+            if html and prop.description_en:
+                succeeded += 1
+                yield prop
+            else:
+                fallback.append(prop)
+        
+        logger.info(
+            f"HTTP 快速路径完成: 成功 {succeeded}, 拦截 {fetcher.stats['blocked']}, "
+            f"失败 {fetcher.stats['failed']}, 回退浏览器 {len(fallback)}"
+        )
+        return fallback
+    
     def _click_next_page(self, next_button) -> bool:
         """
         点击下一页按钮
@@ -306,6 +541,7 @@ class BaseScraper(ABC):
         """获取爬取统计"""
         return {
             "scraped_count": self.scraped_count,
-            "error_count": self.error_count
+            "error_count": self.error_count,
+            "incremental_stops": self.incremental_stops
         }
 
@@ -0,0 +1,206 @@
+"""
+详情页并发爬取池
+N 个 worker 线程各自持有一个 Playwright 持久化浏览器（独立 profile 目录），
+从共享队列中取房产爬取详情，按完成顺序返回结果。
+
+Playwright 同步 API 的对象只能在创建它的线程中使用，
+因此浏览器在 worker 线程内创建、使用和关闭。
+"""
+import os
+import time
+import queue
+import shutil
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ..models import PropertyData
+from ..utils.browser import BrowserManager, BrowserType
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 每个站点一个信号量，限制同一进程内所有爬虫实例对该站点的并发页面数
+_site_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_site_lock = threading.Lock()
+
+# 队列结束标记
+_DONE = object()
+
+
+def site_semaphore(site: str, limit: int) -> threading.BoundedSemaphore:
+    """获取站点的并发信号量（首次调用时按 limit 创建）"""
+    with _site_lock:
+        if site not in _site_semaphores:
+            _site_semaphores[site] = threading.BoundedSemaphore(max(1, limit))
+        return _site_semaphores[site]
+
+
+def worker_profile_dir(profile_dir: str, index: int) -> str:
+    """worker 的 profile 目录：第 0 个沿用原目录（保留已验证的会话），其余加后缀"""
+    return profile_dir if index == 0 else f"{profile_dir}_w{index}"
+
+
+class DetailPagePool:
+    """
+    详情页浏览器池
+
+    用法:
+        pool = DetailPagePool("realestate", fetch, profile_dir, workers=3, site_limit=3)
+        for prop in pool.run(properties):
+            ...
+
+    fetch(browser, prop) -> bool 负责导航、解析并写回 prop，返回是否成功。
+    """
+
+    def __init__(
+        self,
+        site: str,
+        fetch: Callable[[BrowserManager, PropertyData], bool],
+        profile_dir: str,
+        workers: int = 2,
+        site_limit: Optional[int] = None,
+        reset_every: int = 0,
+        startup_stagger: float = 2.0,
+    ):
+        """
+        Args:
+            site: 站点名（用于并发限制）
+            fetch: 单个详情页的爬取函数
+            profile_dir: 浏览器 profile 基础目录
+            workers: 浏览器数量
+            site_limit: 站点并发上限，默认等于 workers
+            reset_every: 每个 worker 成功爬取多少个详情后重置 profile，0 表示不重置
+            startup_stagger: worker 之间的启动间隔（秒），避免同时拉起多个浏览器
+        """
+        self.site = site
+        self.fetch = fetch
+        self.profile_dir = profile_dir
+        self.workers = max(1, workers)
+        self.site_limit = site_limit or self.workers
+        self.reset_every = reset_every
+        self.startup_stagger = startup_stagger
+
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {'success': 0, 'failed': 0}
+
+    def _open_browser(self, profile_path: str) -> BrowserManager:
+        browser = BrowserManager(
+            browser_type=BrowserType.PLAYWRIGHT, profile_dir=profile_path, routing=self.site, site=self.site
+        )
+        browser.create_driver()
+        return browser
+
+    def _reset_profile(self, browser: BrowserManager, profile_path: str) -> BrowserManager:
+        """关闭浏览器、删除 profile 目录后重新创建"""
+        browser.close()
+        if os.path.exists(profile_path):
+            try:
+                shutil.rmtree(profile_path)
+                logger.info(f"Profile 已重置: {profile_path}")
+            except Exception as e:
+                logger.warning(f"删除 profile 失败: {e}")
+        time.sleep(2)
+        return self._open_browser(profile_path)
+
+    def _record(self, success: bool):
+        with self._stats_lock:
+            self.stats['success' if success else 'failed'] += 1
+        metrics.inc("detail_pages_total", site=self.site, result="ok" if success else "failed")
+
+    def _worker(self, index: int, tasks: "queue.Queue", results: "queue.Queue"):
+        profile_path = worker_profile_dir(self.profile_dir, index)
+        semaphore = site_semaphore(self.site, self.site_limit)
+        browser = None
+        fetched = 0
+
+        try:
+            time.sleep(index * self.startup_stagger)
+            browser = self._open_browser(profile_path)
+
+            while not self._stop.is_set():
+                try:
+                    prop = tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                if self.reset_every and fetched > 0 and fetched % self.reset_every == 0:
+                    logger.info(f"[worker {index}] 已爬取 {fetched} 个详情，重置浏览器 profile...")
+                    try:
+                        browser = self._reset_profile(browser, profile_path)
+                    except Exception as e:
+                        # 浏览器已关闭：任务放回队列交给其他 worker，本 worker 退出
+                        logger.error(f"[worker {index}] 重置浏览器失败，退出: {e}")
+                        browser = None
+                        tasks.put(prop)
+                        break
+
+                success = False
+                try:
+                    with semaphore:
+                        success = self.fetch(browser, prop)
+                    if success:
+                        fetched += 1
+                except Exception as e:
+                    logger.error(f"[worker {index}] 爬取详情失败 ({prop.house_id}): {e}")
+
+                self._record(success)
+                results.put(prop)
+
+        except Exception as e:
+            logger.error(f"[worker {index}] 浏览器启动失败: {e}")
+        finally:
+            if browser:
+                browser.close()
+            results.put(_DONE)
+
+    def run(self, properties: List[PropertyData]) -> Iterator[PropertyData]:
+        """
+        并发爬取详情页，按完成顺序 yield 房产
+
+        某个 worker 的浏览器启动失败时，它的任务由其他 worker 继续消费；
+        全部 worker 都退出后仍未处理的房产原样 yield（视为失败）。
+        """
+        tasks: "queue.Queue" = queue.Queue()
+        for prop in properties:
+            tasks.put(prop)
+        results: "queue.Queue" = queue.Queue()
+
+        workers = min(self.workers, len(properties))
+        logger.info(f"启动 {workers} 个浏览器并发爬取 {len(properties)} 个详情页 (站点并发上限 {self.site_limit})")
+
+        threads = [
+            threading.Thread(target=self._worker, args=(i, tasks, results), daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        done = 0
+        completed = 0
+        try:
+            while done < workers:
+                item = results.get()
+                if item is _DONE:
+                    done += 1
+                    continue
+                completed += 1
+                if completed % 10 == 0:
+                    logger.info(f"详情爬取进度: {completed}/{len(properties)}")
+                yield item
+
+            # 所有 worker 都已退出（例如浏览器均启动失败），剩余房产直接返回
+            while True:
+                try:
+                    prop = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                self._record(False)
+                yield prop
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        logger.info(f"详情爬取完成: 成功 {self.stats['success']}, 失败 {self.stats['failed']}")
@@ -6,7 +6,7 @@ import re
 import os
 import time
 import logging
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Iterator
 from datetime import datetime
 from bs4 import BeautifulSoup
 
@@ -15,7 +15,8 @@ from ..models import PropertyData, PropertySource
 from ..config import PROPERTY_TYPE_MAPPING, ScraperConfig
 from ..utils import (
     extract_price, extract_number, clean_address,
-    parse_available_date, is_valid_image_url
+    parse_available_date, is_valid_image_url,
+    make_soup, Markup
 )
 from ..utils.browser import BrowserManager, BrowserType
 
@@ -30,6 +31,9 @@ class DomainScraper(BaseScraper):
     
     SOURCE = PropertySource.DOMAIN
     BASE_URL = "https://www.domain.com.au"
+    DETAIL_MIN_HTML = 5000
+    LISTING_READY_SELECTOR = 'li[data-testid^="listing-"]'
+    DETAIL_READY_SELECTOR = 'div[data-testid="listing-details__description"]'
     
     # Domain 特有的 CSS 选择器
     SELECTORS = {
@@ -58,8 +62,11 @@ class DomainScraper(BaseScraper):
         self.browser = None
     
     def get_search_url(self, area: str) -> str:
-        """生成 Domain 租房搜索 URL"""
-        return f"{self.BASE_URL}/rent/{area}/?excludedeposittaken=1"
+        """生成 Domain 租房搜索 URL（增量模式按更新时间倒序）"""
+        url = f"{self.BASE_URL}/rent/{area}/?excludedeposittaken=1"
+        if self.incremental:
+            url += "&sort=dateupdated-desc"
+        return url
     
     def get_detail_url(self, property_data: PropertyData) -> str:
         """获取房产详情页 URL"""
@@ -80,7 +87,9 @@ class DomainScraper(BaseScraper):
             # 使用 Playwright
             self.browser = BrowserManager(
                 browser_type=BrowserType.PLAYWRIGHT,
-                profile_dir=self.profile_dir
+                profile_dir=self.profile_dir,
+                routing=self.SOURCE.value,
+                site=self.SOURCE.value
             )
             self.browser.create_driver()
             
@@ -94,21 +103,21 @@ class DomainScraper(BaseScraper):
                 logger.info(f"爬取第 {page} 页: {page_url}")
                 
                 # 导航到页面
-                self.browser.navigate(page_url, wait_time=5.0)
+                self._throttle()
+                self.browser.navigate(page_url, wait_time=0)
                 
-                # 等待页面加载
-                self.browser.wait(3.0)
-                
-                # 滚动加载更多内容
-                for _ in range(3):
-                    self.browser.scroll_page(500)
-                    self.browser.wait(1.0)
+                # 等待房源卡片出现且数量稳定；超时则按原方式等待并滚动加载
+                if not self._wait_listing_ready(self.browser):
+                    for _ in range(3):
+                        self.browser.scroll_page(500)
+                        self.browser.wait(1.0)
                 
                 # 获取页面内容
                 html = self.browser.get_page_source()
                 
-                # 解析页面
-                page_properties = self.parse_listing_page(html)
+                # 解析页面（只解析一次，列表和翻页检查共用）
+                soup = make_soup(html)
+                page_properties = self.parse_listing_page(soup)
                 
                 if not page_properties:
                     logger.info(f"第 {page} 页没有找到房源，停止")
@@ -122,8 +131,12 @@ class DomainScraper(BaseScraper):
                 properties.extend(page_properties)
                 logger.info(f"第 {page} 页找到 {len(page_properties)} 个房源")
                 
+                # 增量模式：本页以已知房源为主，后续页面无需再爬
+                if self._page_mostly_known(page_properties):
+                    break
+                
                 # 检查是否有下一页
-                if not self._has_next_page(html, page):
+                if not self._has_next_page(soup, page):
                     break
                 
                 page += 1
@@ -141,20 +154,24 @@ class DomainScraper(BaseScraper):
         return properties
     
     def scrape_areas(self, areas: List[str]) -> List[PropertyData]:
-        """爬取多个区域"""
+        """爬取多个区域（area_workers > 1 时多进程并发）"""
+        parallel = self._scrape_areas_parallel(areas)
+        if parallel is not None:
+            return parallel
+        
         all_properties = []
         
         for area in areas:
             properties = self.scrape_area(area)
-            all_properties.extend(properties)
+            all_properties.extend(self._tag_area(properties, area))
             time.sleep(self.config.request_delay)
         
         return all_properties
     
-    def _has_next_page(self, html: str, current_page: int) -> bool:
+    def _has_next_page(self, html: Markup, current_page: int) -> bool:
         """检查是否有下一页"""
-        soup = BeautifulSoup(html, 'html.parser')
-        next_buttons = soup.find_all('a', {'data-testid': 'paginator-navigation-button'})
+        soup = make_soup(html)
+        next_buttons = soup.select(self.SELECTORS['next_button'])
         
         for btn in next_buttons:
             text = btn.get_text(strip=True).lower()
@@ -163,10 +180,10 @@ class DomainScraper(BaseScraper):
         
         return False
     
-    def parse_listing_page(self, html: str) -> List[PropertyData]:
-        """解析 Domain 列表页面"""
-        soup = BeautifulSoup(html, "html.parser")
-        listings = soup.find_all("li", {"data-testid": lambda v: v and v.startswith("listing-")})
+    def parse_listing_page(self, html: Markup) -> List[PropertyData]:
+        """解析 Domain 列表页面（html 可以是已解析的 soup）"""
+        soup = make_soup(html)
+        listings = soup.select(self.SELECTORS['listing'])
         
         properties = []
         for listing in listings:
@@ -217,7 +234,7 @@ class DomainScraper(BaseScraper):
         
         # 获取详情页 URL
         url = ""
-        link = listing.find('a', href=lambda h: h and '/rent/' in str(h) or h and '-' in str(h) and str(h).endswith('/'))
+        link = listing.select_one('a[href*="/rent/"], a[href*="-"][href$="/"]')
         if link:
             href = link.get('href', '')
             if href:
@@ -282,11 +299,36 @@ class DomainScraper(BaseScraper):
         """
         爬取房产详情页 - 使用 Playwright
         """
+        for _ in self.iter_property_details(properties, skip_existing=skip_existing):
+            pass
+        return properties
+    
+    def iter_property_details(
+        self,
+        properties: List[PropertyData],
+        skip_existing: bool = True
+    ) -> Iterator[PropertyData]:
+        """
+        逐个爬取房产详情页，每处理完一个房产就 yield 出来
+        """
         to_scrape = [p for p in properties if not (skip_existing and p.description_en)]
         
         if not to_scrape:
             logger.info("没有需要爬取详情的房产")
-            return properties
+            return
+        
+        if self.config.http_details:
+            to_scrape = yield from self._iter_http_details(to_scrape)
+            if not to_scrape:
+                return
+        
+        pool = self._detail_pool(
+            lambda browser, prop: self._scrape_detail(prop, prop.url or self.get_detail_url(prop), browser),
+            self.profile_dir,
+        )
+        if pool:
+            yield from pool.run(to_scrape)
+            return
         
         logger.info(f"开始爬取 {len(to_scrape)} 个房产的详情页")
         
@@ -294,38 +336,26 @@ class DomainScraper(BaseScraper):
             if not self.browser:
                 self.browser = BrowserManager(
                     browser_type=BrowserType.PLAYWRIGHT,
-                    profile_dir=self.profile_dir
+                    profile_dir=self.profile_dir,
+                    routing=self.SOURCE.value,
+                    site=self.SOURCE.value
                 )
                 self.browser.create_driver()
             
             for i, prop in enumerate(to_scrape):
                 try:
                     url = prop.url or self.get_detail_url(prop)
-                    if not url:
-                        continue
-                    
-                    logger.debug(f"爬取详情 ({i+1}/{len(to_scrape)}): {url}")
-                    
-                    self.browser.navigate(url, wait_time=3.0)
-                    
-                    # 滚动加载
-                    for _ in range(2):
-                        self.browser.scroll_page(400)
-                        self.browser.wait(0.5)
-                    
-                    html = self.browser.get_page_source()
-                    
-                    if len(html) > 5000:
-                        self.parse_detail_page(prop, html)
-                        logger.debug(f"详情获取成功: {prop.address_line1}")
+                    if url:
+                        logger.debug(f"爬取详情 ({i+1}/{len(to_scrape)}): {url}")
+                        self._scrape_detail(prop, url)
                     
                     if (i + 1) % 10 == 0:
                         logger.info(f"详情爬取进度: {i + 1}/{len(to_scrape)}")
                     
-                    time.sleep(self.config.request_delay)
-                    
                 except Exception as e:
                     logger.error(f"爬取详情失败 ({prop.house_id}): {e}")
+                
+                yield prop
             
         except Exception as e:
             logger.error(f"详情爬取失败: {e}")
@@ -333,12 +363,42 @@ class DomainScraper(BaseScraper):
             if self.browser:
                 self.browser.close()
                 self.browser = None
+    
+    def _scrape_detail(self, prop: PropertyData, url: str, browser: Optional[BrowserManager] = None) -> bool:
+        """
+        爬取单个房产详情页
         
-        return properties
+        Args:
+            prop: 房产
+            url: 详情页 URL
+            browser: 使用的浏览器，默认 self.browser（浏览器池的 worker 传入自己的浏览器）
+        
+        Returns:
+            是否成功解析详情页
+        """
+        browser = browser or self.browser
+        browser.navigate(url, wait_time=0)
+        
+        # 等待描述节点出现；未出现时滚动加载
+        if not self._wait_detail_ready(browser):
+            for _ in range(2):
+                browser.scroll_page(400)
+                browser.wait(0.5)
+        
+        html = browser.get_page_source()
+        
+        parsed = False
+        if len(html) > self.DETAIL_MIN_HTML:
+            self.parse_detail_page(prop, html)
+            logger.debug(f"详情获取成功: {prop.address_line1}")
+            parsed = True
+        
+        time.sleep(self.config.request_delay)
+        return parsed
     
-    def parse_detail_page(self, property_data: PropertyData, html: str) -> PropertyData:
-        """解析 Domain 详情页面"""
-        soup = BeautifulSoup(html, "html.parser")
+    def parse_detail_page(self, property_data: PropertyData, html: Markup) -> PropertyData:
+        """解析 Domain 详情页面（html 可以是已解析的 soup）"""
+        soup = make_soup(html)
         
         # 描述
         description = self._parse_description(soup)
@@ -14,7 +14,7 @@ import os
 import logging
 import time
 import random
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Iterator
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -28,7 +28,8 @@ from ..models import PropertyData, PropertySource
 from ..config import PROPERTY_TYPE_MAPPING, ScraperConfig
 from ..utils import (
     extract_price, extract_number, clean_address,
-    parse_available_date, is_valid_image_url, generate_house_id
+    parse_available_date, is_valid_image_url, generate_house_id,
+    make_soup, Markup
 )
 from ..utils.browser import BrowserManager, BrowserType
 
@@ -50,6 +51,9 @@ class RealEstateScraper(BaseScraper):
     
     SOURCE = PropertySource.REALESTATE
     BASE_URL = "https://www.realestate.com.au"
+    DETAIL_MIN_HTML = 10000
+    LISTING_READY_SELECTOR = 'article[class*="residential-card"], article[data-testid="ResidentialCard"]'
+    DETAIL_READY_SELECTOR = 'div[data-testid="listing-details__description"], div[class*="description" i]'
     
     def __init__(self, config: ScraperConfig = None, profile_dir: str = None):
         """
@@ -96,11 +100,14 @@ class RealEstateScraper(BaseScraper):
         
         正确格式: https://www.realestate.com.au/rent/in-{postcode}/list-1
         例如: https://www.realestate.com.au/rent/in-2033/list-1
+        增量模式: https://www.realestate.com.au/rent/in-2033/list-1?activeSort=list-date
         """
         postcode = self._extract_postcode(area)
-        if postcode:
-            return f"{self.BASE_URL}/rent/in-{postcode}/list-1"
-        return f"{self.BASE_URL}/rent/in-{area}/list-1"
+        url = f"{self.BASE_URL}/rent/in-{postcode or area}/list-1"
+        # 增量模式按上架时间倒序，新房源排在前面
+        if self.incremental:
+            url += "?activeSort=list-date"
+        return url
     
     def _extract_postcode(self, area: str) -> Optional[str]:
         """从区域字符串提取邮编"""
@@ -118,7 +125,9 @@ class RealEstateScraper(BaseScraper):
         if not self.browser:
             self.browser = BrowserManager(
                 browser_type=BrowserType.PLAYWRIGHT,
-                profile_dir=self.profile_dir
+                profile_dir=self.profile_dir,
+                routing=self.SOURCE.value,
+                site=self.SOURCE.value
             )
             self.browser.create_driver()
             logger.info("Playwright 浏览器已启动")
@@ -148,7 +157,8 @@ class RealEstateScraper(BaseScraper):
                 logger.info(f"爬取第 {page} 页: {page_url}")
                 
                 # 导航到页面 - 检查是否成功
-                if not self.browser.navigate(page_url, wait_time=10.0):
+                self._throttle()
+                if not self.browser.navigate(page_url, wait_time=0):
                     consecutive_failures += 1
                     logger.warning(f"导航失败，连续失败 {consecutive_failures} 次")
                     
@@ -165,11 +175,16 @@ class RealEstateScraper(BaseScraper):
                 # 重置失败计数
                 consecutive_failures = 0
                 
-                # 模拟用户行为
+                # 等待房源卡片渲染完成（内容已到即返回，不再固定等待）
+                ready = self._wait_listing_ready(self.browser)
+                if not ready:
+                    logger.info("房源卡片未在超时内出现，继续滚动等待")
+                
+                # 模拟用户行为（未就绪时按原节奏多滚动几次触发加载）
                 try:
-                    for _ in range(5):
+                    for _ in range(2 if ready else 5):
                         self.browser.scroll_page(random.randint(200, 400))
-                        self.browser.wait(random.uniform(1.0, 2.0))
+                        self.browser.wait(random.uniform(0.3, 0.8) if ready else random.uniform(1.0, 2.0))
                 except Exception as e:
                     logger.warning(f"滚动页面失败: {e}")
                 
@@ -195,13 +210,14 @@ class RealEstateScraper(BaseScraper):
                     except Exception as e:
                         logger.warning(f"Kasada 保护重试时滚动或获取页面内容失败: {e}")
                     
-                    if len(html) < 10000:
+                    if len(html) < self.DETAIL_MIN_HTML:
                         logger.error("页面未能加载，可能需要手动验证")
                         logger.info(f"HTML 长度: {len(html)}")
                         break
                 
-                # 解析页面
-                page_properties = self.parse_listing_page(html)
+                # 解析页面（只解析一次，列表和翻页检查共用）
+                soup = make_soup(html)
+                page_properties = self.parse_listing_page(soup)
                 
                 if not page_properties:
                     logger.info(f"第 {page} 页没有找到房源，停止")
@@ -210,8 +226,12 @@ class RealEstateScraper(BaseScraper):
                 properties.extend(page_properties)
                 logger.info(f"第 {page} 页找到 {len(page_properties)} 个房源")
                 
+                # 增量模式：本页以已知房源为主，后续页面无需再爬
+                if self._page_mostly_known(page_properties):
+                    break
+                
                 # 检查是否有下一页
-                if not self._has_next_page(html):
+                if not self._has_next_page(soup):
                     break
                 
                 page += 1
@@ -229,7 +249,11 @@ class RealEstateScraper(BaseScraper):
         return properties
     
     def scrape_areas(self, areas: List[str]) -> List[PropertyData]:
-        """爬取多个区域"""
+        """爬取多个区域（area_workers > 1 时多进程并发）"""
+        parallel = self._scrape_areas_parallel(areas)
+        if parallel is not None:
+            return parallel
+        
         all_properties = []
         
         try:
@@ -239,7 +263,7 @@ class RealEstateScraper(BaseScraper):
                 logger.info(f"{'='*40}")
                 
                 properties = self.scrape_area(area)
-                all_properties.extend(properties)
+                all_properties.extend(self._tag_area(properties, area))
                 
                 # 短暂等待后继续下一个区域（profile 会在下个区域开始时重置）
                 if i < len(areas) - 1:
@@ -256,15 +280,15 @@ class RealEstateScraper(BaseScraper):
         logger.info(f"\n所有区域爬取完成，共 {len(all_properties)} 个房源")
         return all_properties
     
-    def _has_next_page(self, html: str) -> bool:
+    def _has_next_page(self, html: Markup) -> bool:
         """检查是否有下一页"""
-        soup = BeautifulSoup(html, 'html.parser')
-        next_link = soup.find('a', rel='next') or soup.find('a', class_=lambda c: c and 'next' in str(c).lower())
+        soup = make_soup(html)
+        next_link = self.find_next_button(soup) or soup.select_one('a[class*="next" i]')
         return next_link is not None
     
-    def parse_listing_page(self, html: str) -> List[PropertyData]:
-        """解析 RealEstate 列表页面"""
-        soup = BeautifulSoup(html, "html.parser")
+    def parse_listing_page(self, html: Markup) -> List[PropertyData]:
+        """解析 RealEstate 列表页面（html 可以是已解析的 soup）"""
+        soup = make_soup(html)
         properties = []
         
         # 查找房源卡片
@@ -284,7 +308,7 @@ class RealEstateScraper(BaseScraper):
     def _find_listings(self, soup: BeautifulSoup) -> List:
         """查找所有房源卡片"""
         # RealEstate 2024 页面结构 - article 带 residential-card class
-        listings = soup.find_all('article', class_=lambda c: c and 'residential-card' in str(c))
+        listings = soup.select('article[class*="residential-card"]')
         
         if listings:
             logger.debug(f"Found {len(listings)} article.residential-card elements")
@@ -304,8 +328,11 @@ class RealEstateScraper(BaseScraper):
     
     def _parse_listing_item(self, listing) -> Optional[PropertyData]:
         """解析单个房源"""
+        # 卡片文本只提取一次，价格/特征/类型共用
+        text = listing.get_text()
+        
         # 价格
-        price = self._extract_price(listing)
+        price = self._extract_price(listing, text)
         if price == 0:
             return None
         
@@ -317,10 +344,10 @@ class RealEstateScraper(BaseScraper):
         address_line1, address_line2, suburb, state, postcode, detail_url = address_info
         
         # 特征
-        bedroom_count, bathroom_count, parking_count = self._extract_features(listing)
+        bedroom_count, bathroom_count, parking_count = self._extract_features(listing, text)
         
         # 房产类型
-        property_type, property_type_raw = self._extract_property_type(listing)
+        property_type, property_type_raw = self._extract_property_type(listing, text)
         
         # ID
         house_id = self._extract_house_id(listing, detail_url, address_line1, postcode)
@@ -356,10 +383,11 @@ class RealEstateScraper(BaseScraper):
 
         return prop
     
-    def _extract_price(self, listing) -> int:
+    def _extract_price(self, listing, text: Optional[str] = None) -> int:
         """提取价格"""
         # 直接从文本中搜索价格
-        text = listing.get_text()
+        if text is None:
+            text = listing.get_text()
         
         # 匹配 $XXX per week 或 $XXX pw 格式
         patterns = [
@@ -375,12 +403,12 @@ class RealEstateScraper(BaseScraper):
         
         # 尝试查找价格元素
         price_selectors = [
-            ('span', {'class': lambda c: c and 'price' in str(c).lower()}),
-            ('p', {'class': lambda c: c and 'price' in str(c).lower()}),
+            'span[class*="price" i]',
+            'p[class*="price" i]',
         ]
         
-        for tag, attrs in price_selectors:
-            elem = listing.find(tag, attrs)
+        for selector in price_selectors:
+            elem = listing.select_one(selector)
             if elem:
                 price = extract_price(elem.get_text(strip=True))
                 if price > 0:
@@ -396,22 +424,22 @@ class RealEstateScraper(BaseScraper):
             # aria-label 格式: "504/93 Brompton Road, Kensington"
             # 查找详情链接
             detail_url = ""
-            link = listing.find('a', href=lambda h: h and '/property-' in str(h))
+            link = listing.select_one('a[href*="/property-"]')
             if link:
                 detail_url = link.get('href', '')
             
             return self._parse_address(aria_label, detail_url)
         
         # 备用：从 span 或链接中获取
-        addr_span = listing.find('span', class_=lambda c: c and 'address' in str(c).lower())
+        addr_span = listing.select_one('span[class*="address" i]')
         if addr_span:
             address_text = addr_span.get_text(strip=True)
-            link = listing.find('a', href=lambda h: h and '/property-' in str(h))
+            link = listing.select_one('a[href*="/property-"]')
             detail_url = link.get('href', '') if link else ""
             return self._parse_address(address_text, detail_url)
         
         # 最后尝试：从链接获取
-        links = listing.find_all('a', href=lambda h: h and '/property-' in str(h))
+        links = listing.select('a[href*="/property-"]')
         for link in links:
             text = link.get_text(strip=True)
             if text and ',' in text:
@@ -461,7 +489,7 @@ class RealEstateScraper(BaseScraper):
         
         return (address_line1, address_line2, suburb, state, postcode, detail_url) if address_line1 else None
     
-    def _extract_features(self, listing) -> tuple:
+    def _extract_features(self, listing, text: Optional[str] = None) -> tuple:
         """提取房产特征（卧室、浴室、车位）"""
         bedroom_count = 0
         bathroom_count = 0
@@ -489,7 +517,8 @@ class RealEstateScraper(BaseScraper):
         
         # 如果 SVG 方法失败，尝试从文本匹配
         if bedroom_count == 0:
-            text = listing.get_text()
+            if text is None:
+                text = listing.get_text()
             patterns = [
                 (r'(\d+)\s*(?:bed|bedroom|Bed)', 'bed'),
                 (r'(\d+)\s*(?:bath|bathroom|Bath)', 'bath'),
@@ -509,9 +538,9 @@ class RealEstateScraper(BaseScraper):
         
         return bedroom_count, bathroom_count, parking_count
     
-    def _extract_property_type(self, listing) -> tuple:
+    def _extract_property_type(self, listing, text: Optional[str] = None) -> tuple:
         """提取房产类型"""
-        text = listing.get_text().lower()
+        text = (listing.get_text() if text is None else text).lower()
         
         type_keywords = {
             'apartment': 'Apartment',
@@ -563,21 +592,21 @@ class RealEstateScraper(BaseScraper):
                 return src
         return None
     
-    def parse_detail_page(self, property_data: PropertyData, html: str) -> PropertyData:
-        """解析详情页 - 提取完整描述和其他信息"""
-        soup = BeautifulSoup(html, "html.parser")
+    def parse_detail_page(self, property_data: PropertyData, html: Markup) -> PropertyData:
+        """解析详情页 - 提取完整描述和其他信息（html 可以是已解析的 soup）"""
+        soup = make_soup(html)
         
         # 描述 - 尝试多种选择器
         description = ""
         desc_selectors = [
-            ('div', {'data-testid': 'listing-details__description'}),
-            ('div', {'class': lambda c: c and 'description' in str(c).lower()}),
-            ('div', {'id': lambda i: i and 'description' in str(i).lower()}),
-            ('p', {'class': lambda c: c and 'description' in str(c).lower()}),
+            'div[data-testid="listing-details__description"]',
+            'div[class*="description" i]',
+            'div[id*="description" i]',
+            'p[class*="description" i]',
         ]
         
-        for tag, attrs in desc_selectors:
-            elem = soup.find(tag, attrs)
+        for selector in desc_selectors:
+            elem = soup.select_one(selector)
             if elem:
                 description = elem.get_text(separator=' ', strip=True)
                 if len(description) > 50:  # 确保是有效描述
@@ -680,12 +709,46 @@ class RealEstateScraper(BaseScraper):
         Returns:
             更新后的房产列表
         """
+        for _ in self.iter_property_details(properties, skip_existing=skip_existing):
+            pass
+        return properties
+    
+    def iter_property_details(
+        self,
+        properties: List[PropertyData],
+        skip_existing: bool = True
+    ) -> Iterator[PropertyData]:
+        """
+        逐个爬取房产详情页，每处理完一个房产就 yield 出来
+        
+        Args:
+            properties: 房产列表
+            skip_existing: 是否跳过已有详情的房产（被跳过的不会 yield）
+            
+        Yields:
+            已尝试爬取详情的房产（成功或失败）
+        """
         to_scrape = [p for p in properties if not (skip_existing and p.description_en)]
         logger.info(f"需要爬取详情页的房源数量: {len(to_scrape)}")
 
         if not to_scrape:
             logger.info("没有需要爬取详情的房产")
-            return properties
+            return
+        
+        if self.config.http_details:
+            to_scrape = yield from self._iter_http_details(to_scrape)
+            if not to_scrape:
+                return
+        
+        pool = self._detail_pool(
+            lambda browser, prop: bool(prop.url) and self._scrape_detail(prop, browser),
+            self.profile_dir,
+            reset_every=30,
+        )
+        if pool:
+            yield from pool.run(to_scrape)
+            self.detail_count += pool.stats['success']
+            return
         
         logger.info(f"开始爬取 {len(to_scrape)} 个房产的详情页")
         
@@ -705,47 +768,20 @@ class RealEstateScraper(BaseScraper):
                         self._ensure_browser()
                         time.sleep(3)
                     
-                    url = prop.url
-                    if not url:
-                        continue
-                    
-                    remaining = len(to_scrape) - i
-                    logger.info(f"[{i+1}/{len(to_scrape)}] 剩余 {remaining} | {url[:60]}...")
-                    
-                    # 导航（减少等待时间以提升速度）
-                    if not self.browser.navigate(url, wait_time=3.0):
-                        logger.info(f"  -> 导航失败")
-                        fail_count += 1
-                        continue
-                    
-                    # 快速滚动
-                    self.browser.scroll_page(500)
-                    self.browser.wait(1.0)
-                    self.browser.scroll_page(500)
-                    self.browser.wait(0.5)
-                    
-                    html = self.browser.get_page_source()
-                    
-                    # 检查是否被拦截
-                    if len(html) < 10000:
-                        logger.warning(f"  -> 页面可能被拦截 (HTML: {len(html)} bytes)")
-                        fail_count += 1
-                        continue
-                    
-                    self.parse_detail_page(prop, html)
-                    self.detail_count += 1  # 计数器增加
-                    if prop.description_en:
-                        success_count += 1
-                        logger.info(f"  -> 成功")
-                    else:
-                        logger.info(f"  -> 未获取到描述")
-                    
-                    # 短暂延迟
-                    time.sleep(random.uniform(1, 2))
+                    if prop.url:
+                        remaining = len(to_scrape) - i
+                        logger.info(f"[{i+1}/{len(to_scrape)}] 剩余 {remaining} | {prop.url[:60]}...")
+                        
+                        if self._scrape_detail(prop):
+                            success_count += 1
+                        else:
+                            fail_count += 1
                     
                 except Exception as e:
                     fail_count += 1
                     logger.error(f"爬取详情失败 ({prop.house_id}): {e}")
+                
+                yield prop
             
         except Exception as e:
             logger.error(f"详情爬取失败: {e}")
@@ -757,7 +793,51 @@ class RealEstateScraper(BaseScraper):
                 self.browser = None
         
         logger.info(f"详情爬取完成: 成功 {success_count}, 失败 {fail_count}")
-        return properties
+    
+    def _scrape_detail(self, prop: PropertyData, browser: Optional[BrowserManager] = None) -> bool:
+        """
+        爬取单个房产详情页
+        
+        Args:
+            prop: 房产
+            browser: 使用的浏览器，默认 self.browser（浏览器池的 worker 传入自己的浏览器）
+        
+        Returns:
+            是否成功获取到描述
+        """
+        browser = browser or self.browser
+        
+        if not browser.navigate(prop.url, wait_time=0):
+            logger.info(f"  -> 导航失败")
+            return False
+        
+        # 等待描述节点出现；未出现时滚动触发懒加载
+        if not self._wait_detail_ready(browser):
+            browser.scroll_page(500)
+            browser.wait(1.0)
+            browser.scroll_page(500)
+            browser.wait(0.5)
+        
+        html = browser.get_page_source()
+        
+        # 检查是否被拦截
+        if len(html) < 10000:
+            logger.warning(f"  -> 页面可能被拦截 (HTML: {len(html)} bytes)")
+            return False
+        
+        self.parse_detail_page(prop, html)
+        if browser is self.browser:
+            self.detail_count += 1  # 计数器增加（浏览器池由各 worker 自行计数）
+        
+        # 短暂延迟
+        time.sleep(random.uniform(1, 2))
+        
+        if prop.description_en:
+            logger.info(f"  -> 成功")
+            return True
+        
+        logger.info(f"  -> 未获取到描述")
+        return False
     
     def find_next_button(self, soup: BeautifulSoup) -> Optional[Any]:
         """查找下一页按钮（用于浏览器模式）"""
@@ -0,0 +1,241 @@
+"""
+异步评分引擎
+基于 asyncio + aiohttp 调用 DashScope OpenAI 兼容接口，
+使用信号量控制并发、令牌桶控制 RPM/TPM，429 时抖动退避重试
+"""
+import time
+import random
+import asyncio
+import logging
+from typing import List, Optional, TYPE_CHECKING
+
+from tqdm import tqdm
+
+from ..models import PropertyData
+from ..utils.rate_limit import AsyncTokenBucket
+from ..utils.metrics import metrics
+from .scoring import (
+    SCORING_SYSTEM_PROMPT,
+    KEYWORDS_EN_SYSTEM_PROMPT,
+    KEYWORDS_CN_SYSTEM_PROMPT,
+)
+
+if TYPE_CHECKING:
+    from .scoring import ScoringService
+
+logger = logging.getLogger(__name__)
+
+# 需要退避重试的 HTTP 状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class AsyncScoringEngine:
+    """
+    异步评分引擎
+
+    复用 ScoringService 的提示词、解析逻辑和缓存，只替换调用方式：
+    所有模型请求在同一个事件循环中并发执行，受信号量和两个令牌桶约束。
+    """
+
+    def __init__(self, service: "ScoringService"):
+        self.service = service
+        self.config = service.config
+        self._semaphore = asyncio.Semaphore(max(1, self.config.async_concurrency))
+        self._rpm = AsyncTokenBucket(self.config.rpm_limit)
+        self._tpm = AsyncTokenBucket(self.config.tpm_limit)
+        self._session = None
+        self.stats = {'requests': 0, 'rate_limited': 0, 'failed': 0, 'tokens': 0}
+
+    @staticmethod
+    def _estimate_tokens(system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+        """粗略估算一次请求的 token 数（输入按 3 字符/token，加上输出上限）"""
+        return (len(system_prompt) + len(user_prompt)) // 3 + max_tokens
+
+    async def _call_model(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> Optional[str]:
+        """调用模型 API（异步），失败返回 None"""
+        max_tokens = max_tokens or self.config.max_tokens
+        estimated = self._estimate_tokens(system_prompt, user_prompt, max_tokens)
+        payload = {
+            'model': self.config.model_name,
+            'messages': [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt},
+            ],
+            'temperature': self.config.temperature,
+            'max_tokens': max_tokens,
+            'top_p': 0.9,
+        }
+        url = f"{self.config.api_base_url.rstrip('/')}/chat/completions"
+
+        for attempt in range(self.config.async_max_retries):
+            if attempt:
+                metrics.inc("llm_retries_total", engine="async")
+            await self._rpm.acquire()
+            await self._tpm.acquire(estimated)
+
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    started = time.perf_counter()
+                    async with self._session.post(url, json=payload) as response:
+                        metrics.observe("llm_call_seconds", time.perf_counter() - started, engine="async")
+                        metrics.inc("llm_calls_total", engine="async", status=str(response.status))
+                        if response.status == 200:
+                            data = await response.json()
+                            used = (data.get('usage') or {}).get('total_tokens')
+                            if used:
+                                self.stats['tokens'] += used
+                                if used < estimated:
+                                    self._tpm.refund(estimated - used)
+                            return data['choices'][0]['message']['content']
+
+                        text = await response.text()
+                        if response.status not in RETRY_STATUS:
+                            logger.error(f"API 错误: {response.status} - {text[:200]}")
+                            break
+
+                        if response.status == 429:
+                            self.stats['rate_limited'] += 1
+                            self._rpm.drain()
+                        logger.warning(f"第 {attempt + 1} 次调用返回 {response.status}，稍后重试")
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.inc("llm_calls_total", engine="async", status="exception")
+                logger.error(f"第 {attempt + 1} 次调用失败: {e}")
+
+            # 指数退避 + 抖动，避免并发请求同时重试
+            delay = self.config.retry_base_delay * (2 ** attempt)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        self.stats['failed'] += 1
+        return None
+
+    async def _score(self, description: str):
+        """评分：num_calls 次调用并发执行"""
+        cached = self.service._cache_get("score", SCORING_SYSTEM_PROMPT, description)
+        if cached:
+            return cached["average_score"], cached["scores"]
+
+        user_prompt = self.service._build_score_prompt(description)
+        responses = await asyncio.gather(*[
+            self._call_model(SCORING_SYSTEM_PROMPT, user_prompt)
+            for _ in range(self.config.num_calls)
+        ])
+
+        all_scores = []
+        for response in responses:
+            if response:
+                all_scores.extend(self.service._parse_scores(response))
+
+        return self.service._finish_scores(description, all_scores)
+
+    async def _keywords_en(self, description: str) -> str:
+        cached = self.service._cache_get("keywords_en", KEYWORDS_EN_SYSTEM_PROMPT, description)
+        if cached:
+            return cached
+        response = await self._call_model(KEYWORDS_EN_SYSTEM_PROMPT, description)
+        return self.service._finish_keywords_en(description, response)
+
+    async def _keywords_cn(self, description: str) -> str:
+        cached = self.service._cache_get("keywords_cn", KEYWORDS_CN_SYSTEM_PROMPT, description)
+        if cached:
+            return cached
+        response = await self._call_model(KEYWORDS_CN_SYSTEM_PROMPT, description)
+        return self.service._finish_keywords_cn(description, response)
+
+    async def process_property(self, prop: PropertyData, force_update: bool = False) -> PropertyData:
+        """处理单个房产：评分和中英文关键词三类请求并发执行"""
+        description = prop.description_en or ""
+        if not description.strip():
+            return prop
+
+        need_score = force_update or not prop.average_score
+        need_en = force_update or not prop.keywords
+        need_cn = force_update or not prop.description_cn
+
+        async def noop():
+            return None
+
+        score, keywords_en, keywords_cn = await asyncio.gather(
+            self._score(description) if need_score else noop(),
+            self._keywords_en(description) if need_en else noop(),
+            self._keywords_cn(description) if need_cn else noop(),
+        )
+
+        if need_score:
+            prop.average_score, prop.scores = score
+        if need_en:
+            prop.keywords = keywords_en
+        if need_cn:
+            prop.description_cn = keywords_cn
+
+        return prop
+
+    async def process_batch(self, properties: List[PropertyData], force_update: bool = False):
+        """批量处理：一次请求多个房源，缺失的回退到逐个处理"""
+        pending = [p for p in properties if not self.service._apply_cached(p, force_update)]
+        if not pending:
+            return
+
+        system_prompt, user_prompt = self.service._build_batch_prompt(pending)
+        response = await self._call_model(
+            system_prompt,
+            user_prompt,
+            max_tokens=self.config.batch_tokens_per_item * len(pending),
+        )
+        fallback = self.service._apply_batch_response(pending, response, force_update)
+
+        if fallback:
+            logger.warning(f"批量结果缺失或格式错误，{len(fallback)}/{len(pending)} 个房源回退到逐个处理")
+            await asyncio.gather(*[self.process_property(p, force_update) for p in fallback])
+
+    async def run(self, properties: List[PropertyData], force_update: bool = False) -> dict:
+        """
+        并发处理房产列表
+
+        Returns:
+            统计信息 {requests, rate_limited, failed, tokens}
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            logger.error("aiohttp not installed. Install with: pip install aiohttp")
+            raise
+
+        headers = {
+            'Authorization': f"Bearer {self.service.api_key}",
+            'Content-Type': 'application/json',
+        }
+        timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
+        connector = aiohttp.TCPConnector(limit=max(1, self.config.async_concurrency))
+
+        batch_size = max(1, self.config.batch_size)
+        async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as session:
+            self._session = session
+            if batch_size > 1:
+                tasks = [
+                    self.process_batch(properties[i:i + batch_size], force_update)
+                    for i in range(0, len(properties), batch_size)
+                ]
+            else:
+                tasks = [self.process_property(prop, force_update) for prop in properties]
+
+            for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="评分进度"):
+                try:
+                    await future
+                except Exception as e:
+                    logger.error(f"处理失败: {e}")
+
+        self._session = None
+        logger.info(
+            f"异步评分完成: 请求 {self.stats['requests']} 次, 429 {self.stats['rate_limited']} 次, "
+            f"失败 {self.stats['failed']} 次, token {self.stats['tokens']}"
+        )
+        return self.stats
@@ -4,6 +4,7 @@
 """
 import time
 import logging
+import threading
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -13,6 +14,7 @@ from tqdm import tqdm
 
 from ..models import PropertyData
 from ..config import settings, CommuteConfig, SCHOOL_COORDINATES
+from ..utils import SqliteCache, normalize_address, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,68 @@ class CommuteService:
         
         if self.config.api_key:
             self.gmaps = googlemaps.Client(key=self.config.api_key)
+        
+        # 地址 -> "lat,lng"（None 表示地理编码失败），同一地址只编码一次
+        self._geocode_cache: Dict[str, Optional[str]] = {}
+        self._geocode_lock = threading.Lock()
+        
+        # 通勤时间持久化缓存：(归一化地址, 学校, 出发时段) -> 分钟
+        self.cache: Optional[SqliteCache] = None
+        if self.config.cache_enabled:
+            try:
+                self.cache = SqliteCache(
+                    self.config.cache_path,
+                    namespace="commute",
+                    ttl_seconds=self.config.cache_max_age_days * 86400,
+                    max_entries=self.config.cache_max_entries,
+                )
+            except Exception as e:
+                logger.warning(f"通勤缓存初始化失败，不使用缓存: {e}")
+        self.cache_hits = 0
+        self._cache_hits_lock = threading.Lock()
+    
+    @staticmethod
+    def _departure_time() -> datetime:
+        """出发时间：明天早上 8:30"""
+        return (
+            datetime.now()
+            .replace(hour=8, minute=30, second=0, microsecond=0) 
+            + timedelta(days=1)
+        )
+    
+    @classmethod
+    def _departure_bucket(cls) -> str:
+        """出发时段（工作日/周末 + 时刻），作为缓存键的一部分"""
+        departure = cls._departure_time()
+        day = "weekend" if departure.weekday() >= 5 else "weekday"
+        return f"{day}-{departure:%H%M}"
+    
+    def _cache_key(self, address: str, university: str) -> str:
+        return SqliteCache.make_key(normalize_address(address), university, self._departure_bucket())
+    
+    def get_cached(self, address: str, university: str) -> Optional[int]:
+        """读取缓存的通勤时间，没有或已过期返回 None"""
+        if self.cache is None or not address:
+            return None
+        try:
+            value = self.cache.get(self._cache_key(address, university))
+        except Exception as e:
+            logger.warning(f"读取通勤缓存失败: {e}")
+            return None
+        if value is not None:
+            with self._cache_hits_lock:
+                self.cache_hits += 1
+            metrics.inc("maps_cache_hits_total")
+        return value
+    
+    def set_cached(self, address: str, university: str, minutes: Optional[int]):
+        """写入通勤缓存（失败结果不缓存）"""
+        if self.cache is None or not address or minutes is None:
+            return
+        try:
+            self.cache.set(self._cache_key(address, university), minutes)
+        except Exception as e:
+            logger.warning(f"写入通勤缓存失败: {e}")
     
     def _get_address(self, prop: PropertyData) -> str:
         """获取房产完整地址"""
@@ -71,19 +135,14 @@ class CommuteService:
         
         try:
             # 使用明天早上 8:30 作为出发时间
-            tomorrow_morning = (
-                datetime.now()
-                .replace(hour=8, minute=30, second=0, microsecond=0) 
-                + timedelta(days=1)
-            )
-            
-            result = self.gmaps.directions(
-                origin=origin,
-                destination=destination,
-                mode="transit",
-                departure_time=tomorrow_morning,
-                alternatives=False
-            )
+            with metrics.timer("maps_call_seconds", api="directions"):
+                result = self.gmaps.directions(
+                    origin=origin,
+                    destination=destination,
+                    mode="transit",
+                    departure_time=self._departure_time(),
+                    alternatives=False
+                )
             
             if result and len(result) > 0:
                 route = result[0]
@@ -98,9 +157,11 @@ class CommuteService:
                 return None
                 
         except googlemaps.exceptions.ApiError as e:
+            metrics.inc("maps_errors_total", api="directions")
             logger.error(f"Google Maps API 错误: {e}")
             return None
         except Exception as e:
+            metrics.inc("maps_errors_total", api="directions")
             logger.error(f"计算通勤时间失败: {e}")
             return None
     
@@ -123,19 +184,14 @@ class CommuteService:
             return None
         
         try:
-            tomorrow_morning = (
-                datetime.now()
-                .replace(hour=8, minute=30, second=0, microsecond=0) 
-                + timedelta(days=1)
-            )
-            
-            result = self.gmaps.distance_matrix(
-                origins=[origin],
-                destinations=[destination],
-                mode="driving",
-                departure_time=tomorrow_morning,
-                traffic_model="best_guess"
-            )
+            with metrics.timer("maps_call_seconds", api="distance_matrix"):
+                result = self.gmaps.distance_matrix(
+                    origins=[origin],
+                    destinations=[destination],
+                    mode="driving",
+                    departure_time=self._departure_time(),
+                    traffic_model="best_guess"
+                )
             
             if (result['status'] == 'OK' and 
                 result['rows'][0]['elements'][0]['status'] == 'OK'):
@@ -146,9 +202,208 @@ class CommuteService:
             return None
             
         except Exception as e:
+            metrics.inc("maps_errors_total", api="distance_matrix")
             logger.error(f"计算驾车时间失败: {e}")
             return None
     
+    def geocode(self, address: str) -> Optional[str]:
+        """
+        地理编码（带缓存）
+        
+        Returns:
+            "lat,lng" 字符串，失败返回 None
+        """
+        if not self.gmaps or not address:
+            return None
+        
+        with self._geocode_lock:
+            if address in self._geocode_cache:
+                return self._geocode_cache[address]
+        
+        location = None
+        try:
+            with metrics.timer("maps_call_seconds", api="geocode"):
+                result = self.gmaps.geocode(address, region="au")
+            if result:
+                loc = result[0]['geometry']['location']
+                location = f"{loc['lat']:.6f},{loc['lng']:.6f}"
+        except Exception as e:
+            metrics.inc("maps_errors_total", api="geocode")
+            logger.error(f"地理编码失败: {address[:30]}... {e}")
+        
+        with self._geocode_lock:
+            self._geocode_cache[address] = location
+        return location
+    
+    def _matrix_minutes(
+        self, 
+        origins: List[str], 
+        destinations: List[str], 
+        mode: str
+    ) -> List[List[Optional[int]]]:
+        """
+        调用 Distance Matrix，返回 origins x destinations 的分钟数矩阵（失败元素为 None）
+        """
+        empty = [[None] * len(destinations) for _ in origins]
+        try:
+            kwargs = {}
+            if mode == "driving":
+                kwargs['traffic_model'] = "best_guess"
+            
+            with metrics.timer("maps_call_seconds", api="distance_matrix"):
+                result = self.gmaps.distance_matrix(
+                    origins=origins,
+                    destinations=destinations,
+                    mode=mode,
+                    departure_time=self._departure_time(),
+                    **kwargs
+                )
+        except Exception as e:
+            metrics.inc("maps_errors_total", api="distance_matrix")
+            logger.error(f"Distance Matrix ({mode}) 调用失败: {e}")
+            return empty
+        finally:
+            time.sleep(self.config.request_delay)  # API 限流
+        
+        if result.get('status') != 'OK':
+            metrics.inc("maps_errors_total", api="distance_matrix")
+            logger.error(f"Distance Matrix ({mode}) 错误: {result.get('status')}")
+            return empty
+        
+        minutes = []
+        for row in result['rows']:
+            values = []
+            for element in row['elements']:
+                if element.get('status') == 'OK':
+                    values.append(int(round(element['duration']['value'] / 60)))
+                else:
+                    values.append(None)
+            minutes.append(values)
+        return minutes
+    
+    def _matrix_chunk(
+        self, 
+        origins: List[str], 
+        universities: List[str]
+    ) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        计算一组起点到所有目标大学的通勤时间
+        公交不可达的起点再用一次驾车矩阵估算（驾车时间 * 1.5）
+        """
+        destinations = [SCHOOL_COORDINATES[u] for u in universities]
+        transit = self._matrix_minutes(origins, destinations, "transit")
+        
+        results = {
+            origin: {u: (m if m and m > 0 else None) for u, m in zip(universities, row)}
+            for origin, row in zip(origins, transit)
+        }
+        
+        missing = [o for o in origins if any(v is None for v in results[o].values())]
+        if missing:
+            driving = self._matrix_minutes(missing, destinations, "driving")
+            for origin, row in zip(missing, driving):
+                for university, minutes in zip(universities, row):
+                    if results[origin][university] is None and minutes and minutes > 0:
+                        # 估算公交时间为驾车时间的 1.5 倍
+                        results[origin][university] = int(minutes * 1.5)
+        
+        return results
+    
+    def calculate_commute_matrix(
+        self, 
+        properties: List[PropertyData], 
+        universities: List[str]
+    ) -> Dict[str, Dict[str, Optional[int]]]:
+        """
+        批量计算通勤时间
+        
+        每个地址只地理编码一次，坐标相同的房产共用一个起点；
+        Distance Matrix 每次请求最多 matrix_max_origins 个起点 x 所有目标大学
+        （元素数不超过 matrix_max_elements）。
+        
+        Args:
+            properties: 房产列表
+            universities: 大学代码列表
+            
+        Returns:
+            {house_id: {university: 通勤时间(分钟) 或 None}}
+        """
+        universities = [u for u in universities if u in SCHOOL_COORDINATES]
+        if not self.gmaps or not universities:
+            return {}
+        
+        # 地址 -> 房产
+        by_address: Dict[str, List[PropertyData]] = {}
+        for prop in properties:
+            address = self._get_address(prop)
+            if address:
+                by_address.setdefault(address, []).append(prop)
+            else:
+                logger.debug(f"无法获取房产地址: {prop.house_id}")
+        
+        results = {
+            prop.house_id: {u: None for u in universities}
+            for prop in properties
+        }
+        
+        # 先查持久化缓存，所有学校都命中的地址不再请求 API
+        cached_count = 0
+        for address in list(by_address.keys()):
+            cached = {u: self.get_cached(address, u) for u in universities}
+            if all(v is not None for v in cached.values()):
+                for prop in by_address.pop(address):
+                    results[prop.house_id] = cached
+                cached_count += 1
+        
+        if cached_count:
+            logger.info(f"通勤缓存命中 {cached_count} 个地址")
+        if not by_address:
+            return results
+        
+        # 地理编码（并发），编码失败时直接用地址字符串作为起点
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+            locations = list(tqdm(
+                executor.map(self.geocode, by_address.keys()),
+                total=len(by_address), desc="地理编码"
+            ))
+        
+        origin_props: Dict[str, List[PropertyData]] = {}
+        origin_addresses: Dict[str, List[str]] = {}
+        for (address, props), location in zip(by_address.items(), locations):
+            origin_props.setdefault(location or address, []).extend(props)
+            origin_addresses.setdefault(location or address, []).append(address)
+        
+        origins = list(origin_props.keys())
+        per_request = max(1, min(
+            self.config.matrix_max_origins,
+            self.config.matrix_max_elements // len(universities)
+        ))
+        chunks = [origins[i:i + per_request] for i in range(0, len(origins), per_request)]
+        
+        logger.info(
+            f"批量通勤: {len(properties)} 个房产, {len(by_address)} 个地址, "
+            f"{len(origins)} 个起点, {len(chunks)} 次矩阵请求 x {len(universities)} 所大学"
+        )
+        
+        origin_results: Dict[str, Dict[str, Optional[int]]] = {}
+        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+            futures = [executor.submit(self._matrix_chunk, chunk, universities) for chunk in chunks]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="计算通勤时间"):
+                try:
+                    origin_results.update(future.result())
+                except Exception as e:
+                    logger.error(f"处理失败: {e}")
+        
+        for origin, props in origin_props.items():
+            times = origin_results.get(origin, {})
+            for prop in props:
+                results[prop.house_id] = {u: times.get(u) for u in universities}
+            for address in origin_addresses[origin]:
+                for university in universities:
+                    self.set_cached(address, university, times.get(university))
+        
+        return results
+    
     def calculate_commute_time(
         self, 
         prop: PropertyData, 
@@ -164,16 +419,36 @@ class CommuteService:
         Returns:
             通勤时间（分钟）
         """
+        commute_time, _ = self._lookup_commute_time(prop, university)
+        return commute_time
+    
+    def _lookup_commute_time(self, prop: PropertyData, university: str) -> tuple:
+        """
+        计算通勤时间，同时返回是否调用了 API（命中缓存或缺少地址时不调用）
+        
+        Returns:
+            (通勤时间（分钟）, 是否调用了 API)
+        """
         destination = SCHOOL_COORDINATES.get(university)
         if not destination:
             logger.warning(f"未知大学: {university}")
-            return None
+            return None, False
         
         origin = self._get_address(prop)
         if not origin:
             logger.debug(f"无法获取房产地址: {prop.house_id}")
-            return None
+            return None, False
+        
+        cached = self.get_cached(origin, university)
+        if cached is not None:
+            return cached, False
         
+        commute_time = self._calculate_commute_time(origin, destination)
+        self.set_cached(origin, university, commute_time)
+        return commute_time, True
+    
+    def _calculate_commute_time(self, origin: str, destination: str) -> Optional[int]:
+        """调用 API 计算通勤时间：公交优先，失败时用驾车时间估算"""
         # 首先尝试公交
         transit_time = self.calculate_transit_time(origin, destination)
         if transit_time and transit_time > 0:
@@ -195,10 +470,23 @@ class CommuteService:
         university: str
     ) -> tuple:
         """处理单个房产的通勤时间"""
-        commute_time = self.calculate_commute_time(prop, university)
-        time.sleep(self.config.request_delay)  # API 限流
+        commute_time, requested = self._lookup_commute_time(prop, university)
+        if requested:
+            time.sleep(self.config.request_delay)  # API 限流（命中缓存时不需要）
         return prop.house_id, commute_time
     
+    def process_property(self, prop: PropertyData, university: str) -> Optional[int]:
+        """
+        计算单个房产到指定大学的通勤时间并写回 prop.commute_times
+        （优先读缓存，调用了 API 时按 request_delay 限流，可在多个线程中并发调用）
+        
+        Returns:
+            通勤时间（分钟）
+        """
+        _, commute_time = self._process_single_property(prop, university)
+        prop.commute_times[university] = commute_time
+        return commute_time
+    
     def process_properties(
         self, 
         properties: List[PropertyData],
@@ -234,6 +522,11 @@ class CommuteService:
         
         logger.info(f"开始计算 {len(to_process)} 个房产到 {university} 的通勤时间")
         
+        if self.config.matrix_enabled:
+            results = self.calculate_commute_matrix(to_process, [university])
+            self._apply_results(properties, results)
+            return properties
+        
         successful = 0
         failed = 0
         
@@ -287,6 +580,17 @@ class CommuteService:
         if universities is None:
             universities = list(SCHOOL_COORDINATES.keys())
         
+        if self.gmaps and self.config.matrix_enabled:
+            # 一次矩阵请求同时覆盖所有大学
+            to_process = [
+                p for p in properties
+                if not skip_existing or any(p.commute_times.get(u) is None for u in universities)
+            ]
+            if to_process:
+                results = self.calculate_commute_matrix(to_process, universities)
+                self._apply_results(properties, results, skip_existing)
+            return properties
+        
         for university in universities:
             properties = self.process_properties(
                 properties, 
@@ -295,4 +599,27 @@ class CommuteService:
             )
         
         return properties
-
+    
+    def _apply_results(
+        self, 
+        properties: List[PropertyData], 
+        results: Dict[str, Dict[str, Optional[int]]],
+        skip_existing: bool = False
+    ):
+        """将批量结果写回房产"""
+        successful = 0
+        failed = 0
+        for prop in properties:
+            times = results.get(prop.house_id)
+            if times is None:
+                continue
+            for university, commute_time in times.items():
+                if skip_existing and prop.commute_times.get(university) is not None:
+                    continue
+                prop.commute_times[university] = commute_time
+                if commute_time is not None:
+                    successful += 1
+                else:
+                    failed += 1
+        
+        logger.info(f"通勤时间计算完成: 成功 {successful}, 失败 {failed}")
@@ -2,8 +2,10 @@
 数据库服务
 统一的数据库操作接口
 """
+import json
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
 from contextlib import contextmanager
 
@@ -12,10 +14,21 @@ from mysql.connector import Error
 
 from ..models import PropertyData, RegionInfo
 from ..config import settings, DatabaseConfig, SCHOOL_NAME_MAPPING
-from ..utils import safe_int, safe_float, safe_str, safe_datetime, truncate_string
+from ..utils import safe_int, safe_float, safe_str, safe_datetime, truncate_string, metrics
 
 logger = logging.getLogger(__name__)
 
+# properties 表写入列（顺序与 _property_row 一致）
+PROPERTY_COLUMNS = (
+    "price", "address", "region_id", "bedroom_count", "bathroom_count",
+    "parking_count", "property_type", "house_id", "available_date",
+    "keywords", "average_score", "description_en", "description_cn",
+    "url", "published_at", "thumbnail_url", "content_hash",
+)
+
+# 不参与内容指纹的列（published_at 缺失时取当前时间，每次都会变化）
+FINGERPRINT_EXCLUDED = {"published_at", "content_hash"}
+
 
 class DatabaseService:
     """
@@ -28,6 +41,9 @@ class DatabaseService:
         self.connection = None
         self.cursor = None
         self._existing_house_ids: Set[str] = set()
+        # 会话级区域/学校缓存（name -> id），首次使用时各一次 SELECT 加载
+        self._region_cache: Optional[Dict[str, int]] = None
+        self._school_cache: Optional[Dict[str, int]] = None
     
     def connect(self):
         """连接数据库"""
@@ -70,6 +86,7 @@ class DatabaseService:
     @contextmanager
     def session(self):
         """数据库会话上下文管理器"""
+        self.clear_lookups()
         try:
             self.connect()
             yield self
@@ -79,12 +96,33 @@ class DatabaseService:
             raise
         finally:
             self.disconnect()
+            self.clear_lookups()
+    
+    def load_lookups(self):
+        """加载区域和学校映射（regions/schools 表很小且基本不变）"""
+        self.cursor.execute("SELECT id, name FROM regions")
+        self._region_cache = {name: region_id for region_id, name in self.cursor.fetchall()}
+        
+        self.cursor.execute("SELECT id, name FROM schools")
+        self._school_cache = {name: school_id for school_id, name in self.cursor.fetchall()}
+        
+        logger.info(f"已加载 {len(self._region_cache)} 个区域, {len(self._school_cache)} 个学校")
     
-    def load_existing_house_ids(self):
+    def clear_lookups(self):
+        """清空区域/学校缓存（会话结束或外部修改表后调用）"""
+        self._region_cache = None
+        self._school_cache = None
+    
+    def _ensure_lookups(self):
+        if self._region_cache is None or self._school_cache is None:
+            self.load_lookups()
+    
+    def load_existing_house_ids(self) -> Set[str]:
         """加载已存在的 house_id 集合"""
         self.cursor.execute("SELECT house_id FROM properties WHERE house_id IS NOT NULL")
         self._existing_house_ids = {str(row[0]) for row in self.cursor.fetchall()}
         logger.info(f"已加载 {len(self._existing_house_ids)} 个现有房源ID")
+        return self._existing_house_ids
     
     def house_id_exists(self, house_id: str) -> bool:
         """检查 house_id 是否存在"""
@@ -95,41 +133,68 @@ class DatabaseService:
         if not region_info:
             return None
         
-        try:
-            # 查询已有区域
-            self.cursor.execute(
-                "SELECT id FROM regions WHERE name = %s AND state = %s AND postcode = %s",
-                (region_info.name, region_info.state, region_info.postcode)
-            )
-            result = self.cursor.fetchone()
-            
-            if result:
-                return result[0]
-            
-            # 创建新区域
-            self.cursor.execute(
-                "INSERT INTO regions (name, state, postcode) VALUES (%s, %s, %s)",
-                (region_info.name, region_info.state, region_info.postcode)
-            )
-            self.commit()
-            return self.cursor.lastrowid
-            
-        except Exception as e:
-            logger.error(f"获取/创建区域失败: {e}")
-            return None
+        return self.ensure_regions([region_info]).get(region_info.name)
+    
+    def ensure_regions(self, region_infos: List[RegionInfo]) -> Dict[str, int]:
+        """
+        批量获取或创建区域
+        
+        已有区域从会话缓存中读取；缺失的区域一次 executemany 插入，
+        再一次 SELECT 取回 id 并加入缓存。
+        
+        Returns:
+            区域名 -> id（创建失败的区域不在结果中）
+        """
+        self._ensure_lookups()
+        
+        missing: Dict[str, RegionInfo] = {}
+        for info in region_infos:
+            if info and info.name not in self._region_cache:
+                missing.setdefault(info.name, info)
+        
+        if missing:
+            try:
+                # regions.name 唯一，并发创建的同名区域不会报错
+                self.cursor.executemany(
+                    """
+                    INSERT INTO regions (name, state, postcode) VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE id = id
+                    """,
+                    [(info.name, info.state, info.postcode) for info in missing.values()]
+                )
+                self.commit()
+                
+                names = list(missing.keys())
+                placeholders = ", ".join(["%s"] * len(names))
+                self.cursor.execute(
+                    f"SELECT id, name FROM regions WHERE name IN ({placeholders})",
+                    tuple(names)
+                )
+                for region_id, name in self.cursor.fetchall():
+                    self._region_cache[name] = region_id
+                
+                logger.info(f"新建区域 {len(missing)} 个")
+                
+            except Exception as e:
+                logger.error(f"获取/创建区域失败: {e}")
+        
+        return {
+            info.name: self._region_cache[info.name]
+            for info in region_infos
+            if info and info.name in self._region_cache
+        }
     
     def get_school_id(self, school_name: str) -> Optional[int]:
         """获取学校 ID"""
         try:
-            self.cursor.execute("SELECT id FROM schools WHERE name = %s", (school_name,))
-            result = self.cursor.fetchone()
-            
-            if result:
-                return result[0]
+            self._ensure_lookups()
+            if school_name in self._school_cache:
+                return self._school_cache[school_name]
             
             # 创建新学校
             self.cursor.execute("INSERT INTO schools (name) VALUES (%s)", (school_name,))
             self.commit()
+            self._school_cache[school_name] = self.cursor.lastrowid
             return self.cursor.lastrowid
             
         except Exception as e:
@@ -143,7 +208,7 @@ class DatabaseService:
                 """
                 SELECT id, price, address, bedroom_count, bathroom_count, 
                        parking_count, keywords, average_score, description_en, 
-                       url, release_time
+                       url, release_time, content_hash
                 FROM properties WHERE house_id = %s
                 """,
                 (house_id,)
@@ -162,7 +227,8 @@ class DatabaseService:
                     'average_score': result[7],
                     'description_en': result[8],
                     'url': result[9],
-                    'release_time': result[10]
+                    'release_time': result[10],
+                    'content_hash': result[11]
                 }
             return None
             
@@ -170,36 +236,51 @@ class DatabaseService:
             logger.error(f"查询房产失败: {e}")
             return None
     
+    @staticmethod
+    def content_fingerprint(row: tuple) -> str:
+        """
+        计算房产行的内容指纹（md5）
+        覆盖价格、地址、区域、房型、描述、关键词、评分、缩略图等写入列
+        """
+        content = [
+            value for col, value in zip(PROPERTY_COLUMNS, row)
+            if col not in FINGERPRINT_EXCLUDED
+        ]
+        payload = json.dumps(content, ensure_ascii=False, default=str)
+        return hashlib.md5(payload.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def _property_row(cls, prop: PropertyData, region_id: int) -> tuple:
+        """房产写入值（列顺序见 PROPERTY_COLUMNS，最后一列为内容指纹）"""
+        row = (
+            prop.price_per_week,
+            truncate_string(prop.address_line1, 60),
+            region_id,
+            prop.bedroom_count,
+            prop.bathroom_count,
+            prop.parking_count,
+            prop.property_type,
+            prop.house_id,
+            prop.available_date,
+            truncate_string(prop.keywords, 255) if prop.keywords else None,
+            prop.average_score,
+            truncate_string(prop.description_en, 1024) if prop.description_en else None,
+            truncate_string(prop.description_cn, 1024) if prop.description_cn else None,
+            truncate_string(prop.url, 255) if prop.url else None,
+            prop.published_at or datetime.now(),
+            prop.thumbnail_url
+        )
+        return row + (cls.content_fingerprint(row),)
+    
     def insert_property(self, prop: PropertyData, region_id: int) -> Optional[int]:
         """插入新房产"""
         try:
-            insert_sql = """
-            INSERT INTO properties (
-                price, address, region_id, bedroom_count, bathroom_count,
-                parking_count, property_type, house_id, available_date, 
-                keywords, average_score, description_en, description_cn,
-                url, published_at, thumbnail_url
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            insert_sql = f"""
+            INSERT INTO properties ({", ".join(PROPERTY_COLUMNS)})
+            VALUES ({", ".join(["%s"] * len(PROPERTY_COLUMNS))})
             """
             
-            values = (
-                prop.price_per_week,
-                truncate_string(prop.address_line1, 60),
-                region_id,
-                prop.bedroom_count,
-                prop.bathroom_count,
-                prop.parking_count,
-                prop.property_type,
-                prop.house_id,
-                prop.available_date,
-                truncate_string(prop.keywords, 255) if prop.keywords else None,
-                prop.average_score,
-                truncate_string(prop.description_en, 1024) if prop.description_en else None,
-                truncate_string(prop.description_cn, 1024) if prop.description_cn else None,
-                truncate_string(prop.url, 255) if prop.url else None,
-                prop.published_at or datetime.now(),
-                prop.thumbnail_url
-            )
+            values = self._property_row(prop, region_id)
             
             self.cursor.execute(insert_sql, values)
             property_id = self.cursor.lastrowid
@@ -217,36 +298,14 @@ class DatabaseService:
     def update_property(self, property_id: int, prop: PropertyData, region_id: int) -> bool:
         """更新房产信息"""
         try:
-            update_sql = """
-            UPDATE properties SET
-                price = %s, address = %s, region_id = %s,
-                bedroom_count = %s, bathroom_count = %s,
-                parking_count = %s, property_type = %s,
-                available_date = %s, keywords = %s,
-                average_score = %s, description_en = %s,
-                description_cn = %s, url = %s, published_at = %s,
-                thumbnail_url = %s
+            columns = [col for col in PROPERTY_COLUMNS if col != "house_id"]
+            update_sql = f"""
+            UPDATE properties SET {", ".join(f"{col} = %s" for col in columns)}
             WHERE id = %s
             """
             
-            values = (
-                prop.price_per_week,
-                truncate_string(prop.address_line1, 60),
-                region_id,
-                prop.bedroom_count,
-                prop.bathroom_count,
-                prop.parking_count,
-                prop.property_type,
-                prop.available_date,
-                truncate_string(prop.keywords, 255) if prop.keywords else None,
-                prop.average_score,
-                truncate_string(prop.description_en, 1024) if prop.description_en else None,
-                truncate_string(prop.description_cn, 1024) if prop.description_cn else None,
-                truncate_string(prop.url, 255) if prop.url else None,
-                prop.published_at or datetime.now(),
-                prop.thumbnail_url,
-                property_id
-            )
+            row = dict(zip(PROPERTY_COLUMNS, self._property_row(prop, region_id)))
+            values = tuple(row[col] for col in columns) + (property_id,)
             
             self.cursor.execute(update_sql, values)
             return True
@@ -295,11 +354,15 @@ class DatabaseService:
             university: 大学代码 (UNSW, USYD, UTS)
             
         Returns:
-            统计信息 {inserted, updated, skipped, errors}
+            统计信息 {inserted, updated, unchanged, skipped, errors}
         """
+        if self.config.bulk_save:
+            return self.save_properties_bulk(properties, university)
+        
         stats = {
             'inserted': 0,
             'updated': 0,
+            'unchanged': 0,
             'skipped': 0,
             'errors': 0
         }
@@ -314,9 +377,6 @@ class DatabaseService:
             logger.error(f"无法获取学校ID: {school_name}")
             return stats
         
-        # 加载已有 house_id
-        self.load_existing_house_ids()
-        
         for prop in properties:
             try:
                 # 获取或创建区域
@@ -330,8 +390,18 @@ class DatabaseService:
                 
                 # 检查是否已存在
                 existing = self.get_property_by_house_id(prop.house_id)
+                commute_time = prop.commute_times.get(university)
                 
-                if existing:
+                if existing and existing['content_hash'] == self._property_row(prop, region_id)[-1]:
+                    # 内容未变化：不写 properties；通勤时间也相同时整条跳过
+                    house_id = str(prop.house_id)
+                    commutes = self._load_commute_times(school_id, [house_id])
+                    if house_id in commutes and commutes[house_id] == commute_time:
+                        stats['unchanged'] += 1
+                        continue
+                    property_id = existing['id']
+                    stats['updated'] += 1
+                elif existing:
                     # 更新现有记录
                     if self.update_property(existing['id'], prop, region_id):
                         property_id = existing['id']
@@ -349,7 +419,6 @@ class DatabaseService:
                         continue
                 
                 # 更新房产-学校关系
-                commute_time = prop.commute_times.get(university)
                 self.upsert_property_school(property_id, school_id, commute_time)
                 
                 # 定期提交
@@ -359,12 +428,252 @@ class DatabaseService:
             except Exception as e:
                 logger.error(f"保存房产失败 ({prop.house_id}): {e}")
                 stats['errors'] += 1
+                metrics.inc("db_errors_total", kind="row")
         
         # 最终提交
         self.commit()
         
         logger.info(f"保存完成: 新增 {stats['inserted']}, 更新 {stats['updated']}, "
-                   f"跳过 {stats['skipped']}, 错误 {stats['errors']}")
+                   f"未变化 {stats['unchanged']}, 跳过 {stats['skipped']}, 错误 {stats['errors']}")
         
+        self._record_save_metrics(stats, university)
         return stats
-
+    
+    def save_properties_bulk(
+        self, 
+        properties: List[PropertyData], 
+        university: str
+    ) -> Dict[str, int]:
+        """
+        批量保存房产数据（bulk 模式）
+        
+        每批 config.bulk_batch_size 条：
+        1. executemany INSERT ... ON DUPLICATE KEY UPDATE 写入 properties（按 house_id 唯一键）
+        2. 一次 SELECT 取回本批房产 id
+        3. executemany INSERT ... ON DUPLICATE KEY UPDATE 写入 property_school
+        4. 提交
+        区域从会话缓存中解析。某一批失败时回滚，并逐条重试以定位错误行。
+        
+        变更检测：内容指纹与库中 content_hash 相同的房产不写 properties，
+        通勤时间与库中 property_school 相同的不写 property_school，两者都相同计为 unchanged。
+        
+        Args:
+            properties: 房产列表
+            university: 大学代码 (UNSW, USYD, UTS)
+            
+        Returns:
+            统计信息 {inserted, updated, unchanged, skipped, errors}
+        """
+        stats = {
+            'inserted': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'errors': 0
+        }
+        
+        school_name = SCHOOL_NAME_MAPPING.get(university)
+        if not school_name:
+            logger.error(f"未知的大学代码: {university}")
+            return stats
+        
+        school_id = self.get_school_id(school_name)
+        if not school_id:
+            logger.error(f"无法获取学校ID: {school_name}")
+            return stats
+        
+        # 解析区域（缺失的区域批量创建），同一 house_id 只保留最后一条
+        region_infos = [RegionInfo.from_address_line2(prop.address_line2) for prop in properties]
+        region_ids = self.ensure_regions([info for info in region_infos if info])
+        
+        rows: Dict[str, tuple] = {}
+        for prop, region_info in zip(properties, region_infos):
+            region_id = region_ids.get(region_info.name) if region_info else None
+            if not region_id:
+                logger.warning(f"无法解析区域: {prop.address_line2}")
+                stats['skipped'] += 1
+                continue
+            
+            rows[str(prop.house_id)] = (prop, region_id)
+        
+        # 只查询本次要保存的房源（调用方常按几十条一批保存）
+        fingerprints = self._load_fingerprints(list(rows))
+        commutes = self._load_commute_times(school_id, list(rows))
+        
+        # 变更检测
+        items = []
+        for house_id, (prop, region_id) in rows.items():
+            row = self._property_row(prop, region_id)
+            commute_time = prop.commute_times.get(university)
+            write_property = fingerprints.get(house_id) != row[-1]
+            write_school = house_id not in commutes or commutes[house_id] != commute_time
+            
+            if not write_property and not write_school:
+                stats['unchanged'] += 1
+                continue
+            items.append((prop, row, write_property, write_school))
+        
+        if stats['unchanged']:
+            logger.info(f"跳过未变化房源 {stats['unchanged']} 个")
+        
+        batch_size = max(1, self.config.bulk_batch_size)
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            try:
+                with metrics.timer("db_batch_seconds", university=university):
+                    result = self._upsert_batch(batch, school_id, university)
+                    self.commit()
+                self._apply_batch_result(result, stats)
+            except Exception as e:
+                logger.error(f"批量写入失败，逐条重试 ({len(batch)} 条): {e}")
+                metrics.inc("db_errors_total", kind="batch")
+                self.rollback()
+                self._upsert_rows_individually(batch, school_id, university, stats)
+        
+        logger.info(f"保存完成: 新增 {stats['inserted']}, 更新 {stats['updated']}, "
+                   f"未变化 {stats['unchanged']}, 跳过 {stats['skipped']}, 错误 {stats['errors']}")
+        
+        self._record_save_metrics(stats, university)
+        return stats
+    
+    @staticmethod
+    def _record_save_metrics(stats: Dict[str, int], university: str):
+        for result, count in stats.items():
+            if count:
+                metrics.inc("db_rows_total", count, university=university, result=result)
+    
+    def _select_by_house_ids(self, sql: str, house_ids: List[str], params: tuple = ()) -> List[tuple]:
+        """
+        按 house_id 分块执行 IN 查询
+        
+        Args:
+            sql: 以 "house_id IN ({placeholders})" 结尾的查询语句
+            house_ids: house_id 列表
+            params: 排在 house_id 之前的参数
+        """
+        results = []
+        chunk = max(1, self.config.bulk_batch_size)
+        for start in range(0, len(house_ids), chunk):
+            ids = house_ids[start:start + chunk]
+            placeholders = ", ".join(["%s"] * len(ids))
+            self.cursor.execute(sql.format(placeholders=placeholders), params + tuple(ids))
+            results.extend(self.cursor.fetchall())
+        return results
+    
+    def _load_fingerprints(self, house_ids: List[str]) -> Dict[str, str]:
+        """加载给定房源的 house_id -> content_hash，同时更新已有 house_id 集合"""
+        fingerprints = {
+            str(house_id): content_hash
+            for house_id, content_hash in self._select_by_house_ids(
+                "SELECT house_id, content_hash FROM properties WHERE house_id IN ({placeholders})",
+                house_ids,
+            )
+        }
+        self._existing_house_ids.update(fingerprints)
+        return fingerprints
+    
+    def _load_commute_times(self, school_id: int, house_ids: List[str]) -> Dict[str, Optional[int]]:
+        """加载给定房源在该学校已有的 house_id -> commute_time"""
+        rows = self._select_by_house_ids(
+            """
+            SELECT p.house_id, ps.commute_time
+            FROM property_school ps JOIN properties p ON p.id = ps.property_id
+            WHERE ps.school_id = %s AND p.house_id IN ({placeholders})
+            """,
+            house_ids,
+            (school_id,),
+        )
+        return {str(house_id): commute_time for house_id, commute_time in rows}
+    
+    def _upsert_sql(self) -> str:
+        """properties 的 INSERT ... ON DUPLICATE KEY UPDATE 语句"""
+        updates = ", ".join(
+            f"{col} = VALUES({col})" for col in PROPERTY_COLUMNS if col != "house_id"
+        )
+        return f"""
+            INSERT INTO properties ({", ".join(PROPERTY_COLUMNS)})
+            VALUES ({", ".join(["%s"] * len(PROPERTY_COLUMNS))})
+            ON DUPLICATE KEY UPDATE {updates}
+            """
+    
+    def _fetch_property_ids(self, house_ids: List[str]) -> Dict[str, int]:
+        """一次查询取回 house_id -> properties.id"""
+        rows = self._select_by_house_ids(
+            "SELECT id, house_id FROM properties WHERE house_id IN ({placeholders})",
+            house_ids,
+        )
+        return {str(house_id): property_id for property_id, house_id in rows}
+    
+    def _upsert_batch(
+        self, 
+        batch: List[tuple], 
+        school_id: int, 
+        university: str
+    ) -> Tuple[Dict[str, int], Set[str]]:
+        """
+        写入一批 (prop, row, write_property, write_school)，出错时抛出异常由调用方回滚
+        
+        Returns:
+            ({inserted, updated}, 新增的 house_id)，由调用方在提交成功后计入统计
+        """
+        property_rows = [row for _, row, write_property, _ in batch if write_property]
+        if property_rows:
+            self.cursor.executemany(self._upsert_sql(), property_rows)
+        
+        school_props = [prop for prop, _, _, write_school in batch if write_school]
+        property_ids = self._fetch_property_ids([str(prop.house_id) for prop in school_props])
+        
+        school_rows = []
+        for prop in school_props:
+            property_id = property_ids.get(str(prop.house_id))
+            if property_id:
+                school_rows.append((property_id, school_id, prop.commute_times.get(university)))
+        
+        if school_rows:
+            self.cursor.executemany(
+                """
+                INSERT INTO property_school (property_id, school_id, commute_time)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE commute_time = VALUES(commute_time)
+                """,
+                school_rows
+            )
+        
+        counts = {'inserted': 0, 'updated': 0}
+        new_house_ids: Set[str] = set()
+        for prop, _, _, _ in batch:
+            house_id = str(prop.house_id)
+            if house_id in self._existing_house_ids or house_id in new_house_ids:
+                counts['updated'] += 1
+            else:
+                counts['inserted'] += 1
+                new_house_ids.add(house_id)
+        return counts, new_house_ids
+    
+    def _apply_batch_result(self, result: Tuple[Dict[str, int], Set[str]], stats: Dict[str, int]):
+        """提交成功后计入统计，并记录新增的 house_id"""
+        counts, new_house_ids = result
+        for key, count in counts.items():
+            stats[key] += count
+        self._existing_house_ids |= new_house_ids
+    
+    def _upsert_rows_individually(
+        self, 
+        batch: List[tuple], 
+        school_id: int, 
+        university: str, 
+        stats: Dict[str, int]
+    ):
+        """逐条写入（批量失败时的回退路径）"""
+        for item in batch:
+            prop = item[0]
+            try:
+                result = self._upsert_batch([item], school_id, university)
+                self.commit()
+            except Exception as e:
+                logger.error(f"保存房产失败 ({prop.house_id}): {e}")
+                metrics.inc("db_errors_total", kind="row")
+                self.rollback()
+                stats['errors'] += 1
+                continue
+            self._apply_batch_result(result, stats)
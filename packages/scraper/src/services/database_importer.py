@@ -15,6 +15,9 @@ import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 
+from ..utils.dataframe import iter_records
+from ..utils.columnar import read_frame
+
 logger = logging.getLogger(__name__)
 
 
@@ -251,7 +254,7 @@ def import_dataframe(df: pd.DataFrame, school_name: str) -> Tuple[int, int]:
         existing = {row[0] for row in cursor.fetchall()}
         region_lookup = fetch_region_lookup(cursor)
 
-        for index, row in df.iterrows():
+        for index, row in enumerate(iter_records(df)):
             try:
                 house_id = safe_int(row.get("houseId"))
                 if house_id == 0:
@@ -506,7 +509,7 @@ def import_csv(csv_path: str, school_name: Optional[str] = None) -> Tuple[int, i
         raise ValueError(f"cannot infer school from file: {csv_path}")
 
     logger.info("start import csv=%s school=%s env=%s", csv_path, school_name, ENV_PATH or "")
-    df = pd.read_csv(csv_path, encoding="utf-8-sig")
+    df = read_frame(csv_path)
     return import_dataframe(df, school_name)
 
 
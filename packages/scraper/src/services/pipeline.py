@@ -17,6 +17,8 @@ from .detail_scraper import scrape_details, scrape_images
 from .database_importer import import_csv
 from ..models import PropertyData, PropertySource
 from ..config import settings
+from ..utils.dataframe import dataframe_to_properties, house_id_column
+from ..utils.columnar import read_frame, write_frame
 
 logger = logging.getLogger(__name__)
 
@@ -35,59 +37,21 @@ def _ensure_score_columns(df: pd.DataFrame, total_scores: int) -> pd.DataFrame:
     return df
 
 
-def _row_to_prop(row: pd.Series, idx: int) -> Optional[PropertyData]:
-    desc = row.get("description_en", "")
-    if pd.isna(desc) or not str(desc).strip():
-        return None
-
-    house_id = row.get("houseId") or row.get("house_id") or str(idx)
-    source_val = row.get("source") or "realestate"
-    try:
-        source = PropertySource(str(source_val))
-    except Exception:
-        source = PropertySource.REALESTATE
-
-    prop = PropertyData(house_id=str(house_id), source=source)
-    prop.description_en = str(desc)
-    prop.address_line1 = str(row.get("addressLine1") or "")
-    prop.address_line2 = str(row.get("addressLine2") or "")
-    prop.price_per_week = int(row.get("pricePerWeek") or 0)
-    prop.bedroom_count = int(row.get("bedroomCount") or 0)
-    prop.bathroom_count = int(row.get("bathroomCount") or 0)
-    prop.parking_count = int(row.get("parkingCount") or 0)
-    prop.property_type = int(row.get("propertyType") or 1)
-    prop.url = str(row.get("url") or "")
-    prop.thumbnail_url = row.get("thumbnail_url") if pd.notna(row.get("thumbnail_url", None)) else None
-    prop.available_date = row.get("available_date") if not pd.isna(row.get("available_date", None)) else None
-    prop.published_at = row.get("published_at") if not pd.isna(row.get("published_at", None)) else None
-
-    # 已有结果，用于 skip_existing 判断
-    prop.average_score = None if pd.isna(row.get("average_score")) else float(row.get("average_score"))
-    prop.keywords = None if pd.isna(row.get("keywords")) else str(row.get("keywords"))
-    prop.description_cn = None if pd.isna(row.get("description_cn")) else str(row.get("description_cn"))
-
-    # 已有通勤，保留
-    commute_fields = {
-        "UNSW": row.get("commuteTime_UNSW"),
-        "USYD": row.get("commuteTime_USYD"),
-        "UTS": row.get("commuteTime_UTS"),
-        "general": row.get("commute_time"),
-    }
-    for k, v in commute_fields.items():
-        if v is not None and not pd.isna(v):
-            prop.commute_times[k] = int(v)
-    return prop
-
-
 def _build_props_from_df(df: pd.DataFrame, limit: Optional[int] = None) -> List[PropertyData]:
-    props: List[PropertyData] = []
-    for idx, row in df.iterrows():
-        prop = _row_to_prop(row, idx)
-        if not prop:
-            continue
-        props.append(prop)
-        if limit is not None and len(props) >= limit:
-            break
+    """只转换有英文描述的行；已有评分/关键词/通勤一并带出，用于 skip_existing 判断"""
+    props = dataframe_to_properties(
+        df,
+        default_source=PropertySource.REALESTATE,
+        require_description=True,
+        limit=limit,
+    )
+    # 旧版 CSV 的单一通勤列
+    if "commute_time" in df.columns:
+        general = dict(zip(house_id_column(df), pd.to_numeric(df["commute_time"], errors="coerce").tolist()))
+        for prop in props:
+            value = general.get(prop.house_id)
+            if value is not None and not pd.isna(value):
+                prop.commute_times["general"] = int(value)
     return props
 
 
@@ -97,7 +61,7 @@ def _write_props_back(
     total_scores: int,
     target_school: Optional[str] = None,
 ) -> pd.DataFrame:
-    id_index_map = {str(row.get("houseId") or row.get("house_id") or i): i for i, row in df.iterrows()}
+    id_index_map = dict(zip(house_id_column(df), df.index))
 
     commute_col = None
     if target_school:
@@ -105,26 +69,42 @@ def _write_props_back(
         if commute_col not in df.columns:
             df[commute_col] = pd.NA
 
+    # 按列收集 (行索引, 值)，每列一次赋值
+    updates: Dict[str, Dict] = {"average_score": {}, "keywords": {}, "description_cn": {}}
+    score_cols = [f"Score_{i}" for i in range(1, total_scores + 1)]
+    for col in score_cols:
+        updates[col] = {}
+    if commute_col:
+        updates[commute_col] = {}
+
     for prop in props:
         idx = id_index_map.get(str(prop.house_id))
         if idx is None:
             continue
 
         if prop.average_score is not None:
-            df.at[idx, "average_score"] = prop.average_score
+            updates["average_score"][idx] = prop.average_score
         if prop.keywords is not None:
-            df.at[idx, "keywords"] = prop.keywords
+            updates["keywords"][idx] = prop.keywords
         if prop.description_cn is not None:
-            df.at[idx, "description_cn"] = prop.description_cn
+            updates["description_cn"][idx] = prop.description_cn
 
         scores = getattr(prop, "scores", []) or []
-        for i in range(1, total_scores + 1):
-            df.at[idx, f"Score_{i}"] = scores[i - 1] if i - 1 < len(scores) else pd.NA
+        for i, col in enumerate(score_cols):
+            updates[col][idx] = scores[i] if i < len(scores) else pd.NA
 
         if commute_col and target_school:
             commute_time = prop.commute_times.get(target_school)
             if commute_time is not None:
-                df.at[idx, commute_col] = commute_time
+                updates[commute_col][idx] = commute_time
+
+    for col, values in updates.items():
+        if values:
+            if col not in df.columns:
+                df[col] = pd.NA
+            if df[col].dtype != object:
+                df[col] = df[col].astype(object)
+            df.loc[list(values.keys()), col] = list(values.values())
 
     return df
 
@@ -175,7 +155,7 @@ def run_pipeline(
 
     if do_ai:
         logger.info(f"[pipeline] 开始 AI 评分/关键词: {csv_path} (force={force_ai}, limit={ai_limit})")
-        df = pd.read_csv(csv_path, encoding="utf-8-sig")
+        df = read_frame(csv_path)
         service = ScoringService(settings.scoring)
         total_scores = service.config.num_calls * service.config.scores_per_call
         df = _ensure_score_columns(df, total_scores)
@@ -201,11 +181,11 @@ def run_pipeline(
             else:
                 logger.warning("Google Maps API Key 未配置，跳过通勤时间计算")
 
-        df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        write_frame(df, csv_path)
         logger.info(f"[pipeline] AI/通勤 已写回 CSV: {csv_path}")
     elif do_commute:
         # 仅通勤模式（未跑 AI 时仍可跑）
-        df = pd.read_csv(csv_path, encoding="utf-8-sig")
+        df = read_frame(csv_path)
         total_scores = 0
         props = _build_props_from_df(df, limit=None)
         commute_service = CommuteService(settings.commute)
@@ -216,7 +196,7 @@ def run_pipeline(
                 skip_existing=not force_commute,
             )
             df = _write_props_back(df, props, total_scores, target_school=target_school)
-            df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+            write_frame(df, csv_path)
             logger.info(f"[pipeline] 通勤 已写回 CSV: {csv_path}")
         else:
             logger.warning("Google Maps API Key 未配置，跳过通勤时间计算")
@@ -3,9 +3,10 @@
 使用 AI 模型对房产进行评分和关键词提取
 """
 import re
+import json
 import time
 import logging
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import dashscope
@@ -13,6 +14,7 @@ from tqdm import tqdm
 
 from ..models import PropertyData
 from ..config import settings, ScoringConfig
+from ..utils import SqliteCache, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,25 @@ KEYWORDS_CN_SYSTEM_PROMPT = """从给定的房屋描述中提取关键词，关
 要求关键词应包含房屋的位置、特征和可用设施。
 只输出关键词，用逗号分隔，不要包含其他文字。"""
 
+# 批量评分系统提示词（一次请求处理多个房源，输出 JSON）
+BATCH_SYSTEM_PROMPT = """你是一位专业的房屋居住质量评估员，需要同时处理多个房源。对每个房源完成三项任务：
+
+任务一：评分。按以下标准对房屋打分：
+1. 房屋质量 (0~10 分)：缺少翻新、老旧或有明显缺陷给 3 分以下；普通装修或信息不足给 4~6 分；有翻新、材料优质给 7~9 分；高端精装修或全新房给 10 分。
+2. 居住体验 (0~10 分)：噪音、空间狭小、采光差给 3 分以下；一般或描述不清给 4~6 分；宽敞、通风良好、配有空调等给 7~9 分；特别舒适、配置高级给 10 分。
+3. 房屋内部配套设施 (0~10 分)：只具备基本设施或缺少描述给 3~5 分；普通现代设施给 6~8 分；特别齐全、高端智能家居给 9~10 分。
+总评分 (0~20) = (房屋质量 + 居住体验 + 房屋内部配套设施) / 30 * 20
+请给出 {scores_per_item} 组【独立的】总评分。
+
+任务二：英文关键词。从描述中提取简洁的英文关键词（≤11 个，逗号分隔），涵盖安全性、重要家电、厨房、装修状况、储物空间、洗手间、社区配套、购物、户外空间、地理位置，描述中未提及的维度不要输出。
+
+任务三：中文关键词。用中文提取关键词（逗号分隔），包含房屋的位置、特征和可用设施。
+
+仅输出一个 JSON 对象，不要输出任何其他文字，格式如下：
+{{"results": [{{"id": "房源ID", "scores": [14.0, 14.7, 15.3, 14.7], "keywords_en": "air conditioning, gym, ...", "keywords_cn": "空调, 健身房, ..."}}]}}
+每个输入房源必须对应 results 中的一项，id 与输入保持一致。
+"""
+
 
 class ScoringService:
     """
@@ -85,36 +106,90 @@ class ScoringService:
         )
         if api_key:
             dashscope.api_key = api_key
+        self.api_key = api_key or ""
+        
+        # LLM 结果持久化缓存
+        self.cache: Optional[SqliteCache] = None
+        if self.config.cache_enabled:
+            try:
+                self.cache = SqliteCache(
+                    self.config.cache_path,
+                    namespace="scoring",
+                    ttl_seconds=self.config.cache_ttl_days * 86400,
+                    max_entries=self.config.cache_max_entries,
+                )
+            except Exception as e:
+                logger.warning(f"LLM 缓存初始化失败，不使用缓存: {e}")
+    
+    def _cache_key(self, kind: str, system_prompt: str, description: str) -> str:
+        """
+        生成缓存键
+        描述归一化（去除多余空白、小写）后与提示词版本、系统提示词、模型名一起哈希
+        """
+        normalized = " ".join(description.split()).lower()
+        return SqliteCache.make_key(
+            kind,
+            self.config.model_name,
+            self.config.prompt_version,
+            system_prompt,
+            normalized,
+        )
+    
+    def _cache_get(self, kind: str, system_prompt: str, description: str):
+        """读取缓存"""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(self._cache_key(kind, system_prompt, description))
+        except Exception as e:
+            logger.warning(f"读取 LLM 缓存失败: {e}")
+            return None
+    
+    def _cache_set(self, kind: str, system_prompt: str, description: str, value):
+        """写入缓存"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(self._cache_key(kind, system_prompt, description), value)
+        except Exception as e:
+            logger.warning(f"写入 LLM 缓存失败: {e}")
     
     def _call_model(
         self, 
         system_prompt: str, 
         user_prompt: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        max_tokens: Optional[int] = None
     ) -> Optional[str]:
         """调用模型 API"""
         for attempt in range(max_retries):
+            if attempt:
+                metrics.inc("llm_retries_total", engine="sync")
             try:
                 messages = [
                     {'role': 'system', 'content': system_prompt},
                     {'role': 'user', 'content': user_prompt}
                 ]
                 
-                response = dashscope.Generation.call(
-                    model=self.config.model_name,
-                    messages=messages,
-                    result_format='message',
-                    temperature=self.config.temperature,
-                    max_tokens=self.config.max_tokens,
-                    top_p=0.9
-                )
+                with metrics.timer("llm_call_seconds", engine="sync"):
+                    response = dashscope.Generation.call(
+                        model=self.config.model_name,
+                        messages=messages,
+                        result_format='message',
+                        temperature=self.config.temperature,
+                        max_tokens=max_tokens or self.config.max_tokens,
+                        top_p=0.9
+                    )
                 
                 if response.status_code == 200:
+                    metrics.inc("llm_calls_total", engine="sync", status="ok")
                     return response.output.choices[0]['message']['content']
                 else:
+                    metrics.inc("llm_calls_total", engine="sync", status="api_error")
                     logger.error(f"API 错误: {response.code} - {response.message}")
                     
             except Exception as e:
+                metrics.inc("llm_calls_total", engine="sync", status="exception")
                 logger.error(f"第 {attempt + 1} 次调用失败: {e}")
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
@@ -150,14 +225,11 @@ class ScoringService:
         if not description or not description.strip():
             return 0.0, []
         
-        user_prompt = (
-            f"根据以下房源描述，对房屋质量、居住体验、房屋内部配套设施三个维度分别打 0~10 分，"
-            f"并给出总评分（0~20分）。\n"
-            f"请参考系统提示中的具体扣分/加分建议。\n"
-            f"房源描述：{description}\n"
-            f"请严格按系统提示输出 4 组打分，每组一行，不要输出任何多余的文字。"
-        )
+        cached = self._cache_get("score", SCORING_SYSTEM_PROMPT, description)
+        if cached:
+            return cached["average_score"], cached["scores"]
         
+        user_prompt = self._build_score_prompt(description)
         all_scores = []
         
         for _ in range(self.config.num_calls):
@@ -167,9 +239,27 @@ class ScoringService:
                 all_scores.extend(scores)
             time.sleep(1)  # 避免 rate limit
         
+        return self._finish_scores(description, all_scores)
+    
+    def _build_score_prompt(self, description: str) -> str:
+        """评分用户提示词"""
+        return (
+            f"根据以下房源描述，对房屋质量、居住体验、房屋内部配套设施三个维度分别打 0~10 分，"
+            f"并给出总评分（0~20分）。\n"
+            f"请参考系统提示中的具体扣分/加分建议。\n"
+            f"房源描述：{description}\n"
+            f"请严格按系统提示输出 4 组打分，每组一行，不要输出任何多余的文字。"
+        )
+    
+    def _finish_scores(self, description: str, all_scores: List[float]) -> Tuple[float, List[float]]:
+        """汇总多次调用的分数并写入缓存，全部失败时返回默认分数"""
         if all_scores:
-            avg_score = sum(all_scores) / len(all_scores)
-            return round(avg_score, 1), all_scores
+            avg_score = round(sum(all_scores) / len(all_scores), 1)
+            self._cache_set(
+                "score", SCORING_SYSTEM_PROMPT, description,
+                {"average_score": avg_score, "scores": all_scores}
+            )
+            return avg_score, all_scores
         
         return 13.0, []  # 默认分数
     
@@ -178,12 +268,21 @@ class ScoringService:
         if not description or not description.strip():
             return ""
         
+        cached = self._cache_get("keywords_en", KEYWORDS_EN_SYSTEM_PROMPT, description)
+        if cached:
+            return cached
+        
         response = self._call_model(KEYWORDS_EN_SYSTEM_PROMPT, description)
+        return self._finish_keywords_en(description, response)
+    
+    def _finish_keywords_en(self, description: str, response: Optional[str]) -> str:
+        """清理英文关键词响应并写入缓存"""
         if response:
-            # 清理响应
             keywords = response.strip()
             if keywords.lower().startswith("keywords:"):
                 keywords = keywords[len("keywords:"):].strip()
+            if keywords:
+                self._cache_set("keywords_en", KEYWORDS_EN_SYSTEM_PROMPT, description, keywords)
             return keywords
         
         return ""
@@ -193,11 +292,21 @@ class ScoringService:
         if not description or not description.strip():
             return ""
         
+        cached = self._cache_get("keywords_cn", KEYWORDS_CN_SYSTEM_PROMPT, description)
+        if cached:
+            return cached
+        
         response = self._call_model(KEYWORDS_CN_SYSTEM_PROMPT, description)
+        return self._finish_keywords_cn(description, response)
+    
+    def _finish_keywords_cn(self, description: str, response: Optional[str]) -> str:
+        """清理中文关键词响应并写入缓存"""
         if response:
             keywords = response.strip()
             if keywords.startswith("关键词:") or keywords.startswith("关键词："):
                 keywords = keywords[4:].strip()
+            if keywords:
+                self._cache_set("keywords_cn", KEYWORDS_CN_SYSTEM_PROMPT, description, keywords)
             return keywords
         
         return ""
@@ -230,51 +339,264 @@ class ScoringService:
         
         return prop
     
-    def process_properties(
+    def _parse_batch_response(
         self, 
-        properties: List[PropertyData],
-        skip_existing: bool = True,
-        force_update: bool = False,
-        limit: Optional[int] = None,
+        response_text: str, 
+        ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        解析批量评分结果
+        
+        Returns:
+            house_id -> {average_score, scores, keywords_en, keywords_cn}，
+            格式不合法的房源不会出现在结果中
+        """
+        text = response_text.strip()
+        # 去掉可能的 markdown 代码块
+        if text.startswith("```"):
+            text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+        
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0 or end <= start:
+            return {}
+        
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+        
+        items = data.get('results') if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            return {}
+        
+        wanted = set(ids)
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            
+            item_id = str(item.get('id', '')).strip()
+            if item_id not in wanted:
+                continue
+            
+            scores = []
+            for value in item.get('scores') or []:
+                try:
+                    score = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if 0 <= score <= 20:
+                    scores.append(score)
+            
+            keywords_en = str(item.get('keywords_en') or '').strip()
+            keywords_cn = str(item.get('keywords_cn') or '').strip()
+            if not scores or not keywords_en or not keywords_cn:
+                continue
+            
+            parsed[item_id] = {
+                'average_score': round(sum(scores) / len(scores), 1),
+                'scores': scores,
+                'keywords_en': keywords_en,
+                'keywords_cn': keywords_cn,
+            }
+        
+        return parsed
+    
+    def _apply_cached(self, prop: PropertyData, force_update: bool = False) -> bool:
+        """
+        尝试完全从缓存填充房产的评分和关键词
+        
+        Returns:
+            是否所有需要的字段都已填充
+        """
+        description = prop.description_en or ""
+        complete = True
+        
+        if force_update or not prop.average_score:
+            cached = self._cache_get("score", SCORING_SYSTEM_PROMPT, description)
+            if cached:
+                prop.average_score = cached["average_score"]
+                prop.scores = cached["scores"]
+            else:
+                complete = False
+        
+        if force_update or not prop.keywords:
+            cached = self._cache_get("keywords_en", KEYWORDS_EN_SYSTEM_PROMPT, description)
+            if cached:
+                prop.keywords = cached
+            else:
+                complete = False
+        
+        if force_update or not prop.description_cn:
+            cached = self._cache_get("keywords_cn", KEYWORDS_CN_SYSTEM_PROMPT, description)
+            if cached:
+                prop.description_cn = cached
+            else:
+                complete = False
+        
+        return complete
+    
+    def process_batch(
+        self, 
+        properties: List[PropertyData], 
+        force_update: bool = False
     ) -> List[PropertyData]:
         """
-        批量处理房产评分
+        批量处理多个房产：一次请求同时完成评分和中英文关键词提取
+        解析失败或缺失的房源回退到逐个处理
         
         Args:
-            properties: 房产列表
-            skip_existing: 是否跳过已有评分的房产
+            properties: 房产列表（建议不超过 config.batch_size 个）
             
         Returns:
             处理后的房产列表
         """
-        to_process: List[PropertyData] = []
-        for prop in properties:
-            if not prop.description_en:
+        pending = [p for p in properties if not self._apply_cached(p, force_update)]
+        if not pending:
+            return properties
+        
+        system_prompt, user_prompt = self._build_batch_prompt(pending)
+        response = self._call_model(
+            system_prompt,
+            user_prompt,
+            max_tokens=self.config.batch_tokens_per_item * len(pending),
+        )
+        fallback = self._apply_batch_response(pending, response, force_update)
+        
+        if fallback:
+            logger.warning(f"批量结果缺失或格式错误，{len(fallback)}/{len(pending)} 个房源回退到逐个处理")
+            for prop in fallback:
+                self.process_property(prop, force_update)
+        
+        return properties
+    
+    def _build_batch_prompt(self, properties: List[PropertyData]) -> Tuple[str, str]:
+        """批量请求的 (系统提示词, 用户提示词)"""
+        listings = "\n\n".join(
+            f"房源ID: {prop.house_id}\n房源描述：{prop.description_en}"
+            for prop in properties
+        )
+        user_prompt = (
+            f"以下共 {len(properties)} 个房源，请按系统提示对每个房源评分并提取中英文关键词，"
+            f"只输出 JSON。\n\n{listings}"
+        )
+        system_prompt = BATCH_SYSTEM_PROMPT.format(scores_per_item=self.config.scores_per_call)
+        return system_prompt, user_prompt
+    
+    def _apply_batch_response(
+        self, 
+        pending: List[PropertyData], 
+        response: Optional[str], 
+        force_update: bool = False
+    ) -> List[PropertyData]:
+        """
+        将批量结果写回房产并缓存
+        
+        Returns:
+            结果缺失、需要逐个处理的房产
+        """
+        ids = [str(p.house_id) for p in pending]
+        results = self._parse_batch_response(response, ids) if response else {}
+        
+        fallback = []
+        for house_id, prop in zip(ids, pending):
+            result = results.get(house_id)
+            if not result:
+                fallback.append(prop)
                 continue
+            
+            description = prop.description_en or ""
+            self._cache_set(
+                "score", SCORING_SYSTEM_PROMPT, description,
+                {"average_score": result["average_score"], "scores": result["scores"]}
+            )
+            self._cache_set("keywords_en", KEYWORDS_EN_SYSTEM_PROMPT, description, result["keywords_en"])
+            self._cache_set("keywords_cn", KEYWORDS_CN_SYSTEM_PROMPT, description, result["keywords_cn"])
+            
+            if force_update or not prop.average_score:
+                prop.average_score = result["average_score"]
+                prop.scores = result["scores"]
+            if force_update or not prop.keywords:
+                prop.keywords = result["keywords_en"]
+            if force_update or not prop.description_cn:
+                prop.description_cn = result["keywords_cn"]
+        
+        return fallback
+    
+    def needs_processing(
+        self,
+        prop: PropertyData,
+        skip_existing: bool = True,
+        force_update: bool = False,
+    ) -> bool:
+        """判断房产是否需要评分/关键词提取"""
+        if not prop.description_en:
+            return False
 
-            # skip_existing 的语义：只有在“评分 + 关键词(英文/中文) 都已经有值”时才跳过
-            has_score = prop.average_score is not None and prop.average_score > 0
-            has_keywords = bool(prop.keywords and str(prop.keywords).strip())
-            has_cn = bool(prop.description_cn and str(prop.description_cn).strip())
+        # skip_existing 的语义：只有在“评分 + 关键词(英文/中文) 都已经有值”时才跳过
+        has_score = prop.average_score is not None and prop.average_score > 0
+        has_keywords = bool(prop.keywords and str(prop.keywords).strip())
+        has_cn = bool(prop.description_cn and str(prop.description_cn).strip())
 
-            if (not force_update) and skip_existing and has_score and has_keywords and has_cn:
+        return force_update or not (skip_existing and has_score and has_keywords and has_cn)
+    
+    def _select_for_processing(
+        self, 
+        properties: List[PropertyData],
+        skip_existing: bool = True,
+        force_update: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[PropertyData]:
+        """筛选需要评分的房产"""
+        to_process: List[PropertyData] = []
+        for prop in properties:
+            if not self.needs_processing(prop, skip_existing, force_update):
                 continue
 
             to_process.append(prop)
             if limit is not None and len(to_process) >= limit:
                 break
         
+        return to_process
+    
+    def process_properties(
+        self, 
+        properties: List[PropertyData],
+        skip_existing: bool = True,
+        force_update: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[PropertyData]:
+        """
+        批量处理房产评分
+        
+        Args:
+            properties: 房产列表
+            skip_existing: 是否跳过已有评分的房产
+            
+        Returns:
+            处理后的房产列表
+        """
+        to_process = self._select_for_processing(properties, skip_existing, force_update, limit)
+        
         if not to_process:
             logger.info("没有需要评分的房产")
             return properties
         
         logger.info(f"开始处理 {len(to_process)} 个房产的评分")
         
+        batch_size = max(1, self.config.batch_size)
         with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = {
-                executor.submit(self.process_property, prop, force_update): prop 
-                for prop in to_process
-            }
+            if batch_size > 1:
+                logger.info(f"批量模式: 每次请求 {batch_size} 个房源")
+                futures = {
+                    executor.submit(self.process_batch, to_process[i:i + batch_size], force_update): i
+                    for i in range(0, len(to_process), batch_size)
+                }
+            else:
+                futures = {
+                    executor.submit(self.process_property, prop, force_update): prop 
+                    for prop in to_process
+                }
             
             for future in tqdm(as_completed(futures), total=len(futures), desc="评分进度"):
                 try:
@@ -283,3 +605,35 @@ class ScoringService:
                     logger.error(f"处理失败: {e}")
         
         return properties
+    
+    async def aprocess_properties(
+        self, 
+        properties: List[PropertyData],
+        skip_existing: bool = True,
+        force_update: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[PropertyData]:
+        """
+        批量处理房产评分（asyncio 版本）
+        
+        使用异步 HTTP 客户端并发请求，按 config.rpm_limit / config.tpm_limit 令牌桶限流，
+        429 时抖动退避重试。参数和返回值与 process_properties 相同。
+        
+        使用示例:
+            asyncio.run(service.aprocess_properties(properties))
+        """
+        from .async_scoring import AsyncScoringEngine
+        
+        to_process = self._select_for_processing(properties, skip_existing, force_update, limit)
+        
+        if not to_process:
+            logger.info("没有需要评分的房产")
+            return properties
+        
+        logger.info(
+            f"开始异步处理 {len(to_process)} 个房产的评分 "
+            f"(并发 {self.config.async_concurrency}, RPM {self.config.rpm_limit}, TPM {self.config.tpm_limit})"
+        )
+        
+        await AsyncScoringEngine(self).run(to_process, force_update)
+        return properties
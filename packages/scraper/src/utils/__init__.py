@@ -1,18 +1,34 @@
-from .browser import BrowserManager, browser_session, BrowserType
+from .browser import BrowserManager, browser_session, BrowserType, RoutingProfile, routing_totals, add_routing_totals
 from .helpers import (
     safe_int, safe_float, safe_str, safe_datetime,
-    extract_price, extract_number, clean_address,
+    extract_price, extract_number, clean_address, normalize_address,
     parse_available_date, is_valid_image_url,
     generate_house_id, truncate_string
 )
 from .logger import setup_logger, default_logger
+from .cache import SqliteCache
+from .dataframe import dataframe_to_properties, properties_to_dataframe, iter_records
+from .columnar import read_frame, write_frame, export_frame, find_frames
+from .http_client import HttpPageFetcher
+from .html import make_soup, Markup
+from .checkpoint import CheckpointStore, property_key
+from .metrics import metrics, MetricsRegistry
+from .profiling import StageProfiler
 
 __all__ = [
-    'BrowserManager', 'browser_session', 'BrowserType',
+    'BrowserManager', 'browser_session', 'BrowserType', 'RoutingProfile', 'routing_totals', 'add_routing_totals',
     'safe_int', 'safe_float', 'safe_str', 'safe_datetime',
-    'extract_price', 'extract_number', 'clean_address',
+    'extract_price', 'extract_number', 'clean_address', 'normalize_address',
     'parse_available_date', 'is_valid_image_url',
     'generate_house_id', 'truncate_string',
     'setup_logger', 'default_logger',
+    'SqliteCache',
+    'dataframe_to_properties', 'properties_to_dataframe', 'iter_records',
+    'read_frame', 'write_frame', 'export_frame', 'find_frames',
+    'HttpPageFetcher',
+    'make_soup', 'Markup',
+    'CheckpointStore', 'property_key',
+    'metrics', 'MetricsRegistry',
+    'StageProfiler',
 ]
 
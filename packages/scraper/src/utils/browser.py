@@ -8,9 +8,12 @@ import logging
 import time
 import os
 import asyncio
-from typing import Optional
+import threading
+from typing import Optional, Dict, Iterable, Union
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from enum import Enum
+from urllib.parse import urlsplit
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -19,10 +22,107 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
-from ..config import settings, SeleniumConfig
+from ..config import settings, SeleniumConfig, ROUTING_PRESETS
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# 被拦截请求的估算大小（字节），被中止的请求拿不到真实大小，按资源类型估算
+ESTIMATED_RESOURCE_BYTES: Dict[str, int] = {
+    'image': 60 * 1024,
+    'media': 500 * 1024,
+    'font': 40 * 1024,
+    'script': 50 * 1024,
+    'stylesheet': 20 * 1024,
+    'xhr': 5 * 1024,
+    'fetch': 5 * 1024,
+}
+DEFAULT_RESOURCE_BYTES = 5 * 1024
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    """host 是否等于某个域名或是其子域名"""
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+@dataclass
+class RoutingProfile:
+    """
+    Playwright 请求拦截规则
+
+    allowed_domains 中的主机永不拦截；其余请求按资源类型或域名黑名单中止。
+    """
+    name: str = 'default'
+    blocked_resource_types: frozenset = frozenset()
+    blocked_domains: tuple = ()
+    allowed_domains: tuple = ()
+
+    @classmethod
+    def preset(cls, name: Optional[str]) -> 'RoutingProfile':
+        """按站点名取预设（settings.ROUTING_PRESETS），未知站点使用 default"""
+        key = name if name in ROUTING_PRESETS else 'default'
+        preset = ROUTING_PRESETS[key]
+        return cls(
+            name=key,
+            blocked_resource_types=frozenset(preset.get('blocked_resource_types', ())),
+            blocked_domains=tuple(preset.get('blocked_domains', ())),
+            allowed_domains=tuple(preset.get('allowed_domains', ())),
+        )
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = (urlsplit(url).hostname or '').lower()
+        if _host_matches(host, self.allowed_domains):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return _host_matches(host, self.blocked_domains)
+
+
+@dataclass
+class RoutingStats:
+    """请求拦截统计"""
+    allowed: int = 0
+    blocked: int = 0
+    bytes_loaded: int = 0  # 按 Content-Length 统计的已加载字节
+    bytes_saved: int = 0  # 按资源类型估算的节省字节
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: 'RoutingStats'):
+        self.allowed += other.allowed
+        self.blocked += other.blocked
+        self.bytes_loaded += other.bytes_loaded
+        self.bytes_saved += other.bytes_saved
+        for resource_type, count in other.blocked_by_type.items():
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + count
+
+    def summary(self) -> str:
+        by_type = ", ".join(f"{t} {n}" for t, n in sorted(self.blocked_by_type.items(), key=lambda x: -x[1]))
+        return (
+            f"放行 {self.allowed} 个请求 ({self.bytes_loaded / 1024 / 1024:.1f} MB)，"
+            f"拦截 {self.blocked} 个 ({by_type or '-'})，估算节省 {self.bytes_saved / 1024 / 1024:.1f} MB"
+        )
+
+
+# 本进程内所有浏览器的累计拦截统计（浏览器关闭时合并）
+_routing_totals = RoutingStats()
+_routing_lock = threading.Lock()
+
+
+def routing_totals(reset: bool = False) -> RoutingStats:
+    """获取本次运行累计的请求拦截统计"""
+    global _routing_totals
+    with _routing_lock:
+        totals = _routing_totals
+        if reset:
+            _routing_totals = RoutingStats()
+        return totals
+
+
+def add_routing_totals(stats: RoutingStats):
+    """合并到本进程的累计拦截统计（浏览器关闭时，或父进程汇总区域爬取子进程的统计）"""
+    with _routing_lock:
+        _routing_totals.merge(stats)
+
 
 class BrowserType(Enum):
     """浏览器类型"""
@@ -41,11 +141,31 @@ class BrowserManager:
         self, 
         config: Optional[SeleniumConfig] = None,
         browser_type: BrowserType = BrowserType.CHROME,
-        profile_dir: Optional[str] = None
+        profile_dir: Optional[str] = None,
+        routing: Union[str, RoutingProfile, None] = None,
+        site: Optional[str] = None
     ):
+        """
+        Args:
+            config: 浏览器配置
+            browser_type: 浏览器类型
+            profile_dir: Playwright 持久化配置目录
+            routing: 请求拦截规则（站点名或 RoutingProfile），仅 Playwright 生效，
+                     config.block_resources 为 False 时不拦截
+            site: 站点名，作为页面加载指标的 site 标签（与是否拦截无关），
+                  默认取 routing 的站点名
+        """
         self.config = config or settings.selenium
         self.browser_type = browser_type
         self.profile_dir = profile_dir
+        if site is None:
+            site = routing.name if isinstance(routing, RoutingProfile) else routing
+        self.site = site or "default"
+        if isinstance(routing, RoutingProfile):
+            self.routing = routing
+        else:
+            self.routing = RoutingProfile.preset(routing) if self.config.block_resources else None
+        self.routing_stats = RoutingStats()
         self.driver = None
         self._temp_dir: Optional[str] = None
         # Playwright 相关
@@ -157,6 +277,9 @@ class BrowserManager:
                 ],
             )
             
+            if self.routing:
+                self._install_routing()
+            
             # 获取或创建页面
             if self._playwright_context.pages:
                 self._playwright_page = self._playwright_context.pages[0]
@@ -173,6 +296,44 @@ class BrowserManager:
             logger.error(f"Failed to create Playwright browser: {e}")
             raise
     
+    def _install_routing(self):
+        """在上下文上注册请求拦截（启用路由后 Playwright 会禁用 HTTP 缓存）"""
+        profile = self.routing
+        stats = self.routing_stats
+        
+        def handle(route):
+            request = route.request
+            resource_type = request.resource_type
+            if profile.should_block(resource_type, request.url):
+                stats.blocked += 1
+                stats.blocked_by_type[resource_type] = stats.blocked_by_type.get(resource_type, 0) + 1
+                stats.bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES)
+                route.abort()
+            else:
+                stats.allowed += 1
+                route.continue_()
+        
+        def on_response(response):
+            try:
+                length = response.headers.get('content-length')
+                if length:
+                    stats.bytes_loaded += int(length)
+            except Exception:
+                pass
+        
+        self._playwright_context.route("**/*", handle)
+        self._playwright_context.on("response", on_response)
+        logger.info(f"请求拦截已启用: {profile.name}")
+    
+    def _report_routing(self):
+        """记录本浏览器的拦截统计并合并到进程累计"""
+        stats = self.routing_stats
+        if not self.routing or not (stats.allowed or stats.blocked):
+            return
+        logger.info(f"请求拦截统计 [{self.routing.name}]: {stats.summary()}")
+        add_routing_totals(stats)
+        self.routing_stats = RoutingStats()
+    
     def get_driver(self):
         """获取驱动实例，如果不存在则创建"""
         if self.browser_type == BrowserType.PLAYWRIGHT:
@@ -187,6 +348,7 @@ class BrowserManager:
     def close(self):
         """关闭浏览器"""
         if self.browser_type == BrowserType.PLAYWRIGHT:
+            self._report_routing()
             try:
                 # 先关闭页面
                 if self._playwright_page:
@@ -243,22 +405,27 @@ class BrowserManager:
         Returns:
             是否成功
         """
+        site = self.site
         try:
             if self.browser_type == BrowserType.PLAYWRIGHT:
                 page = self.get_driver()
                 # RealEstate.com.au 等站点可能持续加载资源导致 "load" 事件迟迟不触发，
                 # 使用 domcontentloaded 可显著降低 page.goto 超时概率。
-                page.goto(url, timeout=60000, wait_until="domcontentloaded")
+                with metrics.timer("page_load_seconds", site=site):
+                    page.goto(url, timeout=60000, wait_until="domcontentloaded")
                 page.wait_for_timeout(int(wait_time * 1000))
             else:
                 driver = self.get_driver()
-                driver.get(url)
+                with metrics.timer("page_load_seconds", site=site):
+                    driver.get(url)
                 time.sleep(wait_time)
             return True
         except TimeoutException:
+            metrics.inc("page_load_errors_total", site=site, reason="timeout")
             logger.warning(f"Page load timeout: {url}")
             return False
         except Exception as e:
+            metrics.inc("page_load_errors_total", site=site, reason="error")
             logger.error(f"Navigation failed: {url}, error: {e}")
             return False
     
@@ -318,7 +485,60 @@ class BrowserManager:
             except TimeoutException:
                 logger.warning(f"Elements wait timeout: {by}={value}")
                 return []
-    
+
+    def count_elements(self, selector: str) -> int:
+        """当前页面中匹配 CSS 选择器的元素数量"""
+        if self.browser_type == BrowserType.PLAYWRIGHT:
+            return self.get_driver().locator(selector).count()
+        return len(self.get_driver().find_elements(By.CSS_SELECTOR, selector))
+
+    def wait_until_ready(
+        self,
+        selector: str,
+        min_count: int = 1,
+        stable_for: float = 0.0,
+        timeout: float = 15.0,
+        poll_interval: float = 0.25
+    ) -> bool:
+        """
+        等待页面就绪：selector 匹配数 >= min_count，且在 stable_for 秒内不再变化
+
+        用于替代固定等待：内容已加载时立即返回，未加载时最多等待 timeout 秒
+
+        Args:
+            selector: CSS 选择器（如房源卡片、描述节点）
+            min_count: 最少匹配数
+            stable_for: 匹配数保持不变的时长（秒），用于等待列表渲染完成
+            timeout: 超时（秒）
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            是否就绪（超时返回 False）
+        """
+        deadline = time.monotonic() + timeout
+        last_count = -1
+        changed_at = time.monotonic()
+
+        while True:
+            try:
+                count = self.count_elements(selector)
+            except Exception as e:
+                logger.debug(f"就绪检查失败: {e}")
+                count = 0
+
+            now = time.monotonic()
+            if count != last_count:
+                last_count = count
+                changed_at = now
+
+            if count >= min_count and now - changed_at >= stable_for:
+                return True
+            if now >= deadline:
+                logger.debug(f"等待就绪超时 ({timeout}s): {selector} 匹配 {count} 个")
+                return False
+
+            self.wait(poll_interval)
+
     def scroll_to_element(self, element):
         """滚动到指定元素"""
         if self.browser_type == BrowserType.PLAYWRIGHT:
@@ -356,6 +576,27 @@ class BrowserManager:
         else:
             time.sleep(seconds)
     
+    def export_session(self) -> dict:
+        """
+        导出当前会话（cookies + User-Agent），供 HTTP 客户端复用
+
+        Returns:
+            {'cookies': {name: value}, 'user_agent': str}
+        """
+        if self.browser_type == BrowserType.PLAYWRIGHT:
+            page = self.get_driver()
+            cookies = self._playwright_context.cookies()
+            user_agent = page.evaluate("navigator.userAgent")
+        else:
+            driver = self.get_driver()
+            cookies = driver.get_cookies()
+            user_agent = driver.execute_script("return navigator.userAgent")
+
+        return {
+            'cookies': {c['name']: c['value'] for c in cookies},
+            'user_agent': user_agent or self.config.user_agent,
+        }
+
     def __enter__(self):
         self.create_driver()
         return self
@@ -368,7 +609,9 @@ class BrowserManager:
 def browser_session(
     config: Optional[SeleniumConfig] = None,
     browser_type: BrowserType = BrowserType.CHROME,
-    profile_dir: Optional[str] = None
+    profile_dir: Optional[str] = None,
+    routing: Union[str, RoutingProfile, None] = None,
+    site: Optional[str] = None
 ):
     """
     浏览器会话上下文管理器
@@ -386,7 +629,7 @@ def browser_session(
         with browser_session(browser_type=BrowserType.PLAYWRIGHT, profile_dir="./my_profile") as browser:
             browser.navigate("https://realestate.com.au")
     """
-    manager = BrowserManager(config, browser_type, profile_dir)
+    manager = BrowserManager(config, browser_type, profile_dir, routing, site)
     try:
         manager.create_driver()
         yield manager
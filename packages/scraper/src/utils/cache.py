@@ -0,0 +1,171 @@
+"""
+持久化缓存
+基于 SQLite 的键值缓存，支持 TTL 过期和按条数淘汰（最久未访问优先）
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteCache:
+    """
+    SQLite 键值缓存
+
+    同一个数据库文件可被多个 namespace 共享，值以 JSON 形式存储。
+    线程安全：内部共用一个连接并加锁，可在 ThreadPoolExecutor 中直接使用。
+    """
+
+    # 每写入多少次执行一次淘汰
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Args:
+            path: SQLite 文件路径
+            namespace: 命名空间（区分不同用途的缓存）
+            ttl_seconds: 过期时间（秒），None 表示不过期
+            max_entries: 该命名空间最多保留的条数，None 表示不限制
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_idx ON cache (namespace, accessed_at)"
+        )
+        self._conn.commit()
+        logger.info(f"缓存已打开: {path} [{namespace}]")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """由多个部分生成稳定的哈希键"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，不存在或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            self._conn.commit()
+
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None):
+        """写入缓存"""
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cache (namespace, key, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (self.namespace, key, payload, created_at or now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY == 0
+
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """删除过期条目，并将条数控制在 max_entries 以内，返回删除条数"""
+        removed = 0
+        with self._lock:
+            if self.ttl_seconds is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND created_at < ?",
+                    (self.namespace, time.time() - self.ttl_seconds)
+                )
+                removed += cursor.rowcount
+
+            if self.max_entries is not None:
+                cursor = self._conn.execute(
+                    """
+                    DELETE FROM cache WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache WHERE namespace = ?
+                        ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.namespace, self.namespace, self.max_entries)
+                )
+                removed += cursor.rowcount
+
+            self._conn.commit()
+
+        if removed:
+            logger.debug(f"缓存淘汰 {removed} 条 [{self.namespace}]")
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        """关闭连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,226 @@
+"""
+流水线检查点
+基于 SQLite 记录每次运行中每个房源完成的阶段（listed / detailed / scored / commuted / saved）
+和最新的房源快照，进程崩溃后可从检查点恢复，跳过已完成的工作
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..models import PropertyData, PropertySource
+
+logger = logging.getLogger(__name__)
+
+# 需要序列化为 ISO 字符串的日期字段
+_DATETIME_FIELDS = ('available_date', 'published_at', 'scraped_at')
+
+
+def property_key(prop: PropertyData) -> str:
+    """房源在检查点中的键：来源 + house_id（不同来源的 ID 可能重复）"""
+    return f"{prop.source.value}:{prop.house_id}"
+
+
+def _encode(prop: PropertyData) -> str:
+    data = prop.to_dict()
+    for name in _DATETIME_FIELDS:
+        if isinstance(data.get(name), datetime):
+            data[name] = data[name].isoformat()
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _decode(text: str) -> PropertyData:
+    data = json.loads(text)
+    for name in _DATETIME_FIELDS:
+        if isinstance(data.get(name), str):
+            try:
+                data[name] = datetime.fromisoformat(data[name])
+            except ValueError:
+                data[name] = None
+    return PropertyData.from_dict(data)
+
+
+class CheckpointStore:
+    """
+    检查点存储
+
+    每次运行有一个 run_id；record() 在同一个事务中写入房源快照和阶段标记，
+    写入即落盘（WAL），崩溃时最多丢失正在处理的一批。
+    线程安全：内部共用一个连接并加锁。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite 文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                run_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (run_id, key)
+            );
+            CREATE TABLE IF NOT EXISTS stages (
+                run_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                done_at REAL NOT NULL,
+                PRIMARY KEY (run_id, key, stage)
+            );
+            """
+        )
+        self._conn.commit()
+        logger.info(f"检查点已打开: {path}")
+
+    # ---------- 运行 ----------
+
+    def start_run(self, label: str) -> str:
+        """开始新的运行，返回 run_id"""
+        run_id = f"{label}-{datetime.now().strftime('%y%m%d-%H%M%S')}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, label, started_at, finished_at) VALUES (?, ?, ?, NULL)",
+                (run_id, label, time.time()),
+            )
+            self._conn.commit()
+        logger.info(f"检查点运行: {run_id}")
+        return run_id
+
+    def latest_unfinished(self, label: str) -> Optional[str]:
+        """最近一次未完成的运行"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE label = ? AND finished_at IS NULL "
+                "ORDER BY started_at DESC LIMIT 1",
+                (label,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def finish_run(self, run_id: str):
+        """标记运行完成并删除它的快照和阶段记录（完成的运行不会再被恢复）"""
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+            self._delete_run_data(run_id)
+            self._conn.commit()
+
+    def prune(self, max_age_days: float) -> int:
+        """
+        删除超过 max_age_days 天的运行（包括从未恢复的崩溃运行）及其数据
+
+        Returns:
+            删除的运行数量
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            run_ids = [
+                row[0] for row in self._conn.execute(
+                    "SELECT run_id FROM runs WHERE started_at < ?", (cutoff,)
+                ).fetchall()
+            ]
+            for run_id in run_ids:
+                self._delete_run_data(run_id)
+            self._conn.execute("DELETE FROM runs WHERE started_at < ?", (cutoff,))
+            self._conn.commit()
+
+        if run_ids:
+            logger.info(f"已清理 {len(run_ids)} 个过期检查点运行")
+        return len(run_ids)
+
+    def _delete_run_data(self, run_id: str):
+        """删除运行的快照和阶段记录（调用方持有锁并提交）"""
+        self._conn.execute("DELETE FROM snapshots WHERE run_id = ?", (run_id,))
+        self._conn.execute("DELETE FROM stages WHERE run_id = ?", (run_id,))
+
+    # ---------- 阶段 ----------
+
+    def record(self, run_id: str, stage: str, properties: Iterable[PropertyData]):
+        """记录一批房源完成了某个阶段，同时保存它们的最新快照"""
+        now = time.time()
+        snapshots = []
+        markers = []
+        for prop in properties:
+            key = property_key(prop)
+            snapshots.append((run_id, key, prop.source.value, _encode(prop)))
+            markers.append((run_id, key, stage, now))
+        if not markers:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (run_id, key, source, data) VALUES (?, ?, ?, ?)",
+                snapshots,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO stages (run_id, key, stage, done_at) VALUES (?, ?, ?, ?)",
+                markers,
+            )
+            self._conn.commit()
+
+    def mark(self, run_id: str, stage: str):
+        """记录运行级别的阶段（如某个爬虫的列表已爬完）"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages (run_id, key, stage, done_at) VALUES (?, '', ?, ?)",
+                (run_id, stage, time.time()),
+            )
+            self._conn.commit()
+
+    def is_marked(self, run_id: str, stage: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM stages WHERE run_id = ? AND key = '' AND stage = ?",
+                (run_id, stage),
+            ).fetchone()
+        return row is not None
+
+    def completed(self, run_id: str, stage: str) -> Set[str]:
+        """已完成某个阶段的房源键"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM stages WHERE run_id = ? AND stage = ? AND key != ''",
+                (run_id, stage),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def load(self, run_id: str, source: Optional[PropertySource] = None) -> List[PropertyData]:
+        """加载运行中保存的房源快照（可按来源过滤）"""
+        query = "SELECT data FROM snapshots WHERE run_id = ?"
+        params: tuple = (run_id,)
+        if source is not None:
+            query += " AND source = ?"
+            params += (source.value,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY rowid", params).fetchall()
+
+        properties = []
+        for (data,) in rows:
+            try:
+                properties.append(_decode(data))
+            except Exception as e:
+                logger.warning(f"检查点快照解析失败，已跳过: {e}")
+        return properties
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,174 @@
+"""
+数据文件读写
+支持 CSV（默认）和 Parquet 两种格式，Parquet 需要安装 pyarrow
+
+Parquet 文件使用显式 schema：来源/区域列字典编码，描述和关键词列 zstd 压缩，
+读取时无需再推断类型。
+"""
+import os
+import glob
+import logging
+from typing import Optional, List, Tuple
+
+import pandas as pd
+
+from ..config import settings
+from .dataframe import parse_datetimes
+
+logger = logging.getLogger(__name__)
+
+PARQUET_EXTENSION = ".parquet"
+CSV_EXTENSION = ".csv"
+
+# 字典编码的低基数列
+DICTIONARY_COLUMNS = ("source", "addressLine2", "has_history_detail")
+
+# 长文本列（单独使用 zstd 压缩）
+TEXT_COLUMNS = ("description_en", "description_cn", "keywords")
+
+INT_COLUMNS = ("pricePerWeek", "bedroomCount", "bathroomCount", "parkingCount", "propertyType")
+FLOAT_COLUMNS = ("average_score",)
+DATETIME_COLUMNS = ("available_date", "published_at")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        logger.error("pyarrow not installed. Install with: pip install pyarrow")
+        raise
+
+
+def parquet_available() -> bool:
+    """是否可以读写 Parquet"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _column_type(pa, column: str):
+    """列名 -> Arrow 类型"""
+    if column in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in INT_COLUMNS:
+        return pa.int32()
+    if column in FLOAT_COLUMNS or column.startswith("Score_"):
+        return pa.float64()
+    if column in DATETIME_COLUMNS:
+        # 爬虫用 datetime.now() 赋值，带微秒
+        return pa.timestamp("us")
+    if column.startswith("commuteTime_") or column == "commute_time":
+        return pa.int32()
+    return pa.string()
+
+
+def _text(series: pd.Series) -> pd.Series:
+    text = series.astype(str)
+    return text.where(series.notna(), None).astype(object)
+
+
+def _prepare(df: pd.DataFrame, pa) -> Tuple[pd.DataFrame, "pa.Schema"]:
+    """
+    按 schema 做列类型转换（CSV 读入的列可能是 object / float）
+
+    日期列中有无法解析的值（如 "Available Now"）时整列按字符串保存，不丢弃原值
+    """
+    prepared = pd.DataFrame(index=df.index)
+    fields = []
+    for column in df.columns:
+        arrow_type = _column_type(pa, str(column))
+        series = df[column]
+        if pa.types.is_integer(arrow_type):
+            prepared[column] = pd.to_numeric(series, errors="coerce").round().astype("Int32")
+        elif pa.types.is_floating(arrow_type):
+            prepared[column] = pd.to_numeric(series, errors="coerce").astype("float64")
+        elif pa.types.is_timestamp(arrow_type):
+            parsed = parse_datetimes(series)
+            if (parsed.isna() & series.notna()).any():
+                arrow_type = pa.string()
+                prepared[column] = _text(series)
+            else:
+                prepared[column] = parsed
+        else:
+            prepared[column] = _text(series)
+        fields.append((str(column), arrow_type))
+    return prepared, pa.schema(fields)
+
+
+def write_parquet(df: pd.DataFrame, path: str):
+    """以显式 schema 写 Parquet"""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    prepared, schema = _prepare(df, pa)
+    table = pa.Table.from_pandas(prepared, schema=schema, preserve_index=False)
+
+    compression = {str(c): "snappy" for c in df.columns}
+    for column in TEXT_COLUMNS:
+        if column in compression:
+            compression[column] = "zstd"
+
+    pq.write_table(table, path, compression=compression)
+
+
+def write_frame(df: pd.DataFrame, path: str):
+    """按扩展名写文件（.parquet 写 Parquet，其余写 UTF-8-BOM CSV）"""
+    if path.endswith(PARQUET_EXTENSION):
+        write_parquet(df, path)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """按扩展名读文件（.parquet 或 CSV）"""
+    if path.endswith(PARQUET_EXTENSION):
+        _require_pyarrow()
+        return pd.read_parquet(path)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def export_frame(df: pd.DataFrame, csv_path: str, output_format: Optional[str] = None) -> str:
+    """
+    按 settings.output_format 导出
+
+    Args:
+        df: 数据
+        csv_path: CSV 路径（Parquet 使用同名 .parquet）
+        output_format: csv / parquet / both，默认 settings.output_format
+
+    Returns:
+        主输出文件路径（写了 Parquet 时返回 Parquet 路径）
+    """
+    output_format = (output_format or settings.output_format).lower()
+    parquet_path = os.path.splitext(csv_path)[0] + PARQUET_EXTENSION
+
+    if output_format in ("parquet", "both"):
+        try:
+            write_parquet(df, parquet_path)
+        except ImportError:
+            logger.warning("未安装 pyarrow，改为输出 CSV")
+            output_format = "csv"
+
+    if output_format in ("csv", "both"):
+        df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+    return csv_path if output_format == "csv" else parquet_path
+
+
+def find_frames(pattern: str) -> List[str]:
+    """
+    查找数据文件（pattern 以 .csv 结尾，同时匹配同名 .parquet）
+    同一文件同时存在两种格式时只返回 Parquet（pyarrow 不可用时只返回 CSV）
+    """
+    base = pattern[:-len(CSV_EXTENSION)] if pattern.endswith(CSV_EXTENSION) else pattern
+    files = {}
+    for path in glob.glob(base + CSV_EXTENSION):
+        files[os.path.splitext(path)[0]] = path
+    if parquet_available():
+        for path in glob.glob(base + PARQUET_EXTENSION):
+            files[os.path.splitext(path)[0]] = path
+    return list(files.values())
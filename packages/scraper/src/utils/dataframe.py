@@ -0,0 +1,240 @@
+"""
+DataFrame <-> PropertyData 转换
+按列做类型转换（向量化），再按行组装对象，替代逐行 iterrows + pd.notna 的写法
+"""
+import warnings
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterator, Type
+
+import pandas as pd
+
+from ..models import PropertyData, PropertySource
+
+# 导出 CSV 的列名 -> PropertyData 属性
+PROPERTY_COLUMN_MAP: Dict[str, str] = {
+    'pricePerWeek': 'price_per_week',
+    'addressLine1': 'address_line1',
+    'addressLine2': 'address_line2',
+    'bedroomCount': 'bedroom_count',
+    'bathroomCount': 'bathroom_count',
+    'parkingCount': 'parking_count',
+    'propertyType': 'property_type',
+    'houseId': 'house_id',
+    'url': 'url',
+    'description_en': 'description_en',
+    'description_cn': 'description_cn',
+    'keywords': 'keywords',
+    'average_score': 'average_score',
+    'available_date': 'available_date',
+    'published_at': 'published_at',
+    'thumbnail_url': 'thumbnail_url',
+    'source': 'source',
+}
+
+# 通勤时间列前缀（commuteTime_UNSW 等）
+COMMUTE_PREFIX = 'commuteTime_'
+
+
+def _missing(df: pd.DataFrame, default: Any) -> List[Any]:
+    return [default] * len(df)
+
+
+def int_column(df: pd.DataFrame, column: str, default: int = 0) -> List[int]:
+    """整数列，缺失/无法解析的值取 default"""
+    if column not in df.columns:
+        return _missing(df, default)
+    values = pd.to_numeric(df[column], errors='coerce')
+    return values.fillna(default).astype('int64').tolist()
+
+
+def float_column(df: pd.DataFrame, column: str) -> List[Optional[float]]:
+    """浮点列，缺失值为 None"""
+    if column not in df.columns:
+        return _missing(df, None)
+    values = pd.to_numeric(df[column], errors='coerce')
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def text_column(df: pd.DataFrame, column: str, default: Optional[str] = None) -> List[Optional[str]]:
+    """文本列，缺失值和空白字符串取 default"""
+    if column not in df.columns:
+        return _missing(df, default)
+    series = df[column]
+    text = series.astype(str)
+    valid = series.notna() & (text.str.strip() != '')
+    return text.astype(object).where(valid, default).tolist()
+
+
+def _parse_datetime(value: Any) -> Any:
+    """单个值解析为无时区 Timestamp，失败为 NaT"""
+    parsed = pd.to_datetime(value, errors='coerce')
+    if not pd.isna(parsed) and parsed.tzinfo is not None:
+        parsed = parsed.tz_localize(None)
+    return parsed
+
+
+def parse_datetimes(series: pd.Series) -> pd.Series:
+    """
+    解析日期列，无法解析的值为 NaT
+    同一列中的格式可能不同（如 REA 的 available_date 既有 '2024-12-14' 也有
+    '2024-12-15 00:00:00'，published_at 有的带微秒有的不带），按值分别推断格式
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        try:
+            parsed = pd.to_datetime(series, errors='coerce', format='mixed')
+        except (ValueError, TypeError):
+            parsed = None
+
+    if parsed is not None and pd.api.types.is_datetime64_any_dtype(parsed):
+        return parsed.dt.tz_localize(None) if parsed.dt.tz is not None else parsed
+
+    # 不同时区的值混在一起时无法整列转换，逐个解析
+    return pd.Series(
+        [_parse_datetime(v) for v in series.tolist()],
+        index=series.index,
+        dtype='datetime64[ns]',
+    )
+
+
+def datetime_column(df: pd.DataFrame, column: str) -> List[Any]:
+    """日期列，解析为 datetime；缺失为 None，无法解析的值保留原值"""
+    if column not in df.columns:
+        return _missing(df, None)
+    raw = df[column]
+    values = parse_datetimes(raw)
+    return [
+        v.to_pydatetime() if not pd.isna(v) else (None if pd.isna(r) else r)
+        for v, r in zip(values.tolist(), raw.tolist())
+    ]
+
+
+def house_id_column(df: pd.DataFrame) -> List[str]:
+    """
+    房源 ID 列：优先 houseId，其次 house_id，都缺失时用行索引
+    数值 ID 去掉浮点读入产生的 ".0"
+    """
+    ids = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for column in ('houseId', 'house_id'):
+        if column not in df.columns:
+            continue
+        series = df[column]
+        numeric = pd.to_numeric(series, errors='coerce')
+        as_text = series.astype(str).str.strip()
+        whole = numeric.notna() & (numeric % 1 == 0)
+        as_text = as_text.where(~whole, numeric.where(whole, 0).astype('int64').astype(str))
+        valid = series.notna() & (as_text != '') & (as_text != '0')
+        ids = ids.where(ids.notna(), as_text.where(valid, None))
+
+    fallback = pd.Series(df.index.astype(str), index=df.index)
+    return ids.where(ids.notna(), fallback).tolist()
+
+
+def commute_columns(df: pd.DataFrame) -> Dict[str, List[Optional[int]]]:
+    """所有 commuteTime_* 列：大学代码 -> 分钟列表（缺失为 None）"""
+    result = {}
+    for column in df.columns:
+        if str(column).startswith(COMMUTE_PREFIX):
+            values = pd.to_numeric(df[column], errors='coerce')
+            result[column[len(COMMUTE_PREFIX):]] = [
+                None if pd.isna(v) else int(v) for v in values.tolist()
+            ]
+    return result
+
+
+def iter_records(df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """
+    按行返回 dict（缺失值统一为 None）
+    用于需要保留原有逐行逻辑、但不想付出 iterrows 构造 Series 开销的场景
+    """
+    columns = list(df.columns)
+    cleaned = df.astype(object).where(df.notna(), None)
+    for values in zip(*(cleaned[c].tolist() for c in columns)):
+        yield dict(zip(columns, values))
+
+
+def _source_column(df: pd.DataFrame, default_source: PropertySource) -> List[PropertySource]:
+    if 'source' not in df.columns:
+        return _missing(df, default_source)
+    lookup = {s.value: s for s in PropertySource}
+    return [lookup.get(str(v), default_source) for v in df['source'].tolist()]
+
+
+def dataframe_to_properties(
+    df: pd.DataFrame,
+    default_source: PropertySource = PropertySource.DOMAIN,
+    require_description: bool = False,
+    limit: Optional[int] = None,
+    model: Type = PropertyData,
+) -> List[PropertyData]:
+    """
+    DataFrame -> PropertyData 列表
+
+    Args:
+        df: 使用导出 CSV 列名（houseId, pricePerWeek, ...）的 DataFrame
+        default_source: source 列缺失或无法识别时使用的来源
+        require_description: 只保留有 description_en 的行
+        limit: 最多返回的数量
+        model: 房源类，大量历史数据常驻内存时可用 CompactPropertyData
+    """
+    if df.empty:
+        return []
+
+    columns = {
+        'house_id': house_id_column(df),
+        'source': _source_column(df, default_source),
+        'price_per_week': int_column(df, 'pricePerWeek'),
+        'address_line1': text_column(df, 'addressLine1', ''),
+        'address_line2': text_column(df, 'addressLine2', ''),
+        'bedroom_count': int_column(df, 'bedroomCount'),
+        'bathroom_count': int_column(df, 'bathroomCount'),
+        'parking_count': int_column(df, 'parkingCount'),
+        'property_type': int_column(df, 'propertyType', 1),
+        'url': text_column(df, 'url', ''),
+        'description_en': text_column(df, 'description_en'),
+        'description_cn': text_column(df, 'description_cn'),
+        'keywords': text_column(df, 'keywords'),
+        'average_score': float_column(df, 'average_score'),
+        'thumbnail_url': text_column(df, 'thumbnail_url'),
+        'available_date': datetime_column(df, 'available_date'),
+        'published_at': datetime_column(df, 'published_at'),
+    }
+    commutes = commute_columns(df)
+    names = list(columns.keys())
+
+    properties = []
+    for i, values in enumerate(zip(*columns.values())):
+        fields = dict(zip(names, values))
+        if require_description and not fields['description_en']:
+            continue
+
+        prop = model(**fields)
+        for uni, times in commutes.items():
+            if times[i] is not None:
+                prop.commute_times[uni] = times[i]
+
+        properties.append(prop)
+        if limit is not None and len(properties) >= limit:
+            break
+
+    return properties
+
+
+def properties_to_dataframe(properties: List[PropertyData]) -> pd.DataFrame:
+    """PropertyData 列表 -> DataFrame（导出 CSV 的列名，通勤时间展开为 commuteTime_* 列）"""
+    data = {
+        column: [getattr(prop, attr) for prop in properties]
+        for column, attr in PROPERTY_COLUMN_MAP.items()
+        if column != 'source'
+    }
+    data['source'] = [prop.source.value for prop in properties]
+
+    universities: List[str] = []
+    for prop in properties:
+        for uni in prop.commute_times:
+            if uni not in universities:
+                universities.append(uni)
+    for uni in universities:
+        data[f'{COMMUTE_PREFIX}{uni}'] = [prop.commute_times.get(uni) for prop in properties]
+
+    return pd.DataFrame(data)
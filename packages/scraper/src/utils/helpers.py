@@ -120,6 +120,40 @@ def clean_address(address: str) -> str:
     )
 
 
+# 地址归一化时使用的街道类型缩写
+_STREET_ABBREVIATIONS = {
+    'street': 'st', 'road': 'rd', 'avenue': 'ave', 'parade': 'pde',
+    'place': 'pl', 'drive': 'dr', 'lane': 'ln', 'court': 'ct',
+    'crescent': 'cres', 'highway': 'hwy', 'terrace': 'tce',
+    'boulevard': 'blvd', 'circuit': 'cct', 'close': 'cl', 'square': 'sq',
+}
+
+# 单元号前缀（"Unit 504/93 ..." 与 "504/93 ..." 视为同一地址）
+_UNIT_PREFIXES = {'unit', 'apt', 'apartment', 'flat', 'suite'}
+
+
+def normalize_address(address: str) -> str:
+    """
+    归一化地址，用作跨房源/跨数据源的缓存键
+    - 转小写，斜杠/连字符/标点统一为空格
+    - 去掉结尾的 "australia" 和单元号前缀
+    - 街道类型统一为缩写（road -> rd）
+    
+    例如 "504/93 Brompton Road, Kensington NSW 2033, Australia"
+    和 "504-93-brompton-rd kensington nsw 2033" 得到相同结果
+    """
+    if not address:
+        return ""
+    
+    tokens = re.sub(r'[^a-z0-9]+', ' ', str(address).lower()).split()
+    if tokens and tokens[-1] == 'australia':
+        tokens.pop()
+    if tokens and tokens[0] in _UNIT_PREFIXES:
+        tokens.pop(0)
+    
+    return " ".join(_STREET_ABBREVIATIONS.get(t, t) for t in tokens)
+
+
 def parse_available_date(date_text: str) -> Optional[datetime]:
     """
     解析可用日期
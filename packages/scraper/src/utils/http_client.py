@@ -0,0 +1,174 @@
+"""
+HTTP 页面抓取
+复用浏览器建立的会话（cookies + User-Agent），用 aiohttp 连接池并发抓取静态页面，
+识别被拦截的响应，交由调用方回退到浏览器
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 视为被拦截的 HTTP 状态码
+BLOCK_STATUS = {401, 403, 429, 503}
+
+# 反爬验证页的特征文本（只用验证页独有的文本：正常的 REA 页面开头也会加载
+# Kasada 脚本并包含 "KPSDK"，Kasada 拦截由 429 状态码和页面长度识别）
+BLOCK_MARKERS = (
+    "Access Denied",
+    "Pardon Our Interruption",
+)
+
+
+class HttpPageFetcher:
+    """
+    基于浏览器会话的 HTTP 抓取器
+
+    iter_fetch 在后台线程中运行事件循环，按完成顺序返回 (key, html)；
+    html 为 None 表示请求失败或被拦截。连续被拦截 max_consecutive_blocks 次后
+    认为会话已失效，剩余页面不再请求，直接返回 None。
+    """
+
+    def __init__(
+        self,
+        session: dict,
+        concurrency: int = 8,
+        timeout: float = 30.0,
+        min_length: int = 0,
+        block_markers: Sequence[str] = BLOCK_MARKERS,
+        max_consecutive_blocks: int = 5,
+    ):
+        """
+        Args:
+            session: BrowserManager.export_session() 的返回值
+            concurrency: 并发连接数
+            timeout: 单个请求超时（秒）
+            min_length: 页面最小长度，更短的视为被拦截
+            block_markers: 被拦截页面的特征文本
+            max_consecutive_blocks: 连续拦截多少次后停止 HTTP 请求
+        """
+        self.cookies: Dict[str, str] = session.get('cookies', {})
+        self.headers = {
+            'User-Agent': session.get('user_agent', ''),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-AU,en;q=0.9',
+        }
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.min_length = min_length
+        self.block_markers = tuple(block_markers)
+        self.max_consecutive_blocks = max_consecutive_blocks
+
+        self._consecutive_blocks = 0
+        self._stop = threading.Event()
+        self.stats = {'fetched': 0, 'blocked': 0, 'failed': 0, 'skipped': 0}
+
+    @property
+    def session_blocked(self) -> bool:
+        """会话是否已被判定失效"""
+        return self._consecutive_blocks >= self.max_consecutive_blocks
+
+    def is_blocked(self, status: int, html: str) -> bool:
+        """判断响应是否为拦截页"""
+        if status in BLOCK_STATUS:
+            return True
+        if len(html) < self.min_length:
+            return True
+        head = html[:5000]
+        return any(marker in head for marker in self.block_markers)
+
+    async def _fetch(self, http, semaphore: asyncio.Semaphore, url: str) -> Optional[str]:
+        if self._stop.is_set() or self.session_blocked:
+            self.stats['skipped'] += 1
+            return None
+
+        async with semaphore:
+            if self._stop.is_set() or self.session_blocked:
+                self.stats['skipped'] += 1
+                return None
+            started = time.perf_counter()
+            try:
+                async with http.get(url) as response:
+                    html = await response.text(errors='replace')
+                    status = response.status
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"HTTP 请求失败 {url}: {e}")
+                self.stats['failed'] += 1
+                metrics.inc("http_fetch_total", result="failed")
+                return None
+            metrics.observe("http_fetch_seconds", time.perf_counter() - started)
+
+        if self.is_blocked(status, html):
+            self._consecutive_blocks += 1
+            self.stats['blocked'] += 1
+            metrics.inc("http_fetch_total", result="blocked")
+            logger.debug(f"HTTP 请求被拦截 ({status}, {len(html)} bytes): {url}")
+            if self.session_blocked:
+                logger.warning(f"连续 {self._consecutive_blocks} 次被拦截，会话已失效，剩余页面改用浏览器")
+            return None
+
+        self._consecutive_blocks = 0
+        self.stats['fetched'] += 1
+        metrics.inc("http_fetch_total", result="ok")
+        return html
+
+    async def _run(self, items: List[Tuple[Hashable, str]], results: "queue.Queue"):
+        import aiohttp
+
+        pending = dict(items)
+        try:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            async with aiohttp.ClientSession(
+                headers=self.headers,
+                cookies=self.cookies,
+                timeout=timeout,
+                connector=connector,
+            ) as http:
+
+                async def fetch_one(key, url):
+                    html = await self._fetch(http, semaphore, url)
+                    pending.pop(key, None)
+                    results.put((key, html))
+
+                await asyncio.gather(*[fetch_one(key, url) for key, url in items])
+        except Exception as e:
+            logger.error(f"HTTP 抓取失败: {e}")
+        finally:
+            for key in list(pending):
+                results.put((key, None))
+
+    def iter_fetch(self, items: List[Tuple[Hashable, str]]) -> Iterator[Tuple[Hashable, Optional[str]]]:
+        """
+        并发抓取页面，返回按完成顺序产出 (key, html) 的迭代器
+
+        Args:
+            items: [(key, url), ...]，key 需唯一
+        """
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            logger.error("aiohttp not installed. Install with: pip install aiohttp")
+            raise
+
+        return self._iter_results(items)
+
+    def _iter_results(self, items: List[Tuple[Hashable, str]]) -> Iterator[Tuple[Hashable, Optional[str]]]:
+        results: "queue.Queue" = queue.Queue()
+        thread = threading.Thread(target=lambda: asyncio.run(self._run(items, results)), daemon=True)
+        thread.start()
+
+        try:
+            for _ in range(len(items)):
+                yield results.get()
+        finally:
+            self._stop.set()
+            thread.join()
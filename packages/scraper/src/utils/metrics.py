@@ -0,0 +1,288 @@
+"""
+运行指标
+进程内的轻量指标注册表：计数器、延迟直方图和流水线阶段耗时，
+导出为 Prometheus textfile（供 node_exporter textfile collector 采集）和每次运行的 JSON
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 导出时的指标名前缀
+PREFIX = "qrent_scraper"
+
+# 延迟直方图的桶上界（秒），覆盖 DB 批次（毫秒级）到页面加载/LLM 调用（数十秒）
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """固定桶直方图（累计计数在导出时计算）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram'):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶估算分位数（返回所在桶的上界）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class StageTimer:
+    """stage() 上下文中使用，处理完成后设置 items"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.started_at = time.time()
+        self.seconds = 0.0
+
+
+class MetricsRegistry:
+    """
+    指标注册表（线程安全）
+
+    用法:
+        metrics.inc("llm_calls_total", engine="sync", status="ok")
+        with metrics.timer("maps_call_seconds", api="geocode"):
+            ...
+        with metrics.stage("scoring") as stage:
+            stage.items = len(properties)
+        metrics.write_textfile("metrics/scraper.prom")
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, Dict[LabelKey, float]] = {}
+            self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+            self.stages: List[StageTimer] = []
+            self.started_at = time.time()
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        """计数器加 amount"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        """记录一次直方图观测值（秒）"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def take_samples(self) -> dict:
+        """取出并清空计数器和直方图（子进程把本进程的指标回传给父进程合并）"""
+        with self._lock:
+            samples = {'counters': self.counters, 'histograms': self.histograms}
+            self.counters = {}
+            self.histograms = {}
+        return samples
+
+    def merge_samples(self, samples: dict):
+        """合并 take_samples() 的结果"""
+        with self._lock:
+            for name, series in samples.get('counters', {}).items():
+                target = self.counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0.0) + value
+            for name, series in samples.get('histograms', {}).items():
+                target = self.histograms.setdefault(name, {})
+                for key, histogram in series.items():
+                    if key in target:
+                        target[key].merge(histogram)
+                    else:
+                        target[key] = histogram
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """记录代码块耗时（异常时同样记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTimer]:
+        """记录流水线阶段的墙钟时间和处理数量"""
+        stage = StageTimer(name)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - start
+            with self._lock:
+                self.stages.append(stage)
+            rate = f", {stage.items / stage.seconds:.2f} items/s" if stage.items and stage.seconds else ""
+            logger.info(f"阶段 [{name}] 耗时 {stage.seconds:.1f}s, {stage.items} 项{rate}")
+
+    def record_stage(self, name: str, seconds: float, items: int = 0):
+        """记录在别处计时的阶段（如流式模式中并发执行、不能用 stage() 包裹的阶段）"""
+        stage = StageTimer(name)
+        stage.started_at = time.time() - seconds
+        stage.seconds = seconds
+        stage.items = items
+        with self._lock:
+            self.stages.append(stage)
+        logger.info(f"阶段 [{name}] 耗时 {seconds:.1f}s, {items} 项")
+
+    def _stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """同名阶段合并（如按大学多次执行的通勤阶段）"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for stage in self.stages:
+            total = totals.setdefault(stage.name, {'seconds': 0.0, 'items': 0})
+            total['seconds'] += stage.seconds
+            total['items'] += stage.items
+        for total in totals.values():
+            total['items_per_second'] = total['items'] / total['seconds'] if total['seconds'] else 0.0
+        return totals
+
+    # ---------- 导出 ----------
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+                'duration_seconds': round(time.time() - self.started_at, 3),
+                'stages': {
+                    name: {k: round(v, 3) for k, v in total.items()}
+                    for name, total in self._stage_totals().items()
+                },
+                'counters': {
+                    name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                'histograms': {
+                    name: [
+                        {
+                            'labels': dict(key),
+                            'count': hist.count,
+                            'sum': round(hist.sum, 3),
+                            'mean': round(hist.sum / hist.count, 3) if hist.count else None,
+                            'p50': hist.quantile(0.5),
+                            'p95': hist.quantile(0.95),
+                            'buckets': dict(zip([str(b) for b in hist.buckets] + ['+Inf'], hist.counts)),
+                        }
+                        for key, hist in series.items()
+                    ]
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self, run_labels: Optional[Dict[str, str]] = None) -> str:
+        """Prometheus 文本格式（run_labels 附加到所有序列上）"""
+        base = _label_key(run_labels or {})
+        lines = []
+
+        with self._lock:
+            stages = self._stage_totals()
+            for metric, field_name, help_text in (
+                ("stage_seconds", "seconds", "Wall time per pipeline stage in the last run"),
+                ("stage_items", "items", "Items processed per pipeline stage in the last run"),
+                ("stage_items_per_second", "items_per_second", "Throughput per pipeline stage in the last run"),
+            ):
+                full = f"{PREFIX}_{metric}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} gauge")
+                for name, total in stages.items():
+                    labels = _format_labels(tuple(sorted(base + (('stage', name),))))
+                    lines.append(f"{full}{labels} {total[field_name]:.6g}")
+
+            full = f"{PREFIX}_last_run_timestamp_seconds"
+            lines.append(f"# TYPE {full} gauge")
+            lines.append(f"{full}{_format_labels(base)} {time.time():.0f}")
+
+            for name, series in self.counters.items():
+                full = f"{PREFIX}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                for key, value in series.items():
+                    lines.append(f"{full}{_format_labels(tuple(sorted(base + key)))} {value:.6g}")
+
+            for name, series in self.histograms.items():
+                full = f"{PREFIX}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                for key, hist in series.items():
+                    labels = tuple(sorted(base + key))
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{full}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{full}_bucket{_format_labels(labels, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {hist.sum:.6g}")
+                    lines.append(f"{full}_count{_format_labels(labels)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str, run_labels: Optional[Dict[str, str]] = None) -> str:
+        """写入 Prometheus textfile（先写临时文件再改名，避免采集到写了一半的文件）"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(run_labels))
+        os.replace(tmp_path, path)
+        return path
+
+    def write_json(self, path: str, extra: Optional[dict] = None) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = self.to_dict()
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return path
+
+
+# 进程内全局注册表
+metrics = MetricsRegistry()
@@ -0,0 +1,173 @@
+"""
+阶段性能剖析（可选，--profile 开启）
+对每个流水线阶段做采样式 CPU 剖析和 tracemalloc 内存快照对比：
+- <序号>_<阶段>.collapsed   折叠调用栈，可直接用于 flamegraph.pl / speedscope / inferno
+- <序号>_<阶段>.alloc.txt   阶段内新增内存最多的分配位置和峰值
+
+采样器是一个后台线程，按固定间隔读取所有线程的当前调用栈（墙钟采样，
+等待页面加载/网络的时间同样计入），不依赖第三方剖析工具。
+多进程区域爬取（AREA_WORKERS > 1）的子进程不在剖析范围内。
+"""
+import os
+import re
+import sys
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc 结果中忽略的内部帧（包括采样器自身的分配）
+_ALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    # 折叠格式中 ';' 是帧分隔符
+    return f"{code.co_name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(f"thread:{thread_name}")
+    return ";".join(reversed(labels))
+
+
+class _Sampler(threading.Thread):
+    """后台采样线程：每隔 interval 秒记录一次所有线程的调用栈"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[_collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    阶段剖析器
+
+    用法:
+        profiler = StageProfiler("output/profile/UNSW_250101_120000")
+        with profiler.stage("scored"):
+            ...
+    """
+
+    def __init__(self, output_dir: str, interval: float = 0.005, top_n: int = 30, frames: int = 1):
+        """
+        Args:
+            output_dir: 剖析结果输出目录
+            interval: 采样间隔（秒）
+            top_n: 分配位置报告的条数
+            frames: tracemalloc 每次分配记录的栈深度（越深越慢）
+        """
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_n = top_n
+        self.frames = frames
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        # 同一目录下多次运行时接着已有文件编号，避免覆盖
+        self._sequence = sum(1 for entry in os.listdir(output_dir) if entry.endswith(".collapsed"))
+
+    def _next_prefix(self, name: str) -> str:
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        return os.path.join(self.output_dir, f"{sequence:02d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """剖析代码块，结束后写出折叠调用栈和分配报告"""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot().filter_traces(_ALLOC_FILTERS)
+
+        sampler = _Sampler(self.interval)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            sampler.stop()
+            after = tracemalloc.take_snapshot().filter_traces(_ALLOC_FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            prefix = self._next_prefix(name)
+            try:
+                self._write_stacks(f"{prefix}.collapsed", sampler.stacks)
+                self._write_allocations(f"{prefix}.alloc.txt", name, seconds, before, after, current, peak)
+                logger.info(f"阶段 [{name}] 剖析完成: {sampler.samples} 次采样, 峰值内存 {peak / 1e6:.1f} MB -> {prefix}.*")
+            except OSError as e:
+                logger.warning(f"写出阶段 [{name}] 剖析结果失败: {e}")
+
+    @staticmethod
+    def _write_stacks(path: str, stacks: Counter):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _write_allocations(
+        self,
+        path: str,
+        name: str,
+        seconds: float,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+        current: int,
+        peak: int,
+    ):
+        diffs = after.compare_to(before, "lineno")
+        growth = sum(diff.size_diff for diff in diffs)
+
+        lines = [
+            f"stage: {name}",
+            f"wall time: {seconds:.2f}s",
+            f"traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB, "
+            f"net growth in stage {growth / 1e6:+.1f} MB",
+            "",
+            f"top {self.top_n} allocation sites by net growth:",
+        ]
+        for diff in diffs[:self.top_n]:
+            frame = diff.traceback[0]
+            lines.append(
+                f"{diff.size_diff / 1024:+12.1f} KiB {diff.count_diff:+9d} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
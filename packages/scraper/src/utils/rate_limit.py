@@ -0,0 +1,92 @@
+"""
+限流工具
+基于令牌桶的异步限流器，用于控制 API 的每分钟请求数 (RPM) / 每分钟 token 数 (TPM)；
+以及跨进程共享的最小间隔限流器，用于多进程爬取时控制站点的总请求速率
+"""
+import time
+import asyncio
+import multiprocessing
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """
+    异步令牌桶
+
+    以 rate_per_minute 的速率匀速补充令牌，桶容量默认为一分钟的额度。
+    acquire(n) 在令牌不足时异步等待，不阻塞事件循环。
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: 每分钟补充的令牌数
+            capacity: 桶容量（允许的突发量），默认等于 rate_per_minute
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """获取 amount 个令牌，不足时等待（超过容量的请求按容量计算）"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def refund(self, amount: float):
+        """归还多预扣的令牌（例如按估算预扣 token 后，实际用量更少）"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def drain(self):
+        """清空令牌（收到 429 时调用，让后续请求等待补充）"""
+        self._refill()
+        self._tokens = 0.0
+
+
+class ProcessRateLimiter:
+    """
+    跨进程最小间隔限流器
+
+    所有持有同一实例的进程共享"下一次允许请求的时间"，
+    保证全局相邻两次请求至少间隔 min_interval 秒。
+    需在创建子进程时作为参数传入（multiprocessing 的锁和共享内存不能通过队列传递）。
+    """
+
+    def __init__(self, min_interval: float, context=None):
+        """
+        Args:
+            min_interval: 相邻两次请求的最小间隔（秒）
+            context: multiprocessing 上下文，需与创建子进程的上下文一致
+        """
+        context = context or multiprocessing.get_context()
+        self.min_interval = max(0.0, min_interval)
+        self._lock = context.Lock()
+        self._next_at = context.Value('d', 0.0, lock=False)
+
+    def acquire(self) -> float:
+        """预约下一个请求时间点并等待到该时间，返回等待的秒数"""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_at.value)
+            self._next_at.value = start + self.min_interval
+
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试从 packages/scraper 目录导入 src
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import dataclasses
+import os
+import time
+
+from src.config import settings
+from src.models import PropertyData, PropertySource
+from src.scrapers.area_pool import AreaProcessPool
+from src.utils.metrics import metrics
+
+AREAS = ["Kensington", "Randwick", "Kingsford", "Maroubra", "Coogee"]
+
+
+class StubScraper:
+    """子进程中实例化的假爬虫：越靠前的区域越慢，Kingsford 所在进程直接退出"""
+
+    def __init__(self, config):
+        self.config = config
+        self.incremental_stops = 0
+        self.known_ids = set()
+        self.rate_limiter = None
+        self.profile_dir = None
+
+    def scrape_areas(self, areas):
+        area = areas[0]
+        if area == "Kingsford":
+            # 等上一个区域的结果从队列的后台线程发出，再模拟进程被杀
+            time.sleep(0.5)
+            os._exit(1)
+        time.sleep(0.1 * (len(AREAS) - AREAS.index(area)))
+        metrics.inc("pages_loaded", site="domain")
+        return [PropertyData(house_id=f"{area}-{i}", source=PropertySource.DOMAIN) for i in range(2)]
+
+
+def test_results_keep_area_order_when_a_worker_dies():
+    metrics.reset()
+    config = dataclasses.replace(settings.scraper, area_workers=2)
+    pool = AreaProcessPool(StubScraper, config, workers=2, startup_stagger=0, poll_interval=0.5)
+
+    properties = pool.run(AREAS)
+
+    finished = [area for area in AREAS if area != "Kingsford"]
+    assert [prop.house_id for prop in properties] == [f"{area}-{i}" for area in finished for i in range(2)]
+    assert pool.stats["areas"] == 4
+    assert pool.stats["failed"] == 1
+    # 子进程的指标合并到父进程
+    assert sum(metrics.counters["pages_loaded"].values()) == 4
@@ -0,0 +1,89 @@
+from src.config import SeleniumConfig
+from src.utils.browser import BrowserManager, BrowserType, RoutingProfile, RoutingStats
+from src.utils.metrics import metrics
+
+
+class FakePage:
+    def goto(self, url, **kwargs):
+        pass
+
+    def wait_for_timeout(self, ms):
+        pass
+
+
+def make_browser(block_resources, **kwargs):
+    browser = BrowserManager(
+        SeleniumConfig(block_resources=block_resources), BrowserType.PLAYWRIGHT, **kwargs
+    )
+    browser._playwright_page = FakePage()
+    return browser
+
+
+def page_load_sites():
+    return {dict(key)["site"] for key in metrics.histograms.get("page_load_seconds", {})}
+
+
+def test_page_load_metrics_keep_site_without_blocking():
+    metrics.reset()
+    for site in ("realestate", "domain"):
+        browser = make_browser(False, routing=site, site=site)
+        assert browser.routing is None
+        assert browser.navigate("https://example.com", wait_time=0)
+
+    assert page_load_sites() == {"realestate", "domain"}
+
+
+def test_site_defaults_to_routing_name():
+    assert make_browser(True, routing="domain").site == "domain"
+    assert make_browser(False, routing="domain").site == "domain"
+    assert make_browser(False).site == "default"
+
+
+def test_allowlist_overrides_blocklist():
+    profile = RoutingProfile(
+        blocked_resource_types=frozenset({"image"}),
+        blocked_domains=("example.com",),
+        allowed_domains=("cdn.example.com",),
+    )
+
+    assert profile.should_block("script", "https://ads.example.com/tag.js")
+    assert not profile.should_block("script", "https://cdn.example.com/app.js")
+    # 白名单主机的图片也放行
+    assert not profile.should_block("image", "https://cdn.example.com/logo.png")
+    assert profile.should_block("image", "https://other.org/logo.png")
+
+
+def test_blocked_domains_match_subdomains_only():
+    profile = RoutingProfile(blocked_domains=("tracker.com",))
+
+    assert profile.should_block("script", "https://tracker.com/t.js")
+    assert profile.should_block("script", "https://EU.Tracker.com/t.js")
+    assert not profile.should_block("script", "https://nottracker.com/t.js")
+    assert not profile.should_block("script", "https://tracker.com.au/t.js")
+    assert not profile.should_block("document", "about:blank")
+
+
+def test_preset_lookup_per_site():
+    rea = RoutingProfile.preset("realestate")
+    assert rea.name == "realestate"
+    assert not rea.should_block("image", "https://www.realestate.com.au/photo.jpg")
+    assert rea.should_block("image", "https://i2.au.reastatic.net/photo.jpg")
+    assert rea.should_block("script", "https://cdn.permutive.com/sdk.js")
+
+    domain = RoutingProfile.preset("domain")
+    assert domain.should_block("script", "https://match.adsrvr.org/x.js")
+    assert not RoutingProfile.preset("realestate").should_block("script", "https://match.adsrvr.org/x.js")
+
+    for name in (None, "unknown"):
+        fallback = RoutingProfile.preset(name)
+        assert fallback.name == "default"
+        assert fallback.allowed_domains == ()
+
+
+def test_routing_stats_merge():
+    total = RoutingStats(allowed=2, blocked=1, bytes_loaded=100, bytes_saved=50, blocked_by_type={"image": 1})
+    total.merge(RoutingStats(allowed=3, blocked=4, bytes_loaded=10, bytes_saved=5,
+                             blocked_by_type={"image": 2, "font": 2}))
+
+    assert (total.allowed, total.blocked, total.bytes_loaded, total.bytes_saved) == (5, 5, 110, 55)
+    assert total.blocked_by_type == {"image": 3, "font": 2}
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from src.utils import SqliteCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "test.sqlite")
+
+
+def test_round_trip_and_namespaces(path):
+    scores = SqliteCache(path, namespace="scores")
+    commute = SqliteCache(path, namespace="commute")
+    key = SqliteCache.make_key("504 93 brompton rd", "UNSW")
+
+    scores.set(key, {"average": 14.5, "scores": [14, 15]})
+
+    assert scores.get(key) == {"average": 14.5, "scores": [14, 15]}
+    assert commute.get(key) is None
+    assert len(scores) == 1 and len(commute) == 0
+    assert SqliteCache(path, namespace="scores").get(key) == {"average": 14.5, "scores": [14, 15]}
+
+
+def test_make_key_separates_parts():
+    assert SqliteCache.make_key("a", "bc") != SqliteCache.make_key("ab", "c")
+    assert SqliteCache.make_key("a", 1) == SqliteCache.make_key("a", "1")
+
+
+def test_expired_entries_are_dropped(path):
+    cache = SqliteCache(path, namespace="commute", ttl_seconds=60)
+    cache.set("old", 12, created_at=time.time() - 120)
+    cache.set("new", 15)
+
+    assert cache.get("old") is None
+    assert cache.get("new") == 15
+    assert len(cache) == 1
+
+
+def test_evict_keeps_most_recently_used(path):
+    cache = SqliteCache(path, namespace="commute", max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        time.sleep(0.01)
+    cache.get("a")
+
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
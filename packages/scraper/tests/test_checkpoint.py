@@ -0,0 +1,165 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from src.config import settings
+from src.models import PropertyData, PropertySource
+from src.pipeline import ScraperPipeline
+from src.scrapers import DomainScraper
+from src.utils.checkpoint import CheckpointStore, property_key
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    yield store
+    store.close()
+
+
+def make_property(house_id, source=PropertySource.DOMAIN, **values):
+    return PropertyData(house_id=house_id, source=source, **values)
+
+
+def test_record_and_load_round_trip(store):
+    run_id = store.start_run("UNSW")
+    prop = make_property(
+        "1", price_per_week=650, description_en="Bright unit", average_score=14.0,
+        available_date=datetime(2024, 12, 14), commute_times={"UNSW": 12},
+    )
+    store.record(run_id, "scored", [prop, make_property("2", PropertySource.REALESTATE)])
+
+    loaded = store.load(run_id, PropertySource.DOMAIN)
+
+    assert len(loaded) == 1
+    assert loaded[0].to_dict() == prop.to_dict()
+    assert store.completed(run_id, "scored") == {"domain:1", "realestate:2"}
+    assert store.completed(run_id, "saved:UNSW") == set()
+
+
+def test_record_keeps_latest_snapshot(store):
+    run_id = store.start_run("UNSW")
+    prop = make_property("1")
+    store.record(run_id, "listed", [prop])
+    prop.average_score = 9.5
+    store.record(run_id, "scored", [prop])
+
+    assert store.load(run_id)[0].average_score == 9.5
+    assert property_key(prop) in store.completed(run_id, "listed")
+
+
+def test_marks_and_unfinished_runs(store):
+    run_id = store.start_run("UNSW")
+    store.mark(run_id, "listed:domain")
+
+    assert store.is_marked(run_id, "listed:domain")
+    assert not store.is_marked(run_id, "listed:realestate")
+    assert store.completed(run_id, "listed:domain") == set()
+    assert store.latest_unfinished("UNSW") == run_id
+    assert store.latest_unfinished("USYD") is None
+
+
+def test_finish_run_clears_data(store):
+    run_id = store.start_run("UNSW")
+    store.record(run_id, "scored", [make_property("1")])
+    store.mark(run_id, "listed:domain")
+
+    store.finish_run(run_id)
+
+    assert store.latest_unfinished("UNSW") is None
+    assert store.load(run_id) == []
+    assert store.completed(run_id, "scored") == set()
+    assert not store.is_marked(run_id, "listed:domain")
+
+
+def test_prune_drops_old_runs(store):
+    old_run = store.start_run("UNSW")
+    store.record(old_run, "listed", [make_property("1")])
+    store._conn.execute("UPDATE runs SET started_at = ? WHERE run_id = ?", (time.time() - 10 * 86400, old_run))
+    store._conn.commit()
+    new_run = store.start_run("USYD")
+    store.record(new_run, "listed", [make_property("2")])
+
+    assert store.prune(7) == 1
+    assert store.load(old_run) == []
+    assert store.latest_unfinished("UNSW") is None
+    assert store.latest_unfinished("USYD") == new_run
+
+
+class FlakyDetailScraper(DomainScraper):
+    """列表固定 3 个房源，详情第一次对 '1' 失败"""
+    failures = {"1"}
+    detail_calls = []
+
+    def scrape_areas(self, areas):
+        return self._tag_area([make_property(str(i)) for i in range(3)], areas[0])
+
+    def iter_property_details(self, properties, skip_existing=True):
+        for prop in properties:
+            if skip_existing and prop.description_en:
+                continue
+            self.detail_calls.append(prop.house_id)
+            if prop.house_id in self.failures:
+                self.failures.discard(prop.house_id)
+            else:
+                prop.description_en = f"desc {prop.house_id}"
+            yield prop
+
+
+def test_resume_retries_failed_detail_fetches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_path", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(ScraperPipeline, "SCRAPERS", {"domain": FlakyDetailScraper})
+
+    def pipeline(resume):
+        return ScraperPipeline(
+            enable_scoring=False, enable_commute=False, enable_database=False,
+            output_dir=str(tmp_path), auto_save_list=False, resume=resume,
+        )
+
+    first = pipeline(False)
+    run_id = first._open_checkpoint("UNSW")
+    # 模拟详情阶段之后崩溃：不结束运行
+    monkeypatch.setattr(first.checkpoints, "finish_run", lambda run_id: None)
+    first.run_plan(["UNSW"])
+    assert first.checkpoints.completed(run_id, "detailed") == {"domain:0", "domain:2"}
+
+    FlakyDetailScraper.detail_calls.clear()
+    results = pipeline(True).run_plan(["UNSW"])
+
+    assert FlakyDetailScraper.detail_calls == ["1"]
+    assert all(prop.description_en for prop in results["UNSW"])
+
+
+class StableScraper(FlakyDetailScraper):
+    failures = set()
+
+
+def test_failed_university_keeps_run_resumable(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_path", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(ScraperPipeline, "SCRAPERS", {"domain": StableScraper})
+
+    def pipeline(resume):
+        return ScraperPipeline(
+            enable_scoring=False, enable_commute=False, enable_database=False,
+            output_dir=str(tmp_path), auto_save_list=False, resume=resume,
+        )
+
+    def broken_export(self, properties, university):
+        raise OSError("disk full")
+
+    first = pipeline(False)
+    with monkeypatch.context() as patch:
+        patch.setattr(ScraperPipeline, "export_to_csv", broken_export)
+        assert first.run_plan(["UNSW"]) == {}
+
+    run_id = first.checkpoints.latest_unfinished("UNSW")
+    assert run_id is not None
+    assert first.checkpoints.completed(run_id, "detailed") == {"domain:0", "domain:1", "domain:2"}
+
+    StableScraper.detail_calls.clear()
+    second = pipeline(True)
+    results = second.run_plan(["UNSW"])
+
+    assert StableScraper.detail_calls == []
+    assert len(results["UNSW"]) == 3
+    assert second.checkpoints.latest_unfinished("UNSW") is None
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.models import PropertyData, PropertySource
+from src.utils.columnar import write_frame, read_frame, export_frame, find_frames
+from src.utils.dataframe import dataframe_to_properties, properties_to_dataframe
+
+pytest.importorskip("pyarrow")
+
+
+def test_parquet_round_trip_keeps_microseconds(tmp_path):
+    published = datetime.now()
+    props = [
+        PropertyData(
+            house_id='42', source=PropertySource.DOMAIN, price_per_week=720,
+            address_line2='kensington-nsw-2033', description_en='Sunny',
+            average_score=12.0, published_at=published,
+            available_date=datetime(2024, 12, 14), commute_times={'UNSW': 15},
+        ),
+    ]
+    path = str(tmp_path / 'UNSW_rentdata_250101.parquet')
+
+    write_frame(properties_to_dataframe(props), path)
+    loaded = dataframe_to_properties(read_frame(path))
+
+    assert loaded[0].house_id == '42'
+    assert loaded[0].published_at == published
+    assert loaded[0].available_date == datetime(2024, 12, 14)
+    assert loaded[0].price_per_week == 720
+    assert loaded[0].commute_times == {'UNSW': 15}
+
+
+def test_parquet_mixed_date_formats(tmp_path):
+    df = pd.DataFrame({
+        'houseId': ['1', '2', '3'],
+        'available_date': ['2024-12-14', '2024-12-15 00:00:00', None],
+    })
+    path = str(tmp_path / 'mixed.parquet')
+
+    write_frame(df, path)
+
+    assert datetime_values(read_frame(path)) == [datetime(2024, 12, 14), datetime(2024, 12, 15), None]
+
+
+def test_parquet_keeps_unparseable_dates_as_text(tmp_path):
+    df = pd.DataFrame({'houseId': ['1', '2'], 'available_date': ['Available Now', '2024-12-14']})
+    path = str(tmp_path / 'text.parquet')
+
+    write_frame(df, path)
+
+    assert read_frame(path)['available_date'].tolist() == ['Available Now', '2024-12-14']
+
+
+def test_export_both_formats(tmp_path):
+    df = pd.DataFrame({'houseId': ['1'], 'published_at': [datetime.now()]})
+    csv_path = str(tmp_path / 'UNSW_rentdata_250101.csv')
+
+    assert export_frame(df, csv_path, 'both').endswith('.parquet')
+    assert sorted(p.rsplit('.', 1)[1] for p in find_frames(str(tmp_path / 'UNSW_rentdata_*.csv'))) == ['parquet']
+    assert (tmp_path / 'UNSW_rentdata_250101.csv').exists()
+
+
+def datetime_values(df: pd.DataFrame) -> list:
+    return [None if pd.isna(v) else v.to_pydatetime() for v in df['available_date']]
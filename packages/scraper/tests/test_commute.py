@@ -0,0 +1,79 @@
+import threading
+
+from src.config import CommuteConfig
+from src.models import PropertyData, PropertySource
+from src.services import commute
+from src.services.commute import CommuteService
+from src.utils import normalize_address
+
+
+def test_normalize_address_matches_across_sources():
+    domain = normalize_address("504-93-brompton-rd kensington nsw 2033")
+    rea = normalize_address("504/93 Brompton Road, Kensington NSW 2033, Australia")
+
+    assert domain == rea == "504 93 brompton rd kensington nsw 2033"
+
+
+def test_normalize_address_drops_unit_prefix_and_empty():
+    assert normalize_address("Unit 5, 12 High Street") == "5 12 high st"
+    assert normalize_address("") == ""
+    assert normalize_address(None) == ""
+
+
+class FakeMaps:
+    """只返回固定公交时间的 directions 接口"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def directions(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        return [{"legs": [{"duration": {"value": 20 * 60}}]}]
+
+
+def make_service(tmp_path):
+    service = CommuteService(CommuteConfig(
+        api_key="", matrix_enabled=False, max_workers=4, request_delay=0.01,
+        cache_path=str(tmp_path / "commute.sqlite"),
+    ))
+    service.gmaps = FakeMaps()
+    return service
+
+
+def make_properties(count):
+    return [
+        PropertyData(
+            house_id=str(i), source=PropertySource.DOMAIN,
+            address_line1=f"{i}-high-street", address_line2="kensington-nsw-2033",
+        )
+        for i in range(count)
+    ]
+
+
+def test_sleeps_only_after_api_calls(tmp_path, monkeypatch):
+    service = make_service(tmp_path)
+    service.process_properties(make_properties(4), "UNSW")
+    assert service.gmaps.calls == 4
+
+    sleeps = []
+    monkeypatch.setattr(commute.time, "sleep", sleeps.append)
+    properties = make_properties(6)
+    service.process_properties(properties, "UNSW")
+
+    # 前 4 个命中缓存，只有 2 个新地址调用了 API
+    assert service.gmaps.calls == 6
+    assert len(sleeps) == 2
+    assert service.cache_hits == 4
+    assert all(prop.commute_times["UNSW"] == 20 for prop in properties)
+
+
+def test_process_property_writes_back(tmp_path, monkeypatch):
+    service = make_service(tmp_path)
+    monkeypatch.setattr(commute.time, "sleep", lambda seconds: None)
+    prop = make_properties(1)[0]
+
+    assert service.process_property(prop, "UNSW") == 20
+    assert prop.commute_times == {"UNSW": 20}
+    assert service.gmaps.calls == 1
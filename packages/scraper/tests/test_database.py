@@ -0,0 +1,155 @@
+from src.config import DatabaseConfig
+from src.models import PropertyData, PropertySource
+from src.services.database import DatabaseService, PROPERTY_COLUMNS
+
+
+class FakeCursor:
+    """内存中的 properties / property_school 表，只实现 bulk 保存用到的语句"""
+
+    def __init__(self):
+        self.properties = {}  # house_id -> row
+        self.ids = {}  # house_id -> id
+        self.schools = {}  # (property_id, school_id) -> commute_time
+        self.queries = []
+        self._result = []
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        self.queries.append((sql, params))
+        if sql.startswith("SELECT house_id, content_hash FROM properties"):
+            self._result = [(h, self.properties[h][-1]) for h in params if h in self.properties]
+        elif sql.startswith("SELECT p.house_id, ps.commute_time"):
+            school_id, house_ids = params[0], params[1:]
+            self._result = [
+                (h, self.schools[(self.ids[h], school_id)])
+                for h in house_ids if (self.ids.get(h), school_id) in self.schools
+            ]
+        elif sql.startswith("SELECT id, house_id FROM properties"):
+            self._result = [(self.ids[h], h) for h in params if h in self.ids]
+        elif sql.startswith("SELECT id, price"):
+            house_id = params[0]
+            row = self.properties.get(house_id)
+            self._result = [(self.ids[house_id],) + (None,) * 10 + (row[-1],)] if row else []
+        elif sql.startswith("INSERT INTO properties"):
+            self.executemany(sql, [params])
+            self.lastrowid = self.ids[params[PROPERTY_COLUMNS.index("house_id")]]
+        elif sql.startswith("UPDATE properties"):
+            house_id = next(h for h, i in self.ids.items() if i == params[-1])
+            columns = [col for col in PROPERTY_COLUMNS if col != "house_id"]
+            values = dict(zip(columns, params[:-1]), house_id=house_id)
+            self.properties[house_id] = tuple(values[col] for col in PROPERTY_COLUMNS)
+        elif sql.startswith("DELETE FROM property_school"):
+            self.schools.pop(params, None)
+        elif sql.startswith("INSERT INTO property_school"):
+            self.executemany(sql, [params])
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def executemany(self, sql, rows):
+        sql = " ".join(sql.split())
+        self.queries.append((sql, rows))
+        if sql.startswith("INSERT INTO properties"):
+            house_id_index = PROPERTY_COLUMNS.index("house_id")
+            for row in rows:
+                house_id = row[house_id_index]
+                self.properties[house_id] = row
+                self.ids.setdefault(house_id, len(self.ids) + 1)
+        elif sql.startswith("INSERT INTO property_school"):
+            for property_id, school_id, commute_time in rows:
+                self.schools[(property_id, school_id)] = commute_time
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+
+def make_service(bulk_save=True):
+    service = DatabaseService(DatabaseConfig(bulk_save=bulk_save, bulk_batch_size=100))
+    service.cursor = FakeCursor()
+    service.connection = None
+    service._region_cache = {"kensington": 1}
+    service._school_cache = {"University of New South Wales": 7}
+    return service
+
+
+def make_property(house_id, commute=15, price=650):
+    return PropertyData(
+        house_id=house_id, source=PropertySource.DOMAIN, price_per_week=price,
+        address_line1="504-93-brompton-road", address_line2="kensington-nsw-2033",
+        description_en="Bright unit", commute_times={"UNSW": commute},
+    )
+
+
+def test_bulk_save_inserts_then_skips_unchanged():
+    service = make_service()
+
+    first = service.save_properties_bulk([make_property("1"), make_property("2")], "UNSW")
+    second = service.save_properties_bulk([make_property("1"), make_property("2", commute=20)], "UNSW")
+
+    assert first["inserted"] == 2
+    assert second["unchanged"] == 1
+    assert second["updated"] == 1
+    assert service.cursor.schools[(service.cursor.ids["2"], 7)] == 20
+
+
+def test_bulk_save_only_queries_the_batch():
+    service = make_service()
+    service.save_properties_bulk([make_property(str(i)) for i in range(5)], "UNSW")
+    service.cursor.queries.clear()
+
+    service.save_properties_bulk([make_property("3", price=700)], "UNSW")
+
+    selects = [(sql, params) for sql, params in service.cursor.queries if sql.startswith("SELECT")]
+    assert selects
+    for sql, params in selects:
+        assert "IN (%s)" in sql
+        assert params[-1] == "3"
+
+
+def test_legacy_save_skips_unchanged():
+    service = make_service(bulk_save=False)
+
+    first = service.save_properties([make_property("1"), make_property("2")], "UNSW")
+    service.cursor.queries.clear()
+    second = service.save_properties(
+        [make_property("1"), make_property("2", price=700), make_property("3")], "UNSW"
+    )
+    third = service.save_properties([make_property("1", commute=20)], "UNSW")
+
+    assert first["inserted"] == 2
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (1, 1, 1)
+    updates = [params for sql, params in service.cursor.queries if sql.startswith("UPDATE properties")]
+    assert len(updates) == 1 and updates[0][-1] == service.cursor.ids["2"]
+    assert (third["updated"], third["unchanged"]) == (1, 0)
+    assert service.cursor.schools[(service.cursor.ids["1"], 7)] == 20
+
+
+class FlakyConnection:
+    """第一次提交失败的连接"""
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+        if self.commits == 1:
+            raise RuntimeError("lost connection")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_bulk_save_counts_rows_once_when_commit_fails():
+    service = make_service()
+    service.connection = FlakyConnection()
+
+    stats = service.save_properties_bulk([make_property("1"), make_property("2")], "UNSW")
+
+    assert service.connection.rollbacks == 1
+    assert (stats["inserted"], stats["updated"], stats["errors"]) == (2, 0, 0)
+    assert service._existing_house_ids == {"1", "2"}
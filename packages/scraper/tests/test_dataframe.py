@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pandas as pd
+
+from src.models import PropertyData, PropertySource
+from src.utils.dataframe import (
+    datetime_column, house_id_column, dataframe_to_properties, properties_to_dataframe,
+)
+
+
+def test_datetime_column_mixed_formats():
+    df = pd.DataFrame({'available_date': ['2024-12-14', '2024-12-15 00:00:00', None]})
+
+    assert datetime_column(df, 'available_date') == [
+        datetime(2024, 12, 14), datetime(2024, 12, 15), None,
+    ]
+
+
+def test_datetime_column_with_and_without_microseconds():
+    df = pd.DataFrame({'published_at': ['2024-01-01 10:00:00', '2024-01-02 11:30:00.123456']})
+
+    assert datetime_column(df, 'published_at') == [
+        datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 2, 11, 30, 0, 123456),
+    ]
+
+
+def test_datetime_column_keeps_unparseable_values():
+    df = pd.DataFrame({'available_date': ['Available Now', '2024-12-14']})
+
+    assert datetime_column(df, 'available_date') == ['Available Now', datetime(2024, 12, 14)]
+
+
+def test_datetime_column_missing_column():
+    assert datetime_column(pd.DataFrame({'x': [1, 2]}), 'available_date') == [None, None]
+
+
+def test_house_id_column_strips_float_suffix():
+    df = pd.DataFrame({'houseId': [123.0, None, 'abc']})
+
+    assert house_id_column(df) == ['123', '1', 'abc']
+
+
+def test_properties_round_trip():
+    props = [
+        PropertyData(
+            house_id='1', source=PropertySource.REALESTATE, price_per_week=650,
+            address_line1='504/93 Brompton Road', bedroom_count=2,
+            description_en='Bright unit', average_score=14.5,
+            available_date=datetime(2024, 12, 14),
+            published_at=datetime(2024, 12, 1, 9, 30, 0, 123456),
+            commute_times={'UNSW': 12},
+        ),
+        PropertyData(house_id='2', source=PropertySource.DOMAIN, price_per_week=700),
+    ]
+
+    loaded = dataframe_to_properties(properties_to_dataframe(props))
+
+    assert [p.house_id for p in loaded] == ['1', '2']
+    assert loaded[0].source == PropertySource.REALESTATE
+    assert loaded[0].price_per_week == 650
+    assert loaded[0].average_score == 14.5
+    assert loaded[0].available_date == datetime(2024, 12, 14)
+    assert loaded[0].published_at == datetime(2024, 12, 1, 9, 30, 0, 123456)
+    assert loaded[0].commute_times == {'UNSW': 12}
+    assert loaded[1].description_en is None
+    assert loaded[1].commute_times == {}
+
+
+def test_dataframe_to_properties_require_description():
+    df = pd.DataFrame({'houseId': ['1', '2'], 'description_en': ['text', '  ']})
+
+    assert [p.house_id for p in dataframe_to_properties(df, require_description=True)] == ['1']
@@ -0,0 +1,81 @@
+from src.dedupe import DuplicateIndex, address_key
+from src.models import PropertyData, PropertySource
+
+
+def domain(house_id="d1", **values):
+    values.setdefault("address_line1", "504-93-brompton-road")
+    values.setdefault("address_line2", "kensington-nsw-2033")
+    values.setdefault("price_per_week", 650)
+    values.setdefault("bedroom_count", 2)
+    return PropertyData(house_id=house_id, source=PropertySource.DOMAIN, **values)
+
+
+def rea(house_id="r1", **values):
+    values.setdefault("address_line1", "504/93 Brompton Road")
+    values.setdefault("address_line2", "Kensington, NSW 2033")
+    values.setdefault("suburb", "Kensington")
+    values.setdefault("price_per_week", 650)
+    values.setdefault("bedroom_count", 2)
+    return PropertyData(house_id=house_id, source=PropertySource.REALESTATE, **values)
+
+
+def test_address_key_matches_across_sources():
+    assert address_key(domain()) == address_key(rea()) == ("504 93 brompton rd", "kensington")
+    assert address_key(rea(address_line1="Address available on request")) is None
+
+
+def test_link_groups_same_listing_from_both_sources():
+    a, b, other = domain(), rea(), domain("d2", address_line1="12-high-street")
+    index = DuplicateIndex(source_order=["realestate", "domain"])
+
+    canonical = index.link([a, b, other])
+
+    assert canonical == [b, other]
+    assert index.duplicate_count == 1
+    assert not index.is_canonical(a)
+    assert index.canonical([a, b, other]) == [b, other]
+
+
+def test_link_prefers_listing_with_details():
+    a, b = domain(description_en="Bright unit"), rea()
+
+    assert DuplicateIndex(source_order=["realestate", "domain"]).link([a, b]) == [a]
+
+
+def test_link_keeps_mismatched_listings_apart():
+    index = DuplicateIndex()
+    listings = [
+        domain(),
+        rea("r1", bedroom_count=3),
+        rea("r2", price_per_week=800),
+        domain("d2"),  # 同一来源不合并
+        rea("r3", address_line1="Address available on request"),
+    ]
+
+    assert index.link(listings) == listings
+    assert index.duplicate_count == 0
+
+
+def test_link_allows_small_price_difference():
+    index = DuplicateIndex(price_tolerance=0.05)
+
+    assert len(index.link([domain(price_per_week=650), rea(price_per_week=640)])) == 1
+
+
+def test_propagate_fills_missing_values_only():
+    canonical = rea(
+        description_en="Bright unit", keywords="near uni", average_score=14.5,
+        scores=[14.0, 15.0], commute_times={"UNSW": 12, "UTS": None},
+    )
+    duplicate = domain(keywords="own keywords", commute_times={"USYD": 30})
+    index = DuplicateIndex()
+    index.link([duplicate, canonical])
+
+    assert index.propagate() == 1
+    assert duplicate.description_en == "Bright unit"
+    assert duplicate.keywords == "own keywords"
+    assert duplicate.average_score == 14.5
+    assert duplicate.scores == [14.0, 15.0]
+    assert duplicate.scores is not canonical.scores
+    assert duplicate.commute_times == {"USYD": 30, "UNSW": 12}
+    assert index.propagate() == 0
@@ -0,0 +1,66 @@
+import threading
+
+from src.models import PropertyData, PropertySource
+from src.scrapers.detail_pool import DetailPagePool
+
+
+class FakeBrowser:
+    def __init__(self, worker):
+        self.worker = worker
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(DetailPagePool):
+    """不启动真实浏览器；broken_workers 中的 worker 重置 profile 时失败"""
+
+    def __init__(self, broken_workers, **kwargs):
+        self.broken_workers = broken_workers
+        self.fetched_by = {}
+        self._lock = threading.Lock()
+        super().__init__("test", self._fetch, "/nonexistent/profile", startup_stagger=0, **kwargs)
+
+    def _open_browser(self, profile_path):
+        return FakeBrowser(0 if profile_path == self.profile_dir else int(profile_path.rsplit("_w", 1)[1]))
+
+    def _reset_profile(self, browser, profile_path):
+        browser.close()
+        if browser.worker in self.broken_workers:
+            raise RuntimeError("browser failed to start")
+        return self._open_browser(profile_path)
+
+    def _fetch(self, browser, prop):
+        assert not browser.closed
+        with self._lock:
+            self.fetched_by.setdefault(browser.worker, []).append(prop.house_id)
+        prop.description_en = "desc"
+        return True
+
+
+def make_properties(count):
+    return [PropertyData(house_id=str(i), source=PropertySource.DOMAIN) for i in range(count)]
+
+
+def test_reset_failure_hands_tasks_to_healthy_workers():
+    pool = FakePool({0}, workers=2, reset_every=1)
+    properties = make_properties(8)
+
+    results = list(pool.run(properties))
+
+    assert sorted(p.house_id for p in results) == [p.house_id for p in properties]
+    assert pool.stats == {"success": 8, "failed": 0}
+    # worker 0 爬完第一个后重置失败退出，其余都由 worker 1 完成
+    assert len(pool.fetched_by.get(0, [])) <= 1
+
+
+def test_remaining_tasks_fail_when_every_reset_fails():
+    pool = FakePool({0, 1}, workers=2, reset_every=1)
+
+    results = list(pool.run(make_properties(6)))
+
+    assert len(results) == 6
+    fetched = sum(len(ids) for ids in pool.fetched_by.values())
+    assert pool.stats == {"success": fetched, "failed": 6 - fetched}
+    assert fetched == 2
@@ -0,0 +1,76 @@
+import gzip
+import logging
+import os
+
+from src.models import PropertyData, PropertySource
+from src.scrapers import DomainScraper, RealEstateScraper
+from src.scrapers import base
+from src.utils import HttpPageFetcher
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+
+def fixture(name):
+    with gzip.open(os.path.join(FIXTURES, name), "rt", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def make_fetcher(min_length=RealEstateScraper.DETAIL_MIN_HTML):
+    return HttpPageFetcher({"cookies": {}, "user_agent": "test"}, min_length=min_length)
+
+
+def test_real_rea_page_is_not_blocked():
+    html = fixture("realestate/listing_2033_captured.html.gz")
+
+    # 正常页面开头也包含 Kasada 脚本
+    assert "KPSDK" in html[:5000]
+    assert not make_fetcher().is_blocked(200, html)
+
+
+def test_challenge_pages_are_blocked():
+    fetcher = make_fetcher()
+    padding = "<div>x</div>" * 2000
+
+    assert fetcher.is_blocked(429, padding)
+    assert fetcher.is_blocked(200, "<html><script>KPSDK.configure()</script></html>")
+    assert fetcher.is_blocked(200, "<title>Pardon Our Interruption</title>" + padding)
+    assert fetcher.is_blocked(200, "<h1>Access Denied</h1>" + padding)
+
+
+class FakeFetcher:
+    """按 house_id 返回预设页面的抓取器"""
+    pages = {}
+
+    def __init__(self, session, **kwargs):
+        self.stats = {"fetched": 0, "blocked": 0, "failed": 0, "skipped": 0}
+
+    def iter_fetch(self, items):
+        for index, url in items:
+            yield index, self.pages.get(url)
+
+
+def test_http_fast_path_counts_successes(monkeypatch, caplog):
+    scraper = DomainScraper()
+    properties = [
+        PropertyData(house_id=str(i), source=PropertySource.DOMAIN, url=f"https://example.com/{i}")
+        for i in range(4)
+    ]
+    no_url = PropertyData(house_id="4", source=PropertySource.DOMAIN, address_line1="", address_line2="")
+    monkeypatch.setattr(scraper, "get_detail_url", lambda prop: prop.url)
+    monkeypatch.setattr(scraper, "_harvest_session", lambda: {"cookies": {}})
+    monkeypatch.setattr(scraper, "parse_detail_page", lambda prop, html: setattr(prop, "description_en", html))
+    monkeypatch.setattr(base, "HttpPageFetcher", FakeFetcher)
+    FakeFetcher.pages = {"https://example.com/0": "desc 0", "https://example.com/2": "desc 2"}
+
+    def collect():
+        fallback = yield from scraper._iter_http_details(properties + [no_url])
+        fell_back.extend(fallback)
+
+    fell_back = []
+    with caplog.at_level(logging.INFO, logger=base.__name__):
+        yielded = list(collect())
+
+    assert [p.house_id for p in yielded] == ["0", "2"]
+    assert sorted(p.house_id for p in fell_back) == ["1", "3", "4"]
+    assert "成功 2," in caplog.text
+    assert "回退浏览器 3" in caplog.text
@@ -0,0 +1,75 @@
+import os
+import time
+
+from src.config import settings
+from src.models import PropertyData, PropertySource
+from src.pipeline import ScraperPipeline
+from src.scrapers import DomainScraper
+
+
+def make_property(house_id, source=PropertySource.DOMAIN, **values):
+    values.setdefault("description_en", f"desc {house_id}")
+    return PropertyData(house_id=house_id, source=source, **values)
+
+
+def make_pipeline(tmp_path, **kwargs):
+    return ScraperPipeline(
+        enable_scoring=False, enable_commute=False, enable_database=False,
+        output_dir=str(tmp_path), auto_save_list=False, **kwargs,
+    )
+
+
+def test_page_mostly_known():
+    scraper = DomainScraper()
+    page = [make_property(str(i)) for i in range(10)]
+
+    assert not scraper._page_mostly_known(page)  # 没有已知房源（完整爬取）
+
+    scraper.known_ids = {str(i) for i in range(7)}
+    assert not scraper._page_mostly_known(page)
+    assert not scraper._page_mostly_known([])
+    assert scraper.incremental_stops == 0
+
+    scraper.known_ids.add("7")
+    assert scraper._page_mostly_known(page)
+    assert scraper.incremental_stops == 1
+
+
+def test_full_sweep_due(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, incremental=True)
+    monkeypatch.setattr(settings.scraper, "full_sweep_days", 7)
+
+    assert pipeline._full_sweep_due("UNSW")  # 从未完整爬取
+
+    pipeline._mark_full_sweep("UNSW")
+    assert not pipeline._full_sweep_due("UNSW")
+
+    eight_days_ago = time.time() - 8 * 86400
+    os.utime(pipeline._full_sweep_marker("UNSW"), (eight_days_ago, eight_days_ago))
+    assert pipeline._full_sweep_due("UNSW")
+
+    monkeypatch.setattr(settings.scraper, "full_sweep_days", 0)
+    assert not pipeline._full_sweep_due("UNSW")
+
+
+def test_incremental_export_keeps_unvisited_history(tmp_path):
+    pipeline = make_pipeline(tmp_path, incremental=True)
+    history = [
+        make_property("1", price_per_week=500),
+        make_property("2"),
+        make_property("3", PropertySource.REALESTATE),
+    ]
+    pipeline.export_to_csv(history, "UNSW")
+
+    # 本次只重新访问了 1（价格更新）和新房源 4
+    crawled = [make_property("1", price_per_week=550), make_property("4")]
+    exported = pipeline._with_carried_forward(crawled, "UNSW", known_ids={"1", "2", "3"})
+
+    assert [(p.source.value, p.house_id) for p in exported] == [
+        ("domain", "1"), ("domain", "4"), ("domain", "2"), ("realestate", "3"),
+    ]
+    assert exported[0].price_per_week == 550
+    assert pipeline.stats["carried_forward"] == 2
+
+    # 完整爬取（没有已知房源）只导出本次爬到的房源
+    assert pipeline._with_carried_forward(crawled, "UNSW", known_ids=set()) == crawled
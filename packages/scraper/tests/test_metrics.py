@@ -0,0 +1,31 @@
+from src.utils.metrics import MetricsRegistry
+
+
+def test_take_and_merge_samples():
+    parent, child = MetricsRegistry(), MetricsRegistry()
+    parent.inc("page_load_errors_total", site="realestate", reason="timeout")
+    parent.observe("page_load_seconds", 1.0, site="realestate")
+    child.inc("page_load_errors_total", 2, site="realestate", reason="timeout")
+    child.inc("page_load_errors_total", site="domain", reason="error")
+    child.observe("page_load_seconds", 3.0, site="realestate")
+    child.observe("page_load_seconds", 0.2, site="domain")
+
+    parent.merge_samples(child.take_samples())
+
+    assert child.counters == {} and child.histograms == {}
+    errors = parent.counters["page_load_errors_total"]
+    assert errors[(("reason", "timeout"), ("site", "realestate"))] == 3
+    assert errors[(("reason", "error"), ("site", "domain"))] == 1
+    loads = parent.histograms["page_load_seconds"]
+    assert loads[(("site", "realestate"),)].count == 2
+    assert loads[(("site", "realestate"),)].sum == 4.0
+    assert loads[(("site", "domain"),)].quantile(0.5) == 0.25
+
+
+def test_record_stage():
+    registry = MetricsRegistry()
+    registry.record_stage("scored", 4.0, items=8)
+    registry.record_stage("scored", 1.0, items=2)
+
+    totals = registry._stage_totals()["scored"]
+    assert totals == {"seconds": 5.0, "items": 10, "items_per_second": 2.0}
@@ -0,0 +1,56 @@
+from src.models import PropertyData, PropertySource
+from src.planner import CrawlPlan
+from src.scrapers import DomainScraper, RealEstateScraper
+
+TARGET_AREAS = {
+    "UNSW": ["kensington-nsw-2033", "waterloo-nsw-2017", "newtown-nsw-2042"],
+    "USYD": ["newtown-nsw-2042", "camperdown-nsw-2050"],
+    "UTS": ["zetland-nsw-2017", "newtown-nsw-2042"],
+}
+
+
+def listing(house_id, area, source=PropertySource.REALESTATE):
+    return PropertyData(house_id=house_id, source=source, search_area=area)
+
+
+def test_build_merges_overlapping_areas():
+    plan = CrawlPlan.build(["UNSW", "USYD", "UTS", "MQ"], TARGET_AREAS)
+
+    assert plan.areas == [
+        "kensington-nsw-2033", "waterloo-nsw-2017", "newtown-nsw-2042",
+        "camperdown-nsw-2050", "zetland-nsw-2017",
+    ]
+    assert plan.area_universities["newtown-nsw-2042"] == ["UNSW", "USYD", "UTS"]
+    assert plan.label == "UNSW-USYD-UTS-MQ"
+
+
+def test_search_groups_share_postcode_search_page():
+    plan = CrawlPlan.build(["UNSW", "UTS"], TARGET_AREAS)
+
+    rea_groups = plan.search_groups(RealEstateScraper())
+    domain_groups = plan.search_groups(DomainScraper())
+
+    assert rea_groups["waterloo-nsw-2017"] == ["waterloo-nsw-2017", "zetland-nsw-2017"]
+    assert "zetland-nsw-2017" not in rea_groups
+    assert len(domain_groups) == len(plan.areas)
+
+
+def test_assign_dedupes_and_records_universities():
+    plan = CrawlPlan.build(["UNSW", "USYD", "UTS"], TARGET_AREAS)
+    groups = plan.search_groups(RealEstateScraper())
+    properties = [
+        listing("1", "waterloo-nsw-2017"),
+        listing("2", "newtown-nsw-2042"),
+        listing("2", "camperdown-nsw-2050"),
+        listing("1", "kensington-nsw-2033", PropertySource.DOMAIN),
+    ]
+
+    unique = plan.assign(properties, groups)
+
+    assert [(p.source, p.house_id) for p in unique] == [
+        (PropertySource.REALESTATE, "1"), (PropertySource.REALESTATE, "2"), (PropertySource.DOMAIN, "1"),
+    ]
+    # waterloo 的搜索页同时覆盖 zetland（UTS）
+    assert plan.universities_for(unique[0]) == {"UNSW", "UTS"}
+    assert plan.universities_for(unique[1]) == {"UNSW", "USYD", "UTS"}
+    assert plan.members(unique, "USYD") == [unique[1]]
@@ -0,0 +1,80 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from src.utils.rate_limit import AsyncTokenBucket, ProcessRateLimiter
+
+
+def elapsed(coro_factory):
+    start = time.monotonic()
+    asyncio.run(coro_factory())
+    return time.monotonic() - start
+
+
+def test_burst_up_to_capacity_then_waits():
+    bucket = AsyncTokenBucket(rate_per_minute=600, capacity=2)  # 10 个/秒
+
+    async def run():
+        await bucket.acquire()
+        await bucket.acquire()
+        assert time.monotonic() - start < 0.05
+        await bucket.acquire()
+
+    start = time.monotonic()
+    assert 0.08 <= elapsed(run) < 0.5
+
+
+def test_concurrent_acquires_are_spread_out():
+    bucket = AsyncTokenBucket(rate_per_minute=1200, capacity=1)  # 20 个/秒
+
+    async def run():
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+    # 第一个立即通过，其余 4 个每个等 50ms
+    assert 0.18 <= elapsed(run) < 0.6
+
+
+def test_amount_is_capped_at_capacity():
+    bucket = AsyncTokenBucket(rate_per_minute=60, capacity=5)
+
+    assert elapsed(lambda: bucket.acquire(50)) < 0.05
+
+
+def test_drain_and_refund():
+    bucket = AsyncTokenBucket(rate_per_minute=600, capacity=10)
+    bucket.drain()
+
+    assert elapsed(lambda: bucket.acquire(1)) >= 0.08
+
+    bucket.refund(5)
+    assert elapsed(lambda: bucket.acquire(5)) < 0.05
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(rate_per_minute=0)
+
+
+def _acquire_and_record(limiter, count, stamps):
+    for _ in range(count):
+        limiter.acquire()
+        stamps.put(time.time())
+
+
+def test_process_limiter_spaces_requests_across_spawned_processes():
+    context = multiprocessing.get_context("spawn")
+    limiter = ProcessRateLimiter(0.2, context)
+    stamps = context.Queue()
+    processes = [
+        context.Process(target=_acquire_and_record, args=(limiter, 3, stamps)) for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    times = sorted(stamps.get(timeout=30) for _ in range(9))
+    for process in processes:
+        process.join(timeout=10)
+
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 0.2 - 0.02
@@ -0,0 +1,47 @@
+import json
+
+from src.config import ScoringConfig
+from src.services.scoring import ScoringService
+
+
+def make_service():
+    return ScoringService(ScoringConfig(api_key="test", cache_enabled=False))
+
+
+def result(item_id, scores=(14, 16), keywords_en="near uni", keywords_cn="近学校"):
+    return {"id": item_id, "scores": list(scores), "keywords_en": keywords_en, "keywords_cn": keywords_cn}
+
+
+def test_parse_batch_response_in_code_block():
+    text = "```json\n" + json.dumps({"results": [result("1"), result("2", scores=(12,))]}) + "\n```"
+
+    parsed = make_service()._parse_batch_response(text, ["1", "2"])
+
+    assert parsed["1"] == {
+        "average_score": 15.0, "scores": [14.0, 16.0], "keywords_en": "near uni", "keywords_cn": "近学校",
+    }
+    assert parsed["2"]["average_score"] == 12.0
+
+
+def test_parse_batch_response_skips_invalid_items():
+    text = "Here you go: " + json.dumps({"results": [
+        result("1", scores=(25, "n/a", 15)),  # 超出范围/非数字的分数被丢弃
+        result("2", scores=(30,)),
+        result("3", keywords_cn=""),
+        result("9"),  # 不在本批次
+        "not an item",
+        {"id": 4, "scores": [10], "keywords_en": "quiet", "keywords_cn": "安静"},
+    ]})
+
+    parsed = make_service()._parse_batch_response(text, ["1", "2", "3", "4"])
+
+    assert set(parsed) == {"1", "4"}
+    assert parsed["1"]["scores"] == [15.0]
+
+
+def test_parse_batch_response_rejects_malformed_text():
+    service = make_service()
+
+    assert service._parse_batch_response("no json here", ["1"]) == {}
+    assert service._parse_batch_response('{"results": [', ["1"]) == {}
+    assert service._parse_batch_response('{"results": {"id": "1"}}', ["1"]) == {}
@@ -0,0 +1,195 @@
+import queue
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.models import PropertyData, PropertySource
+from src.pipeline import ScraperPipeline, _STREAM_END
+from src.scrapers import DomainScraper
+from src.utils.metrics import metrics
+
+
+class ListingScraper(DomainScraper):
+    """固定 5 个房源的列表，详情直接填充描述"""
+
+    def scrape_by_university(self, university):
+        return [PropertyData(house_id=str(i), source=PropertySource.DOMAIN) for i in range(5)]
+
+    def iter_property_details(self, properties, skip_existing=True):
+        for prop in properties:
+            prop.description_en = f"desc {prop.house_id}"
+            yield prop
+
+
+class FakeScoring:
+    config = SimpleNamespace(max_workers=3)
+
+    def needs_processing(self, prop, skip_existing=True):
+        return not prop.average_score
+
+    def process_property(self, prop):
+        prop.average_score = 15.0
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.saved = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        yield self
+
+    def save_properties(self, properties, university):
+        with self._lock:
+            self.saved.extend(properties)
+        return {"inserted": len(properties), "updated": 0}
+
+
+def make_pipeline(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(ScraperPipeline, "SCRAPERS", {"domain": ListingScraper})
+    pipeline = ScraperPipeline(
+        scraper_types=["domain"], enable_scoring=False, enable_commute=False, enable_database=False,
+        output_dir=str(tmp_path), auto_save_list=False, **kwargs,
+    )
+    pipeline.enable_scoring, pipeline.scoring_service = True, FakeScoring()
+    pipeline.enable_database, pipeline.db_service = True, FakeDatabase()
+    pipeline.chunk_save_size = 2
+    return pipeline
+
+
+def test_streaming_records_every_stage(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+
+    results = pipeline.run_streaming("UNSW")
+
+    assert all(prop.average_score == 15.0 for prop in results)
+    assert len(pipeline.db_service.saved) == 5
+    stages = metrics._stage_totals()
+    for name in ("listed:domain", "detailed:domain", "scored", "saved:UNSW", "exported"):
+        assert name in stages
+    assert stages["detailed:domain"]["items"] == 5
+    assert stages["scored"]["items"] == 5
+    assert stages["saved:UNSW"]["items"] == 5
+
+
+def test_streaming_rejects_profiling(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch, profile=True)
+
+    with pytest.raises(ValueError):
+        pipeline.run_streaming("UNSW")
+
+
+def start_stage(pipeline, name, handler, inbox, outbox, workers, downstream_workers, progress):
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=pipeline._stream_worker,
+            args=(name, handler, inbox, outbox, workers, downstream_workers, progress, lock),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def new_progress():
+    return {"count": 0, "items": 0, "finished_at": None}
+
+
+def test_stream_workers_forward_everything_and_shut_down(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    first, second = queue.Queue(maxsize=2), queue.Queue(maxsize=2)
+    seen, seen_lock = [], threading.Lock()
+
+    def flaky(prop):
+        if prop.house_id == "3":
+            raise RuntimeError("LLM timeout")
+
+    def collect(prop):
+        with seen_lock:
+            seen.append(prop.house_id)
+
+    first_progress, second_progress = new_progress(), new_progress()
+    threads = start_stage(pipeline, "评分", flaky, first, second, 3, 2, first_progress)
+    threads += start_stage(pipeline, "通勤", collect, second, None, 2, 0, second_progress)
+
+    for i in range(10):
+        first.put(PropertyData(house_id=str(i), source=PropertySource.DOMAIN))
+    for _ in range(3):
+        first.put(_STREAM_END)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    # 处理失败的房源仍转发给下游
+    assert sorted(seen, key=int) == [str(i) for i in range(10)]
+    assert (first_progress["count"], first_progress["items"]) == (3, 9)
+    assert (second_progress["count"], second_progress["items"]) == (2, 10)
+    assert first_progress["finished_at"] and second_progress["finished_at"]
+
+
+class BrokenSessionDatabase(FakeDatabase):
+    @contextmanager
+    def session(self):
+        raise ConnectionError("database unavailable")
+        yield self
+
+
+class FlakySaveDatabase(FakeDatabase):
+    def save_properties(self, properties, university):
+        if any(prop.house_id == "0" for prop in properties):
+            raise RuntimeError("deadlock")
+        return super().save_properties(properties, university)
+
+
+def run_db_writer(pipeline, count):
+    inbox = queue.Queue(maxsize=1)
+    save_stats, progress = {"inserted": 0, "updated": 0}, new_progress()
+    writer = threading.Thread(
+        target=pipeline._stream_db_writer, args=(inbox, "UNSW", save_stats, progress), daemon=True
+    )
+    writer.start()
+    for i in range(count):
+        inbox.put(PropertyData(house_id=str(i), source=PropertySource.DOMAIN), timeout=5)
+    inbox.put(_STREAM_END, timeout=5)
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    return save_stats, progress
+
+
+def test_db_writer_drains_queue_when_session_fails(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    pipeline.db_service = BrokenSessionDatabase()
+
+    save_stats, progress = run_db_writer(pipeline, 5)
+
+    assert save_stats == {"inserted": 0, "updated": 0}
+    assert progress["items"] == 0 and progress["finished_at"]
+
+
+def test_db_writer_continues_after_failed_batch(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    pipeline.db_service = FlakySaveDatabase()
+
+    save_stats, progress = run_db_writer(pipeline, 5)
+
+    # chunk_save_size = 2：第一批 (0, 1) 失败，其余两批写入
+    assert [prop.house_id for prop in pipeline.db_service.saved] == ["2", "3", "4"]
+    assert save_stats["inserted"] == 3
+    assert progress["items"] == 3
+
+
+def test_streaming_survives_failing_stage(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    monkeypatch.setattr(FakeScoring, "process_property", lambda self, prop: 1 / 0)
+
+    results = pipeline.run_streaming("UNSW")
+
+    assert len(results) == 5
+    assert len(pipeline.db_service.saved) == 5
+    assert metrics._stage_totals()["scored"]["items"] == 0